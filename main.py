@@ -1,7 +1,11 @@
-from src.arena.orchestrator import BattleArena
+import argparse
+import collections
+import json
+import os
 from termcolor import colored
 
-def main():
+def run_demo(args):
+    from src.arena.orchestrator import BattleArena
     arena = BattleArena()
 
     # Define the problem AND the test data
@@ -9,12 +13,13 @@ def main():
     test_input = 20  # Calculate factorial of 20
     expected_result = 2432902008176640000 # The correct answer for 20!
 
-    # Start the Battle
-    results = arena.start_round(problem, test_input, expected_result)
+    # Start the Battle (no human in the loop: round 2 runs on the judge's critiques)
+    state = arena.run_phase_1(problem, test_input, expected_result)
+    results = arena.run_phase_2(state, {})
 
     # Declare Winner
     print(colored("\n🏆 FINAL RANKINGS 🏆", "magenta", attrs=['bold']))
-    
+
     # Sort by Success (True first), then Time (Low first)
     results.sort(key=lambda x: (not x['success'], x['time']))
 
@@ -24,5 +29,165 @@ def main():
         else:
             print(f"❌ {res['agent']} Failed: {res['msg']}")
 
+def export_code(args):
+    """Writes plain .py files for stored battles (all battles unless ids are given)."""
+    from src.arena.code_store import CodeStore, record_code_refs
+    store = CodeStore(args.store)
+    battle_ids = set(args.battle_ids)
+    written = 0
+    for filename in sorted(os.listdir(args.log_dir)):
+        if not filename.endswith("_data.json"): continue
+        if battle_ids and filename[:-len("_data.json")] not in battle_ids: continue
+        with open(os.path.join(args.log_dir, filename), "r") as f: record = json.load(f)
+        written += len(store.export(record_code_refs(record), args.out))
+    print(colored(f"📦 Exported {written} file(s) to {args.out}", "green"))
+
+def show_regressions(args):
+    """Per-problem best/median runtimes and the latest regressions."""
+    from src.judge.regressions import RegressionTracker
+    tracker = RegressionTracker(args.log_dir, window=args.window, threshold=args.threshold)
+    if args.problem:
+        series = tracker.series(args.problem)
+        if series is None:
+            print(colored(f"Unknown problem key: {args.problem}", "red"))
+            return
+        print(colored(series["problem"], "cyan"))
+        for name, agent in series["agents"].items():
+            times = " ".join(f"{p['time']:.2e}" if p["success"] else "FAIL" for p in agent["points"])
+            best = f"{agent['best']:.2e}s" if agent["best"] is not None else "-"
+            print(f"  {name:<16} best {best:<10} | {times}")
+    else:
+        for p in tracker.problems():
+            best = f"{p['best']:.2e}s" if p["best"] is not None else "-"
+            print(f"{p['key']}  {p['battles']:>3} battle(s)  best {best:<10} {p['problem'][:60]}")
+    findings = tracker.regressions(args.problem)
+    print(colored(f"\n📉 {len(findings)} regression(s)", "yellow" if findings else "green"))
+    for f in findings:
+        detail = f"{f['ratio']}x slower ({f['baseline']:.2e}s -> {f['latest']:.2e}s)" if f["kind"] == "slowdown" else "now failing"
+        noisy = " [noisy]" if f.get("noisy") else ""
+        print(f"  {f['key']} {f['agent']}: {detail} in {f['battle_id']}{noisy}")
+
+def run_batch(args):
+    """Headless battles for every problem in a JSONL file; resumable."""
+    from src.arena.batch import BatchRunner
+    runner = BatchRunner(args.problems, args.out, parallelism=args.parallel, policy=args.policy)
+    runner.run(limit=args.limit)
+
+def export_archive(args):
+    """Incremental columnar export of the battle logs (battles, results, rating events)."""
+    from src.judge.archive import ArchiveExporter
+    try:
+        exporter = ArchiveExporter(args.log_dir, args.out, fmt=args.format, batch_size=args.batch_size)
+    except ValueError as e:
+        print(colored(str(e), "red"))
+        return
+    exporter.run()
+
+def _load_settings():
+    import yaml
+    if not os.path.exists("config/settings.yaml"): return {}
+    with open("config/settings.yaml", "r") as f: return yaml.safe_load(f) or {}
+
+def _reserve_cores(args):
+    """Keeps this process off the cores pinned sandbox workers use (measurement in settings.yaml)."""
+    from src.judge.workers import reserve_worker_cores
+    settings = _load_settings()
+    # With queue.sandbox_jobs battles send their sandbox runs to queue workers, which run the pool
+    if args.command == "worker" or not (settings.get("queue", {}) or {}).get("sandbox_jobs"):
+        reserve_worker_cores(settings)
+
+def _queue_settings(args):
+    settings = _load_settings()
+    queue = dict(settings.get("queue", {}) or {})
+    if args.queue: queue["path"] = args.queue
+    return settings, queue
+
+def run_worker(args):
+    """Consumes battle and sandbox jobs from the queue until stopped (SIGTERM finishes the current job)."""
+    import signal
+    from src.arena.job_queue import open_queue
+    from src.arena.queue_worker import QueueWorker
+    settings, queue = _queue_settings(args)
+    kinds = [k.strip() for k in args.kinds.split(",")] if args.kinds else None
+    worker = QueueWorker(open_queue(queue), worker_id=args.id, kinds=kinds, settings=settings)
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    worker.run(max_jobs=args.max_jobs, idle_exit=args.idle_exit)
+
+def enqueue_battles(args):
+    """Queues one battle job per problem; with --wait, collects results like the batch runner."""
+    from src.arena.batch import append_result, read_completed, read_problems
+    from src.arena.job_queue import open_queue
+    _, queue_settings = _queue_settings(args)
+    queue = open_queue(queue_settings)
+    done = read_completed(args.out) if args.wait else set()
+    # Keyed by problem id within this problems file: a re-run reuses jobs already queued, running or done
+    batch = os.path.abspath(args.problems)
+    jobs = {}
+    for problem in read_problems(args.problems):
+        if problem["id"] in done: continue
+        jobs[queue.enqueue("battle", {**problem, "policy": args.policy}, batch=batch, key=problem["id"])] = problem
+    statuses = collections.Counter(queue.get(job_id)["status"] for job_id in jobs)
+    print(colored(f"📬 {len(jobs)} battle(s) on {queue.path}: " + ", ".join(f"{n} {status}" for status, n in sorted(statuses.items())), "green"))
+    if not args.wait: return
+    def collect(job):
+        problem = jobs[job["id"]]
+        line = {"id": problem["id"], "problem": problem["problem"][:200], "attempts": job["attempts"]}
+        if job["status"] == "done": line.update(status="ok", **job["result"])
+        else: line.update(status="error", error=job["error"])
+        append_result(args.out, line)
+        print(f"{'✅' if line['status'] == 'ok' else '❌'} [{problem['id']}] {line.get('champion') or line.get('error')} ({line.get('worker') or job['worker']})")
+    queue.wait(list(jobs), on_done=collect)
+
+def main():
+    parser = argparse.ArgumentParser(description="Code Arena AI")
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("demo", help="Run the factorial demo battle (default).")
+
+    export = sub.add_parser("export-code", help="Export stored code as plain .py files.")
+    export.add_argument("battle_ids", nargs="*", help="Battle ids to export (default: all).")
+    export.add_argument("--out", default="output/generated_code")
+    export.add_argument("--store", default="output/code_store")
+    export.add_argument("--log-dir", default="output/battle_logs")
+
+    regress = sub.add_parser("regressions", help="Show per-problem runtime history and regressions.")
+    regress.add_argument("--problem", help="Problem key to show the full series for.")
+    regress.add_argument("--window", type=int, default=5, help="Baseline runs to compare against.")
+    regress.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown to report.")
+    regress.add_argument("--log-dir", default="output/battle_logs")
+
+    batch = sub.add_parser("batch", help="Run battles for a JSONL file of problems.")
+    batch.add_argument("problems", help="JSONL file, one problem per line.")
+    batch.add_argument("--out", default="output/batch_results.jsonl", help="Results file; completed ids are skipped on re-run.")
+    batch.add_argument("--parallel", type=int, default=1, help="Battles run at the same time.")
+    batch.add_argument("--policy", default="auto", choices=["none", "failures", "speed", "auto"], help="Automatic critiques in place of the human step.")
+    batch.add_argument("--limit", type=int, help="Run at most this many new problems.")
+
+    archive = sub.add_parser("export-archive", help="Export battle logs as columnar tables for analytics.")
+    archive.add_argument("--out", default="output/analytics")
+    archive.add_argument("--format", default="auto", choices=["auto", "parquet", "arrow", "csv"], help="auto: parquet with pyarrow installed, else csv.")
+    archive.add_argument("--batch-size", type=int, default=5000, help="Battles per part file.")
+    archive.add_argument("--log-dir", default="output/battle_logs")
+
+    worker = sub.add_parser("worker", help="Run queued battle and sandbox jobs (start as many as the hosts allow).")
+    worker.add_argument("--queue", help="Queue database (default: queue.path in settings.yaml).")
+    worker.add_argument("--kinds", help="Comma-separated job kinds: battle, benchmark, measure, outputs, analyze (default: all).")
+    worker.add_argument("--id", help="Worker id (default: host-pid-random).")
+    worker.add_argument("--max-jobs", type=int, help="Exit after this many jobs.")
+    worker.add_argument("--idle-exit", type=float, help="Exit after the queue stayed empty this many seconds.")
+
+    enqueue = sub.add_parser("enqueue", help="Queue battles for a JSONL file of problems (run by `worker` processes).")
+    enqueue.add_argument("problems", help="JSONL file, one problem per line (same format as batch).")
+    enqueue.add_argument("--queue", help="Queue database (default: queue.path in settings.yaml).")
+    enqueue.add_argument("--policy", default="auto", choices=["none", "failures", "speed", "auto"], help="Automatic critiques in place of the human step.")
+    enqueue.add_argument("--wait", action="store_true", help="Wait for the battles and append results to --out.")
+    enqueue.add_argument("--out", default="output/batch_results.jsonl", help="Results file with --wait; completed ids are not queued again.")
+
+    args = parser.parse_args()
+    commands = {"demo": run_demo, "export-code": export_code, "regressions": show_regressions, "batch": run_batch, "export-archive": export_archive,
+                "worker": run_worker, "enqueue": enqueue_battles}
+    if args.command in (None, "demo", "batch", "worker"): _reserve_cores(args)
+    commands.get(args.command or "demo")(args)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
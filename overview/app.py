@@ -1,11 +1,13 @@
 from flask import Flask, render_template, request, jsonify, Response, send_file
 import os
 import sys
-import threading
+from concurrent.futures import ThreadPoolExecutor
 import json
-import queue
 import ast
 import io
+import collections
+import threading
+from datetime import datetime
 
 # --- PATH SETUP ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -16,27 +18,50 @@ CONFIG_DIR = os.path.join(ROOT_DIR, 'config')
 sys.path.append(ROOT_DIR)
 
 from src.arena.orchestrator import BattleArena
-from src.judge.elo import EloSystem
+from src.judge.leaderboard import get_leaderboard_service
+from src.judge.regressions import get_regression_tracker
+from src.agents.prompts import get_registry
+from src.arena.events import EventLog, format_sse, parse_last_event_id
+from src.arena.code_store import CodeStore, hydrate_record
 
 app = Flask(__name__)
+prompts = get_registry(PROMPT_DIR)
+code_store = CodeStore(os.path.join(ROOT_DIR, 'output', 'code_store'))
 
 # --- GLOBALS ---
-log_queue = queue.Queue()
+# Battle phases run on a managed pool instead of a raw thread per request.
+# Battle state below is global, so the UI runs one battle at a time; use
+# `main.py batch` or queue workers for concurrent battles.
+battle_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="battle")
+battle_lock = threading.Lock()
+MAX_KEPT_STREAMS = 8
+event_logs = collections.OrderedDict() # stream_id -> EventLog, newest last
+current_stream_id = None
 current_battle_state = None 
 is_battle_running = False
 
+def new_event_log():
+    global current_stream_id
+    current_stream_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    event_logs[current_stream_id] = EventLog()
+    while len(event_logs) > MAX_KEPT_STREAMS: event_logs.popitem(last=False)
+    return current_stream_id
+
 def web_logger(message):
-    log_queue.put(message)
+    log = event_logs.get(current_stream_id)
+    if log: log.publish(message)
 
 def parse_input_string(s):
+    # Also accepts dataset specs, e.g. {"$dataset": "data/big.npy"} or {"$generate": "int_list", "size": 1000000, "seed": 1}
     if not s or s.strip() == "": return None
     try: return ast.literal_eval(s)
+    except: pass
+    try: return json.loads(s)
     except: return s
 
 # --- THREADS ---
 def run_phase_1_thread(problem, input_str, expected_str):
     global current_battle_state, is_battle_running
-    is_battle_running = True
     try:
         arena = BattleArena(log_callback=web_logger)
         test_input = parse_input_string(input_str)
@@ -48,6 +73,9 @@ def run_phase_1_thread(problem, input_str, expected_str):
     except Exception as e:
         web_logger(f"❌ ERROR: {str(e)}")
         is_battle_running = False
+        # No phase 2 will follow: end the stream so viewers disconnect
+        web_logger("FAILED")
+        if current_stream_id in event_logs: event_logs[current_stream_id].close()
 
 def run_phase_2_thread(human_critiques):
     global current_battle_state, is_battle_running
@@ -60,6 +88,7 @@ def run_phase_2_thread(human_critiques):
         is_battle_running = False
         current_battle_state = None
         web_logger("DONE")
+        if current_stream_id in event_logs: event_logs[current_stream_id].close()
 
 # ================= ROUTES =================
 
@@ -76,27 +105,38 @@ def leaderboard_view():
 @app.route('/api/start_phase_1', methods=['POST'])
 def start_phase_1():
     global is_battle_running
-    if is_battle_running: return jsonify({"status": "error", "message": "Running"})
+    # Check and claim in one step, so two quick POSTs cannot both start a battle
+    with battle_lock:
+        if is_battle_running: return jsonify({"status": "error", "message": "Running"})
+        is_battle_running = True
+        stream_id = new_event_log()
     data = request.json
-    threading.Thread(target=run_phase_1_thread, args=(data.get('problem'), data.get('test_input'), data.get('expected_output'))).start()
-    return jsonify({"status": "started"})
+    battle_executor.submit(run_phase_1_thread, data.get('problem'), data.get('test_input'), data.get('expected_output'))
+    return jsonify({"status": "started", "stream_id": stream_id})
 
 @app.route('/api/start_phase_2', methods=['POST'])
 def start_phase_2():
     critiques = request.json.get('critiques', {})
-    threading.Thread(target=run_phase_2_thread, args=(critiques,)).start()
+    battle_executor.submit(run_phase_2_thread, critiques)
     return jsonify({"status": "resumed"})
 
 @app.route('/api/stream_logs')
 def stream_logs():
-    def event_stream():
-        while True:
-            try:
-                message = log_queue.get(timeout=1)
-                yield f"data: {message}\n\n"
-                if message == "DONE": break
-            except queue.Empty: continue
-    return Response(event_stream(), mimetype="text/event-stream")
+    # Any number of viewers; reconnects resume from Last-Event-ID; bursts arrive batched
+    stream_id = request.args.get('stream', current_stream_id)
+    log = event_logs.get(stream_id)
+    if log is None: return jsonify({"error": "No battle stream"}), 404
+    cursor = parse_last_event_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'), stream_id)
+
+    def event_stream(cursor):
+        while not log.is_drained(cursor):
+            events, dropped = log.read(cursor)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            cursor = events[-1][0]
+            yield format_sse(events, dropped, stream_id)
+    return Response(event_stream(cursor), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 # --- HISTORY & RESULTS ---
 
@@ -123,7 +163,7 @@ def get_history():
 def get_battle_details(battle_id):
     path = os.path.join(OUTPUT_DIR, f"{battle_id}_data.json")
     if os.path.exists(path):
-        with open(path, 'r') as f: return jsonify(json.load(f))
+        with open(path, 'r') as f: return jsonify(hydrate_record(json.load(f), code_store))
     return jsonify({"error": "Battle not found"}), 404
 
 @app.route('/api/download_report/<battle_id>')
@@ -131,7 +171,7 @@ def download_report(battle_id):
     path = os.path.join(OUTPUT_DIR, f"{battle_id}_data.json")
     if not os.path.exists(path): return "Not found", 404
     
-    with open(path, 'r') as f: data = json.load(f)
+    with open(path, 'r') as f: data = hydrate_record(json.load(f), code_store)
     
     md = f"# Battle Report: {data['battle_id']}\n\n**Problem:** {data['problem']}\n**Champion:** {data['champion']}\n\n"
     md += "## Results\n"
@@ -145,10 +185,35 @@ def download_report(battle_id):
 
 # --- LEADERBOARD ---
 
+def conditional_json(etag, build):
+    # Pollers send If-None-Match; unchanged data costs a 304 with no body
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+    resp = jsonify(build())
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
 @app.route('/api/leaderboard')
 def get_leaderboard_data():
-    elo = EloSystem()
-    return jsonify(elo.get_leaderboard())
+    service = get_leaderboard_service(OUTPUT_DIR)
+    return conditional_json(f"lb-{service.etag()}", service.leaderboard)
+
+@app.route('/api/stats')
+def get_stats():
+    service = get_leaderboard_service(OUTPUT_DIR)
+    return conditional_json(f"stats-{service.etag()}", service.stats)
+
+@app.route('/api/regressions')
+def get_regressions():
+    # ?problem=<key> adds that problem's full time series
+    tracker = get_regression_tracker(OUTPUT_DIR)
+    key = request.args.get('problem')
+    def build():
+        data = {"problems": tracker.problems(), "regressions": tracker.regressions(key)}
+        if key: data["series"] = tracker.series(key)
+        return data
+    return conditional_json(f"reg-{key or 'all'}-{tracker.etag()}", build)
 
 # --- CONFIGURATION (These were missing!) ---
 
@@ -165,17 +230,28 @@ def save_config():
 
 @app.route('/api/list_prompts')
 def list_prompts():
-    return jsonify({"files": [f for f in os.listdir(PROMPT_DIR) if f.endswith('.txt')]})
+    return jsonify({"files": prompts.list()})
 
 @app.route('/api/get_prompt')
 def get_prompt():
-    with open(os.path.join(PROMPT_DIR, request.args.get('filename')), 'r') as f: return jsonify({"content": f.read()})
+    try: return jsonify({"content": prompts.get(request.args.get('filename', ''))})
+    except (FileNotFoundError, ValueError): return jsonify({"error": "Prompt not found"}), 404
 
 @app.route('/api/save_prompt', methods=['POST'])
 def save_prompt():
-    with open(os.path.join(PROMPT_DIR, request.json['filename']), 'w') as f: f.write(request.json['content'])
+    try: prompts.save(request.json['filename'], request.json['content'])
+    except ValueError as e: return jsonify({"status": "error", "message": str(e)}), 400
     return jsonify({"status": "saved"})
 
+def reserve_sandbox_cores():
+    """Keeps the server off the cores pinned sandbox workers use; called once at startup."""
+    import yaml
+    from src.judge.workers import reserve_worker_cores
+    with open(os.path.join(CONFIG_DIR, 'settings.yaml'), 'r') as f: settings = yaml.safe_load(f) or {}
+    if not (settings.get('queue', {}) or {}).get('sandbox_jobs'): reserve_worker_cores(settings)
+
 if __name__ == '__main__':
+    reserve_sandbox_cores()
+    # Development server. For many viewers use the async mode: python overview/asgi.py
     print(f"🚀 Server running on http://127.0.0.1:5000")
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Async serving mode for the overview app.
+
+    pip install uvicorn asgiref
+    python overview/asgi.py [--host 127.0.0.1] [--port 5000]
+
+Regular routes run through the Flask app on asgiref's thread pool. Log streams
+(/api/stream_logs) are served natively as coroutines, so an idle viewer costs a
+pending future instead of a worker thread. Battle phases keep running on the
+app's managed executor.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as web
+from src.arena.events import format_sse, parse_last_event_id
+
+KEEP_ALIVE_S = 15.0
+
+
+def _build_wsgi_adapter():
+    from asgiref.wsgi import WsgiToAsgi
+    return WsgiToAsgi(web.app)
+
+
+async def _send_json(send, status, body):
+    await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def stream_logs(scope, receive, send):
+    query = parse_qs(scope.get("query_string", b"").decode())
+    headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+    stream_id = query.get("stream", [web.current_stream_id])[0]
+    log = web.event_logs.get(stream_id)
+    if log is None:
+        return await _send_json(send, 404, b'{"error": "No battle stream"}')
+    cursor = parse_last_event_id(headers.get("last-event-id") or query.get("last_event_id", [None])[0], stream_id)
+
+    await send({"type": "http.response.start", "status": 200, "headers": [
+        (b"content-type", b"text/event-stream"),
+        (b"cache-control", b"no-cache"),
+        (b"x-accel-buffering", b"no"),
+    ]})
+
+    async def watch_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    disconnected = asyncio.ensure_future(watch_disconnect())
+    try:
+        while not log.is_drained(cursor) and not disconnected.done():
+            events, dropped = await log.aread(cursor, timeout=KEEP_ALIVE_S)
+            if events:
+                cursor = events[-1][0]
+                chunk = format_sse(events, dropped, stream_id)
+            else:
+                chunk = ": keep-alive\n\n"
+            await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    except OSError:
+        pass  # Client went away mid-write
+    finally:
+        disconnected.cancel()
+
+
+def create_app():
+    wsgi = _build_wsgi_adapter()
+
+    async def application(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    web.battle_executor.shutdown(wait=False, cancel_futures=True)
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] == "http" and scope["path"] == "/api/stream_logs":
+            return await stream_logs(scope, receive, send)
+        return await wsgi(scope, receive, send)
+
+    return application
+
+
+application = create_app()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve the Code Arena UI in async mode.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+    import uvicorn
+    web.reserve_sandbox_cores()
+    print(f"🚀 Async server running on http://{args.host}:{args.port}")
+    uvicorn.run(application, host=args.host, port=args.port, log_level="warning")
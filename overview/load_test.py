@@ -0,0 +1,145 @@
+"""
+Load test for log streaming.
+
+Self-hosted (default): starts the async server in-process, runs synthetic
+battles that publish log lines, and attaches viewers to each of them.
+
+    python overview/load_test.py --battles 4 --viewers 250 --duration 20   # 4 synthetic streams
+
+Against a running server (real battle in progress):
+
+    python overview/load_test.py --url http://127.0.0.1:5000 --viewers 500
+
+Reports connected viewers, delivered lines, delivery latency and threads used.
+Self-hosted numbers are synthetic: the publishers only emit log lines and do
+no battle work, so they measure log fan-out, not how many real battles an
+instance can run (the web UI runs one battle at a time).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Well above the server's 15 s keep-alive and the startup delay before publishers
+# begin; viewers are otherwise only ended by the stream closing or by `stop`.
+READ_TIMEOUT_S = 60.0
+
+
+class Stats:
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.lines = 0
+        self.latencies = []
+
+
+async def viewer(host, port, path, stats, stop):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats.failed += 1
+        return
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+    status = await reader.readline()
+    if b" 200 " not in status:
+        stats.failed += 1
+        writer.close()
+        return
+    stats.connected += 1
+    try:
+        while not stop.is_set():
+            line = await asyncio.wait_for(reader.readline(), timeout=READ_TIMEOUT_S)
+            if not line: break
+            if b"data: t=" in line:
+                sent = float(line.split(b"t=", 1)[1].split()[0])
+                stats.latencies.append(time.time() - sent)
+                stats.lines += 1
+            elif line.startswith(b"data: "):
+                stats.lines += 1
+    except (asyncio.TimeoutError, asyncio.CancelledError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def run_publishers(web, stream_ids, rate, duration):
+    """Synthetic battles: each publishes `rate` lines/s in small bursts, like the orchestrator."""
+    def publish(stream_id):
+        log = web.event_logs[stream_id]
+        end = time.time() + duration
+        while time.time() < end:
+            for _ in range(5): log.publish(f"t={time.time():.6f} 🤖 agent is thinking...")
+            time.sleep(5 / rate)
+        log.publish("DONE")
+        log.close()
+    threads = [threading.Thread(target=publish, args=(sid,), daemon=True) for sid in stream_ids]
+    for t in threads: t.start()
+    return threads
+
+
+def start_server(port):
+    import uvicorn
+    from asgi import application
+    config = uvicorn.Config(application, host="127.0.0.1", port=port, log_level="error", backlog=4096)
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started: time.sleep(0.05)
+    return server
+
+
+async def main(args):
+    stats = Stats()
+    stop = asyncio.Event()
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+        paths = ["/api/stream_logs"]
+    else:
+        import app as web
+        host, port = "127.0.0.1", args.port
+        server = start_server(port)
+        stream_ids = []
+        for i in range(args.battles):
+            stream_id = f"load_{i}"
+            web.event_logs[stream_id] = web.EventLog()
+            stream_ids.append(stream_id)
+        paths = [f"/api/stream_logs?stream={sid}" for sid in stream_ids]
+
+    threads_before = threading.active_count()
+    tasks = [asyncio.ensure_future(viewer(host, port, paths[i % len(paths)], stats, stop)) for i in range(args.viewers * len(paths))]
+    await asyncio.sleep(1.0)
+    started = time.time()
+    if not args.url:
+        run_publishers(web, stream_ids, args.rate, args.duration)
+    await asyncio.sleep(args.duration)
+    stop.set()
+    for task in tasks: task.cancel()  # Viewers blocked in a read stop now, not at their timeout
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.time() - started
+
+    lat = sorted(stats.latencies)
+    print(f"viewers requested : {len(tasks)} across {len(paths)} {'battle' if args.url else 'synthetic'} stream(s)")
+    print(f"viewers connected : {stats.connected} (failed {stats.failed})")
+    print(f"lines delivered   : {stats.lines} ({stats.lines / elapsed:.0f}/s)")
+    if lat:
+        print(f"latency p50/p99   : {statistics.median(lat) * 1000:.1f} ms / {lat[int(len(lat) * 0.99) - 1] * 1000:.1f} ms")
+    print(f"threads in process: {threads_before} before viewers, {threading.active_count()} at end")
+    if not args.url: server.should_exit = True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Concurrent viewer load test for /api/stream_logs.")
+    parser.add_argument("--url", help="Test an already running server instead of self-hosting.")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--battles", type=int, default=2, help="Synthetic log streams (self-hosted only; no battle work).")
+    parser.add_argument("--viewers", type=int, default=100, help="Viewers per battle stream.")
+    parser.add_argument("--rate", type=float, default=50.0, help="Log lines per second per battle.")
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
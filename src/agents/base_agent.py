@@ -1,50 +1,72 @@
-import os
 from src.llm.llm_client import LocalLLM
+from src.llm.budget import PromptBuilder, budget_for
+from src.agents.prompts import get_registry
+from src.agents.extraction import extract_code
+from src.judge.evidence import compact_code
+
+GENERATE_TASK = "Write a Python function 'solution' to solve this."
+GENERATE_RULES = "Return ONLY valid python code inside ```python``` blocks. No text."
+REFINE_TASK = "Rewrite 'solution' function to fix issues. Return ONLY code."
+REFINE_TASK_WITH_WINNER = "Rewrite 'solution' function to fix issues; borrow from the winning code where it helps. Return ONLY code."
 
 class Agent:
-    def __init__(self, name, role, model, prompt_file, is_cloud=False):
+    def __init__(self, name, role, model, prompt_file, is_cloud=False, llm=None, prompt_budget=None):
         self.name = name
         self.role = role
         self.model = model
         self.is_cloud = is_cloud # <--- New Flag
         self.personality = self._load_prompt(prompt_file)
-        self.llm = LocalLLM()
+        self.llm = llm or LocalLLM()
         self.current_code = None
+        self.last_usage = {} # Copy of the latest call's timings/token counts (concurrent callers pass their own dict)
+        self.prompt_budget = prompt_budget # Per-kind prompt token budgets (settings.yaml prompt_budget)
 
     def _load_prompt(self, filename):
-        base_path = os.getcwd()
-        full_path = os.path.join(base_path, "prompts", filename)
-        try:
-            with open(full_path, "r") as f: return f.read()
-        except FileNotFoundError: return f"You are {self.name}."
-
-    def generate_solution(self, problem_statement):
-        prompt = f"""
-        PROBLEM: {problem_statement}
-        TASK: Write a Python function 'solution' to solve this. 
-        RULES: Return ONLY valid python code inside ```python``` blocks. No text.
-        """
+        # Served from the shared registry: read once, re-read only when the file changes
+        try: return get_registry().render(filename, name=self.name, role=self.role)
+        except (FileNotFoundError, ValueError): return f"You are {self.name}."
+
+    def generate_solution(self, problem_statement, temperature=None, usage=None):
+        builder = self._builder("generate")
+        builder.add("PROBLEM", problem_statement, priority=1)
+        builder.add("TASK", GENERATE_TASK, kind="fixed")
+        builder.add("RULES", GENERATE_RULES, kind="fixed")
+        prompt, usage = self._build(builder, usage)
         # Pass force_local = NOT is_cloud
         response = self.llm.get_response(
-            self.model, self.personality, prompt, force_local=not self.is_cloud
+            self.model, self.personality, prompt, force_local=not self.is_cloud, usage=usage, temperature=temperature
         )
+        self.last_usage = dict(usage)
         self.current_code = self._extract_code(response)
         return self.current_code
 
-    def refine_solution_with_critique(self, problem, my_prev_code, winner_code, critique):
-        prompt = f"""
-        PROBLEM: {problem}
-        PREV CODE: {my_prev_code}
-        CRITIQUE: {critique}
-        TASK: Rewrite 'solution' function to fix issues. Return ONLY code.
-        """
+    def refine_solution_with_critique(self, problem, my_prev_code, winner_code, critique, temperature=None, usage=None):
+        # The judge's pick is shown for reference unless it is our own code again
+        show_winner = winner_code and compact_code(winner_code) != compact_code(my_prev_code or "")
+        builder = self._builder("refine")
+        builder.add("PROBLEM", problem, priority=2)
+        builder.add("PREV CODE", my_prev_code, priority=4, kind="code")
+        if show_winner: builder.add("WINNING CODE", winner_code, priority=1, kind="code", optional=True)
+        builder.add("CRITIQUE", critique, priority=3)
+        builder.add("TASK", REFINE_TASK_WITH_WINNER if show_winner else REFINE_TASK, kind="fixed")
+        prompt, usage = self._build(builder, usage)
         # Pass force_local = NOT is_cloud
         response = self.llm.get_response(
-            self.model, self.personality, prompt, force_local=not self.is_cloud
+            self.model, self.personality, prompt, force_local=not self.is_cloud, usage=usage, temperature=temperature
         )
+        self.last_usage = dict(usage)
         return self._extract_code(response)
 
+    def _builder(self, kind):
+        return PromptBuilder(budget_for(kind, self.prompt_budget), self.model, self.is_cloud, reserved=self.personality)
+
+    def _build(self, builder, usage):
+        """(prompt, usage): this call's own usage dict, never shared with concurrent samples."""
+        prompt, report = builder.build()
+        usage = usage if usage is not None else {}
+        # The backend reports real token counts; the estimate and any trimming are recorded next to them
+        usage.update(prompt_estimate=report['tokens'], prompt_budget=report['budget'], trimmed=report['trimmed'])
+        return prompt, usage
+
     def _extract_code(self, text):
-        if "```python" in text: return text.split("```python")[1].split("```")[0].strip()
-        elif "```" in text: return text.split("```")[1].split("```")[0].strip()
-        return text
\ No newline at end of file
+        return extract_code(text)
\ No newline at end of file
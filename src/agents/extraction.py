@@ -0,0 +1,60 @@
+import ast
+import re
+
+FENCE = re.compile(r"```[ \t]*([\w+-]*)[ \t]*\n(.*?)(?:```|\Z)", re.S)
+PYTHON_TAGS = {"", "python", "py", "python3"}
+
+
+def extract_code(text):
+    """
+    Picks the most plausible Python program out of an LLM reply.
+    Every fenced block, the prose-free remainder and the concatenation of all
+    Python blocks are scored in one pass; a candidate that parses and defines
+    `solution` wins over one that merely comes first.
+    """
+    if not text: return ""
+    candidates = []
+    blocks = []
+    for match in FENCE.finditer(text):
+        tag, body = match.group(1).lower(), match.group(2)
+        blocks.append((tag, body))
+        candidates.append((body, tag in PYTHON_TAGS and tag != "", 0))
+    python_blocks = [body for tag, body in blocks if tag in PYTHON_TAGS]
+    if len(python_blocks) > 1:
+        candidates.append(("\n\n".join(python_blocks), True, 1))
+    if not blocks:
+        candidates.append((text, False, 0))
+
+    best, best_score = None, None
+    for order, (code, tagged, joined) in enumerate(candidates):
+        code = _strip_language_line(code.strip())
+        tree = _parse(code)
+        score = (
+            tree is not None,
+            tree is not None and "solution" in top_level_functions(tree),
+            tree is not None and bool(top_level_functions(tree)),
+            tagged,
+            -joined,   # Prefer a single self-contained block
+            -order,    # Then the earliest one
+        )
+        if best_score is None or score > best_score:
+            best, best_score = code, score
+    return best
+
+
+def _strip_language_line(code):
+    # Models sometimes leak the fence tag into the body ("markdown\ndef solution...");
+    # a lone word on the first line is never useful code, just a NameError at runtime
+    first, _, rest = code.partition("\n")
+    if rest and re.fullmatch(r"[A-Za-z][A-Za-z0-9+-]*", first.strip()) and _parse(rest) is not None:
+        return rest.strip()
+    return code
+
+
+def _parse(code):
+    try: return ast.parse(code)
+    except (SyntaxError, ValueError): return None
+
+
+def top_level_functions(tree):
+    return [node.name for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
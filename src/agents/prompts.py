@@ -0,0 +1,80 @@
+import os
+import threading
+from string import Template
+
+
+class PromptRegistry:
+    """
+    Loads every prompts/*.txt once and serves them from memory.
+    Each access re-checks the file's mtime, so edits (from the UI or by hand)
+    take effect on the next battle without a restart.
+    Prompts may use $name and $role placeholders; rendered results are cached.
+    """
+
+    def __init__(self, prompt_dir):
+        self.prompt_dir = prompt_dir
+        self._lock = threading.Lock()
+        self._templates = {}  # filename -> (mtime_ns, Template)
+        self._rendered = {}   # (filename, mtime_ns, context) -> str
+        self._scanned = False
+
+    def _path(self, filename):
+        if os.path.basename(filename) != filename or not filename.endswith(".txt"):
+            raise ValueError(f"Invalid prompt file name: {filename}")
+        return os.path.join(self.prompt_dir, filename)
+
+    def _scan(self):
+        if self._scanned: return
+        if os.path.isdir(self.prompt_dir):
+            for filename in os.listdir(self.prompt_dir):
+                if filename.endswith(".txt"): self._load(filename)
+        self._scanned = True
+
+    def _load(self, filename):
+        path = self._path(filename)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._templates.get(filename)
+        if cached and cached[0] == mtime:
+            return cached
+        with open(path, "r") as f:
+            entry = (mtime, Template(f.read()))
+        self._templates[filename] = entry
+        return entry
+
+    def list(self):
+        with self._lock:
+            self._scan()
+            return sorted(f for f in self._templates if os.path.exists(self._path(f)))
+
+    def get(self, filename):
+        """Raw prompt text. Raises FileNotFoundError if missing."""
+        with self._lock:
+            self._scan()
+            return self._load(filename)[1].template
+
+    def render(self, filename, **context):
+        with self._lock:
+            self._scan()
+            mtime, template = self._load(filename)
+            key = (filename, mtime, tuple(sorted(context.items())))
+            if key not in self._rendered:
+                self._rendered = {k: v for k, v in self._rendered.items() if k[0] != filename or k[1] == mtime}
+                self._rendered[key] = template.safe_substitute(**context)
+            return self._rendered[key]
+
+    def save(self, filename, content):
+        with self._lock:
+            with open(self._path(filename), "w") as f: f.write(content)
+            self._templates.pop(filename, None)
+            self._load(filename)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_registry(prompt_dir=None):
+    prompt_dir = os.path.abspath(prompt_dir or os.path.join(os.getcwd(), "prompts"))
+    with _registries_lock:
+        if prompt_dir not in _registries:
+            _registries[prompt_dir] = PromptRegistry(prompt_dir)
+        return _registries[prompt_dir]
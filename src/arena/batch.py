@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from src.judge.regressions import problem_key
+
+POLICIES = ("none", "failures", "speed", "auto")
+
+
+def read_problems(path, log=print):
+    """
+    Streams problems from a JSONL file. Each line needs a problem text
+    ("problem", or "body"/"prompt"/"title"). "input"/"output" are optional (the
+    local oracle or the Architect decides them otherwise), "reference" is trusted
+    solution code for the oracle and "id" defaults to a key of the text and input.
+    An input without an output is kept (the oracle derives the output for it); an
+    output without an input is dropped. Blank and malformed lines are skipped and
+    reported through `log`.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line: continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                log(f"🟠 {path}:{lineno}: not valid JSON, skipped")
+                continue
+            text = obj.get("problem") or obj.get("body") or obj.get("prompt") or obj.get("title")
+            if not text:
+                log(f"🟠 {path}:{lineno}: no problem text, skipped")
+                continue
+            yield {
+                "id": str(obj.get("id") or obj.get("problem_id") or obj.get("request_id") or problem_key(text, obj.get("input"))),
+                "problem": text,
+                "input": obj.get("input"),
+                "output": obj.get("output") if "input" in obj else None,
+                "reference": obj.get("reference"),
+            }
+
+
+def read_completed(path):
+    """Ids with an "ok" line in an existing results file; a torn last line is ignored."""
+    done = set()
+    if not os.path.exists(path): return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                continue
+            if obj.get("status") == "ok": done.add(obj.get("id"))
+    return done
+
+
+def auto_critiques(policy, state):
+    """
+    Stands in for the human step between the rounds.
+    failures: failing agents get their error; speed: passing agents get the gap
+    to the fastest passing time; auto: both.
+    """
+    if policy == "none": return {}
+    scores = state['round1_scores']
+    pick = state['verdict'].get('winner')
+    passing = [s['time'] for s in scores if s['success']]
+    best = min(passing) if passing else None
+    notes = {}
+    for s in scores:
+        if s['agent'] == pick: continue
+        if not s['success'] and policy in ("failures", "auto"):
+            notes[s['agent']] = f"Your solution failed: {s['msg'][:200]}. Make it correct first."
+        elif s['success'] and best and s['time'] > best and policy in ("speed", "auto"):
+            notes[s['agent']] = f"Correct, but {s['time'] / best:.1f}x slower than the fastest passing solution ({s['time']:.2e}s vs {best:.2e}s)."
+    return notes
+
+
+def run_battle(arena, problem, policy="auto"):
+    """One battle without a human: phase 1, automatic critiques, phase 2. Returns its summary."""
+    state = arena.run_phase_1(problem["problem"], problem["input"], problem["output"], problem.get("reference"))
+    notes = auto_critiques(policy, state)
+    final = arena.run_phase_2(state, notes)
+    champion = final[0]['agent'] if final and final[0]['success'] else "NO ONE"
+    return {
+        "battle_id": state['battle_id'],
+        "judge_pick": state['verdict'].get('winner'),
+        "champion": champion,
+        "critiques": sorted(notes),
+        "results": [{"agent": r['agent'], "success": r['success'], "time": r['time'], "complexity": r['complexity']} for r in final],
+    }
+
+
+class BatchRunner:
+    """
+    Runs battles for every problem in a JSONL file without a human in the loop.
+    Each finished battle is appended to `out_path` as one JSON line (flushed and
+    fsynced), so an interrupted run resumes by skipping ids already marked ok.
+    """
+
+    def __init__(self, problems_path, out_path, parallelism=1, policy="auto", arena_factory=None, log=print):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown critique policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        self.problems_path = problems_path
+        self.out_path = out_path
+        self.parallelism = max(1, parallelism)
+        self.policy = policy
+        self.arena_factory = arena_factory or _default_arena
+        self.log = log
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._elo = None
+
+    def _arena(self):
+        # One arena per thread (each keeps per-battle state); ratings are shared
+        if not hasattr(self._local, "arena"):
+            arena = self.arena_factory()
+            with self._write_lock:
+                if self._elo is None: self._elo = arena.elo
+            arena.elo = self._elo
+            self._local.arena = arena
+        return self._local.arena
+
+    def run(self, limit=None):
+        done = read_completed(self.out_path)
+        counts = {"ok": 0, "error": 0, "skipped": 0}
+        seen = set()
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="batch") as pool:
+            inflight = set()
+            for problem in read_problems(self.problems_path, self.log):
+                if problem["id"] in done or problem["id"] in seen:
+                    counts["skipped"] += 1
+                    continue
+                if limit is not None and len(seen) >= limit: break
+                seen.add(problem["id"])
+                if len(inflight) >= self.parallelism:
+                    finished, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in finished: counts[future.result()] += 1
+                inflight.add(pool.submit(self._run_one, problem))
+            for future in inflight: counts[future.result()] += 1
+        self.log(f"📦 Batch done: {counts['ok']} ok, {counts['error']} failed, {counts['skipped']} skipped")
+        return counts
+
+    def _run_one(self, problem):
+        start = time.perf_counter()
+        line = {"id": problem["id"], "problem": problem["problem"][:200]}
+        try:
+            line.update(status="ok", **run_battle(self._arena(), problem, self.policy))
+        except Exception as e:
+            line.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+        line["duration_s"] = round(time.perf_counter() - start, 3)
+        self._write(line)
+        self.log(f"{'✅' if line['status'] == 'ok' else '❌'} [{problem['id']}] {line.get('champion') or line.get('error')}")
+        return line["status"]
+
+    def _write(self, line):
+        with self._write_lock:
+            append_result(self.out_path, line)
+
+
+def append_result(path, line):
+    """Appends one JSON line, flushed and fsynced."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a+", encoding="utf-8") as f:
+        # A crash may have left a partial line; start on a fresh one
+        if f.tell() > 0:
+            f.seek(f.tell() - 1)
+            if f.read(1) != "\n": f.write("\n")
+        f.write(json.dumps(line, default=str) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _default_arena():
+    from src.arena.orchestrator import BattleArena
+    return BattleArena()
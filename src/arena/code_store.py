@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process locking only
+    fcntl = None
+
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+
+
+class CodeStore:
+    """
+    Content-addressed store for generated code.
+
+    Each distinct source is stored once, zlib-compressed and appended to a
+    segment file (segment_00000.pack, ...). index.jsonl maps the sha256 of the
+    source to (segment, offset, length), so battle records only keep the hash.
+    """
+
+    def __init__(self, root="output/code_store", segment_max_bytes=SEGMENT_MAX_BYTES):
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._index = {}
+        self._index_pos = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._refresh()
+
+    @staticmethod
+    def hash_code(code):
+        return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+    def _refresh(self):
+        # Picks up entries appended by other processes since the last read
+        if not os.path.exists(self.index_path): return
+        with open(self.index_path, "r") as f:
+            f.seek(self._index_pos)
+            for line in f:
+                if not line.endswith("\n"): break  # Partially written by another process
+                entry = json.loads(line)
+                self._index[entry["hash"]] = entry
+                self._index_pos += len(line.encode("utf-8"))
+
+    def __contains__(self, code_hash):
+        with self._lock:
+            if code_hash not in self._index: self._refresh()
+            return code_hash in self._index
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def put(self, code):
+        code = code or ""
+        code_hash = self.hash_code(code)
+        with self._lock:
+            if code_hash in self._index: return code_hash
+            blob = zlib.compress(code.encode("utf-8"), 6)
+            with open(self.index_path, "a") as index_file:
+                if fcntl: fcntl.flock(index_file, fcntl.LOCK_EX)
+                try:
+                    self._refresh()
+                    if code_hash in self._index: return code_hash
+                    segment = self._writable_segment(len(blob))
+                    path = os.path.join(self.root, segment)
+                    with open(path, "ab") as seg:
+                        offset = seg.tell()
+                        seg.write(blob)
+                    entry = {"hash": code_hash, "segment": segment, "offset": offset, "length": len(blob), "size": len(code)}
+                    line = json.dumps(entry) + "\n"
+                    index_file.write(line)
+                    index_file.flush()
+                    self._index[code_hash] = entry
+                    self._index_pos += len(line.encode("utf-8"))
+                finally:
+                    if fcntl: fcntl.flock(index_file, fcntl.LOCK_UN)
+        return code_hash
+
+    def _writable_segment(self, incoming):
+        segments = sorted(f for f in os.listdir(self.root) if f.endswith(".pack"))
+        if segments:
+            last = segments[-1]
+            if os.path.getsize(os.path.join(self.root, last)) + incoming <= self.segment_max_bytes:
+                return last
+        return f"segment_{len(segments):05d}.pack"
+
+    def get(self, code_hash):
+        with self._lock:
+            if code_hash not in self._index: self._refresh()
+            entry = self._index.get(code_hash)
+        if entry is None:
+            raise KeyError(f"Code {code_hash[:12]} not in store")
+        with open(os.path.join(self.root, entry["segment"]), "rb") as seg:
+            seg.seek(entry["offset"])
+            return zlib.decompress(seg.read(entry["length"])).decode("utf-8")
+
+    def export(self, refs, out_dir):
+        """Writes plain .py files; `refs` maps file stem -> code hash. Returns the paths written."""
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for stem, code_hash in refs.items():
+            path = os.path.join(out_dir, f"{stem}.py")
+            with open(path, "w") as f: f.write(self.get(code_hash))
+            paths.append(path)
+        return paths
+
+
+def record_code_refs(record):
+    """File stem -> hash for every round of a battle record (same names the old .py files used)."""
+    refs = {}
+    for round_tag, agents in (record.get("code_refs") or {}).items():
+        for agent, code_hash in agents.items():
+            refs[f"{record['battle_id']}_{round_tag}_{agent}"] = code_hash
+    return refs
+
+
+def hydrate_record(record, store):
+    """Fills `code` back into results that only carry `code_hash` (older records keep their inline code)."""
+    for res in record.get("results", []):
+        if "code" not in res and "code_hash" in res:
+            try: res["code"] = store.get(res["code_hash"])
+            except KeyError: res["code"] = "# code missing from store"
+    return record
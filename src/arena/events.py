@@ -0,0 +1,108 @@
+import asyncio
+import collections
+import threading
+import time
+
+
+class EventLog:
+    """
+    Bounded, multi-reader log of one battle's messages.
+
+    Publishing never blocks: the newest `capacity` events are kept in a ring and
+    each reader tracks its own cursor (the last event id it saw). A reader that
+    falls further behind than the ring skips ahead and is told how many events it
+    missed, so a slow client costs no memory and never stalls the orchestrator.
+    """
+
+    def __init__(self, capacity=2000):
+        self._events = collections.deque(maxlen=capacity)  # (event_id, message)
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self._async_waiters = set()  # Wake-up callbacks for coroutine readers
+        self.closed = False
+
+    @property
+    def last_id(self):
+        with self._cond:
+            return self._next_id - 1
+
+    def publish(self, message):
+        with self._cond:
+            self._events.append((self._next_id, message))
+            self._next_id += 1
+            self._cond.notify_all()
+            waiters = list(self._async_waiters)
+        for wake in waiters: wake()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+            waiters = list(self._async_waiters)
+        for wake in waiters: wake()
+
+    def read(self, after_id=0, max_batch=200, timeout=15.0, linger=0.05):
+        """
+        Returns (events, dropped): events with id > after_id, waiting up to `timeout`
+        for the first one and then `linger` seconds more so bursts arrive as one batch.
+        `dropped` counts events that already left the ring.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._next_id - 1 <= after_id and not self.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0: return [], 0
+                self._cond.wait(remaining)
+            linger_end = time.monotonic() + linger
+            while not self.closed and self._next_id - 1 - after_id < max_batch:
+                remaining = linger_end - time.monotonic()
+                if remaining <= 0: break
+                self._cond.wait(remaining)
+            oldest = self._events[0][0] if self._events else self._next_id
+            dropped = max(0, oldest - after_id - 1)
+            start = max(after_id + 1, oldest) - oldest
+            events = [self._events[i] for i in range(start, min(len(self._events), start + max_batch))]
+            return events, dropped
+
+    async def aread(self, after_id=0, max_batch=200, timeout=15.0, linger=0.05):
+        """Coroutine version of `read`: waiting costs no thread, only a pending future."""
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        def wake():
+            try: loop.call_soon_threadsafe(ready.set)
+            except RuntimeError: pass  # Loop already closed
+        with self._cond:
+            self._async_waiters.add(wake)
+        try:
+            if self.last_id <= after_id and not self.closed:
+                try: await asyncio.wait_for(ready.wait(), timeout)
+                except asyncio.TimeoutError: return [], 0
+            if linger and not self.closed: await asyncio.sleep(linger)
+            return self.read(after_id, max_batch, timeout=0, linger=0)
+        finally:
+            with self._cond:
+                self._async_waiters.discard(wake)
+
+    def is_drained(self, after_id):
+        with self._cond:
+            return self.closed and after_id >= self._next_id - 1
+
+
+def format_sse(events, dropped=0, stream_id=None):
+    """
+    One SSE message per batch; the client splits `data` on newlines.
+    The id is "<stream_id>:<event_id>" so a Last-Event-ID from another stream is ignored.
+    """
+    lines = [f"⚠️ {dropped} log line(s) skipped (client too slow)"] if dropped else []
+    for _, message in events:
+        lines.extend(str(message).splitlines() or [""])
+    payload = "".join(f"data: {line}\n" for line in lines)
+    event_id = f"{stream_id}:{events[-1][0]}" if stream_id else events[-1][0]
+    return f"id: {event_id}\n{payload}\n"
+
+
+def parse_last_event_id(value, stream_id=None):
+    if not value: return 0
+    prefix, _, number = str(value).rpartition(":")
+    if stream_id and prefix != str(stream_id): return 0
+    return int(number) if number.isdigit() else 0
@@ -0,0 +1,340 @@
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+# Durable job queue in one SQLite file (WAL mode), shared by any number of
+# worker processes on this host (WAL needs a local filesystem, not a network mount).
+# A claimed job is leased to its worker; the worker's heartbeat renews the
+# lease, and a job whose lease runs out (the worker died) goes back to the
+# queue until max_attempts is reached.
+# Payloads and results are pickled, like the local process pool's, so they
+# round-trip exactly (int dict keys, sets, tuples); only trusted processes on
+# this host share the queue file.
+
+DEFAULTS = {
+    "path": "output/queue.db",
+    "lease_s": 30.0,      # A running job without a heartbeat for this long is requeued
+    "heartbeat_s": 5.0,   # Workers renew their leases this often
+    "max_attempts": 3,    # Claims per job (crashed workers and handler errors both count)
+    "retry_delay_s": 2.0, # Backoff after a failed attempt, times the attempt number
+    "poll_s": 0.5,        # Idle workers and result waiters poll this often
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    batch TEXT,
+    key TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    heartbeat REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    result BLOB,
+    error TEXT,
+    created REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, not_before, id);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_key ON jobs (batch, key);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT,
+    pid INTEGER,
+    kinds TEXT,
+    started REAL,
+    heartbeat REAL,
+    job INTEGER,
+    done INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def open_queue(settings=None):
+    """JobQueue from a settings.yaml `queue` section."""
+    settings = settings or {}
+    return JobQueue(settings.get("path", DEFAULTS["path"]), **{k: settings.get(k) for k in DEFAULTS if k != "path"})
+
+
+def _dumps(value):
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _loads(blob):
+    return pickle.loads(blob) if blob is not None else None
+
+
+def new_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+
+
+class JobQueue:
+    """Enqueue/claim/complete over SQLite; every thread gets its own connection."""
+
+    def __init__(self, path=DEFAULTS["path"], **settings):
+        self.path = path
+        self.settings = {**DEFAULTS, **{k: v for k, v in settings.items() if v is not None}}
+        self._local = threading.local()
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db().executescript(SCHEMA)
+
+    def _db(self):
+        if not hasattr(self._local, "db"):
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return self._local.db
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same job
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        return db
+
+    def enqueue(self, kind, payload, batch=None, max_attempts=None, key=None):
+        """
+        Adds a job and returns its id. With a `key`, a job already queued under the
+        same (batch, key) is reused instead: queued, running and done jobs are left
+        alone, a failed one is queued again with fresh attempts.
+        """
+        blob = _dumps(payload)
+        db = self._transaction()
+        try:
+            row = db.execute("SELECT id, status FROM jobs WHERE batch IS ? AND key = ?", (batch, key)).fetchone() if key is not None else None
+            if row is None:
+                job_id = db.execute(
+                    "INSERT INTO jobs (kind, payload, batch, key, max_attempts, created) VALUES (?, ?, ?, ?, ?, ?)",
+                    (kind, blob, batch, key, max_attempts or self.settings["max_attempts"], time.time()),
+                ).lastrowid
+            else:
+                job_id = row["id"]
+                if row["status"] == "failed":
+                    db.execute("UPDATE jobs SET status = 'queued', payload = ?, attempts = 0, worker = NULL, not_before = 0, finished = NULL WHERE id = ?", (blob, job_id))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def claim(self, worker_id, kinds=None):
+        """Leases the oldest runnable job to `worker_id`; None when there is nothing to do."""
+        now = time.time()
+        db = self._transaction()
+        try:
+            self._requeue_expired(db, now)
+            query = "SELECT * FROM jobs WHERE status = 'queued' AND not_before <= ?"
+            args = [now]
+            if kinds:
+                query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+                args += list(kinds)
+            row = db.execute(query + " ORDER BY id LIMIT 1", args).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            db.execute("UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, heartbeat = ? WHERE id = ?", (worker_id, now, row["id"]))
+            db.execute("UPDATE workers SET job = ?, heartbeat = ? WHERE id = ?", (row["id"], now, worker_id))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        job = dict(row)
+        job["payload"] = _loads(job["payload"])
+        job["attempts"] += 1
+        return job
+
+    def _requeue_expired(self, db, now):
+        cutoff = now - self.settings["lease_s"]
+        expired = db.execute("SELECT id, worker, attempts, max_attempts FROM jobs WHERE status = 'running' AND heartbeat < ?", (cutoff,)).fetchall()
+        for row in expired:
+            error = f"worker {row['worker']} stopped sending heartbeats"
+            if row["attempts"] >= row["max_attempts"]:
+                db.execute("UPDATE jobs SET status = 'failed', error = ?, finished = ? WHERE id = ?", (error, now, row["id"]))
+            else:
+                db.execute("UPDATE jobs SET status = 'queued', worker = NULL, error = ? WHERE id = ?", (error, row["id"]))
+        return len(expired)
+
+    def complete(self, job_id, worker_id, result):
+        """
+        Stores the result; False if the lease was lost meanwhile (the job ran elsewhere).
+        Raises if the result cannot be pickled; the job is then still the worker's to fail.
+        """
+        cur = self._db().execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (_dumps(result), time.time(), job_id, worker_id),
+        )
+        self._db().execute("UPDATE workers SET job = NULL, done = done + 1 WHERE id = ?", (worker_id,))
+        return cur.rowcount == 1
+
+    def fail(self, job_id, worker_id, error, retry=True):
+        """Requeues the job with a backoff, or marks it failed once its attempts are used up."""
+        now = time.time()
+        db = self._transaction()
+        try:
+            row = db.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = 'running'", (job_id, worker_id)).fetchone()
+            if row is not None:
+                if retry and row["attempts"] < row["max_attempts"]:
+                    db.execute("UPDATE jobs SET status = 'queued', worker = NULL, error = ?, not_before = ? WHERE id = ?",
+                               (error, now + self.settings["retry_delay_s"] * row["attempts"], job_id))
+                else:
+                    db.execute("UPDATE jobs SET status = 'failed', error = ?, finished = ? WHERE id = ?", (error, now, job_id))
+            db.execute("UPDATE workers SET job = NULL WHERE id = ?", (worker_id,))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def register(self, worker_id, kinds=None):
+        now = time.time()
+        self._db().execute(
+            "INSERT OR REPLACE INTO workers (id, host, pid, kinds, started, heartbeat) VALUES (?, ?, ?, ?, ?, ?)",
+            (worker_id, socket.gethostname(), os.getpid(), ",".join(kinds or []), now, now),
+        )
+
+    def heartbeat(self, worker_id):
+        """Renews the worker's lease on its running job."""
+        now = time.time()
+        db = self._db()
+        db.execute("UPDATE workers SET heartbeat = ? WHERE id = ?", (now, worker_id))
+        db.execute("UPDATE jobs SET heartbeat = ? WHERE worker = ? AND status = 'running'", (now, worker_id))
+
+    def get(self, job_id):
+        row = self._db().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None: return None
+        job = dict(row)
+        job["payload"] = _loads(job["payload"])
+        job["result"] = _loads(job["result"])
+        return job
+
+    def finished(self, job_ids):
+        """{id: job} for the given ids that are done or failed."""
+        if not job_ids: return {}
+        found = {}
+        ids = list(job_ids)
+        for start in range(0, len(ids), 500):  # SQLite caps bound parameters
+            part = ids[start:start + 500]
+            rows = self._db().execute(
+                f"SELECT id, status, result, error, attempts, worker FROM jobs WHERE status IN ('done', 'failed') AND id IN ({', '.join('?' * len(part))})", part
+            ).fetchall()
+            for row in rows:
+                job = dict(row)
+                job["result"] = _loads(job["result"])
+                found[job["id"]] = job
+        return found
+
+    def wait(self, job_ids, timeout=None, on_done=None):
+        """Blocks until every job finished (or `timeout`); returns {id: job}. on_done(job) sees each as it lands."""
+        pending, done = set(job_ids), {}
+        deadline = time.time() + timeout if timeout else None
+        while pending:
+            for job_id, job in self.finished(pending).items():
+                pending.discard(job_id)
+                done[job_id] = job
+                if on_done: on_done(job)
+            if not pending or (deadline and time.time() > deadline): break
+            time.sleep(self.settings["poll_s"])
+        return done
+
+    def stats(self):
+        db = self._db()
+        counts = {row["status"]: row["n"] for row in db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")}
+        alive = time.time() - self.settings["lease_s"]
+        workers = [dict(row) for row in db.execute("SELECT * FROM workers WHERE heartbeat >= ? ORDER BY id", (alive,))]
+        return {"jobs": counts, "workers": workers}
+
+
+class QueuePool:
+    """
+    Drop-in for WorkerPool (benchmark/measure/outputs/analyze futures) that sends
+    sandbox jobs to queue workers instead of local processes. One poller thread
+    resolves the futures; `report()` tells which workers ran a battle's jobs.
+    """
+
+    other_cores = []  # Local inference keeps every core: the sandbox runs elsewhere
+
+    def __init__(self, queue, timeout=None):
+        self.queue = queue
+        self.timeout = timeout  # Wall-clock limit per job, covering time spent queued
+        self._lock = threading.Lock()
+        self._futures = {}  # job id -> (future, submitted at)
+        self._poller = None
+        self._jobs = []
+
+    def _submit(self, kind, payload):
+        job_id = self.queue.enqueue(kind, payload)
+        future = Future()
+        with self._lock:
+            self._futures[job_id] = (future, time.time())
+            self._jobs.append(job_id)
+            # The poller clears _poller under this lock before it exits, so no future is left unpolled
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="queue-poller", daemon=True)
+                self._poller.start()
+        return future
+
+    def _poll(self):
+        try:
+            while self._poll_once():
+                time.sleep(self.queue.settings["poll_s"])
+        except Exception as e:
+            # A broken queue fails the waiting futures instead of leaving them unresolved
+            with self._lock:
+                futures, self._futures, self._poller = self._futures, {}, None
+            for future, _ in futures.values(): future.set_exception(e)
+
+    def _poll_once(self):
+        """Resolves finished (and, with a timeout, overdue) futures; False once none are left."""
+        with self._lock:
+            pending = list(self._futures)
+            if not pending:
+                self._poller = None
+                return False
+        for job_id, job in self.queue.finished(pending).items():
+            with self._lock: future, _ = self._futures.pop(job_id)
+            if job["status"] == "done": future.set_result(job["result"])
+            else: future.set_exception(RuntimeError(f"queue job {job_id} failed: {job['error']}"))
+        if self.timeout:
+            now = time.time()
+            with self._lock:
+                late = [j for j, (_, started) in self._futures.items() if now - started > self.timeout]
+                for job_id in late:
+                    self._futures.pop(job_id)[0].set_exception(TimeoutError(f"queue job {job_id} not finished after {self.timeout}s"))
+        return True
+
+    def benchmark(self, code, test_input, expected_output, timeout=None, compare=None):
+        return self._submit("benchmark", {"code": code, "test_input": test_input, "expected_output": expected_output, "timeout": timeout, "compare": compare})
+
+    def measure(self, code, test_input, expected_output, timeout=None, compare=None):
+        return self._submit("measure", {"code": code, "test_input": test_input, "expected_output": expected_output, "timeout": timeout, "compare": compare})
+
+    def outputs(self, code, inputs, timeout=None, compare=None):
+        return self._submit("outputs", {"code": code, "inputs": inputs, "timeout": timeout, "compare": compare})
+
+    def analyze(self, code):
+        return self._submit("analyze", {"code": code})
+
+    def reset(self):
+        with self._lock: self._jobs = []
+
+    def report(self):
+        """Jobs since the last reset: how many, which workers ran them and how many attempts it took."""
+        with self._lock: ids = list(self._jobs)
+        jobs = self.queue.finished(ids).values()
+        workers = {}
+        for job in jobs:
+            if job["worker"]: workers[job["worker"]] = workers.get(job["worker"], 0) + 1
+        return {"queue": self.queue.path, "jobs": len(ids), "retries": sum(max(0, j["attempts"] - 1) for j in jobs), "workers": workers}
+
+    def shutdown(self):
+        pass
+
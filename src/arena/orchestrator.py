@@ -1,19 +1,93 @@
 import os
-import yaml
+import ast
+import math
+import collections
 import json
-import re
+import time
+import uuid
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from src.agents import Agent
-from src.judge.complexity import get_complexity_score
-from src.judge.execution import LocalSandbox
+from src.judge.workers import pool_from_settings
 from src.llm.llm_client import LocalLLM
+from src.llm.budget import budget_for, count_tokens
+from src.llm.scheduler import LocalModelScheduler
+from src.llm.structured import StructuredOutputError
 from src.judge.elo import EloSystem
+from src.judge.leaderboard import notify_battle
+from src.judge import regressions
+from src.arena.code_store import CodeStore
+from src.arena.job_queue import QueuePool, open_queue
+from src.judge.comparator import compact, is_fingerprint, options as comparator_options
+from src.judge.datasets import describe
+from src.judge.oracle import consensus, generate_inputs, infer_kind, save_cases
+from src.judge.evidence import compact_code, build_submissions, fit_evidence, render_evidence, chunk, expand_critiques, merge_verdicts
+
+def _parses(code):
+    try:
+        ast.parse(code)
+        return True
+    except (SyntaxError, ValueError):
+        return False
+
+def _llm_report(samples):
+    # Prompt size against latency, summed over the agent's samples (none for a defended champion)
+    usages = [s['usage'] for s in samples if s.get('usage')]
+    if not usages: return None
+    return {
+        "prompt_tokens": sum(u.get('prompt_tokens', 0) for u in usages),
+        "completion_tokens": sum(u.get('completion_tokens', 0) for u in usages),
+        "prompt_estimate": sum(u.get('prompt_estimate', 0) for u in usages),
+        "prompt_budget": usages[0].get('prompt_budget'),
+        "trimmed": sorted({t for u in usages for t in u.get('trimmed', [])}),
+        "wall_s": round(sum(s.get('wall_s', 0.0) for s in samples), 3),
+    }
+
+def _improved(before, after, min_improvement):
+    if after['success'] and not before['success']: return True
+    return bool(after['success'] and after['time'] > 0 and before['time'] / after['time'] - 1 > min_improvement)
+
+def _stored_output(value, comparator):
+    # Records keep small outputs as text (as always); big ones only as their fingerprint
+    value = compact(value, comparator)
+    return value if is_fingerprint(value) else str(value)
+
+def new_battle_id():
+    # Timestamp prefix keeps ids sortable; the suffix keeps parallel battles apart
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+TEST_CASE_SCHEMA = {"input": None, "output": None}
+VERDICT_SCHEMA = {"winner": str, "reasoning": str, "critiques": dict}
+JUDGE_INSTRUCTION = "\nIMPORTANT: You CANNOT pick a winner whose status is FAILED."
 
 class BattleArena:
-    def __init__(self, config_path="config/agents_config.yaml", log_callback=None):
+    worker_id = None # Set when a queue worker runs this arena
+
+    def __init__(self, config_path="config/agents_config.yaml", log_callback=None, settings_path="config/settings.yaml", pool=None):
         self.log_callback = log_callback
         self.config = self._load_config(config_path)
-        self.llm = LocalLLM()
+        self.settings = self._load_config(settings_path) if os.path.exists(settings_path) else {}
+        battle_settings = self.settings.get('battle_settings', {}) or {}
+        # Sandbox jobs run in local worker processes, or on queue workers (main.py worker) when configured
+        queue_settings = self.settings.get('queue', {}) or {}
+        if pool is None and queue_settings.get('sandbox_jobs'):
+            pool = QueuePool(open_queue(queue_settings), timeout=queue_settings.get('job_timeout'))
+        self.pool = pool or pool_from_settings(self.settings)
+        self.execution_timeout = battle_settings.get('execution_timeout')
+        self.samples = max(1, int(battle_settings.get('samples', 1))) # Best-of-N candidates per agent per round
+        self.sample_temperatures = battle_settings.get('sample_temperatures')
+        self.rounds = max(2, int(battle_settings.get('rounds', 2))) # Generation plus at least one refinement round
+        self.min_improvement = battle_settings.get('min_improvement', 0.05) # Relative runtime gain that counts as progress
+        self.oracle = self.settings.get('oracle', {}) or {}
+        self.comparator = comparator_options(self.settings.get('comparator'))
+        self.prompt_budget = self.settings.get('prompt_budget', {}) or {} # Prompt tokens per request kind
+        # Local inference gets only the cores the sandbox workers leave free
+        llm_settings = self.settings.get('llm_settings', {}) or {}
+        self.llm = LocalLLM(
+            local_options={"num_thread": len(self.pool.other_cores)} if self.pool.other_cores else None,
+            keep_alive=llm_settings.get('keep_alive'),
+        )
+        self.scheduler = LocalModelScheduler(self.llm, self.log)
         self.elo = EloSystem()
         
         self.agents = []
@@ -25,12 +99,13 @@ class BattleArena:
             role=judge_conf.get('role', 'Arbiter'),
             model=judge_conf.get('model', 'gpt-4o'),
             prompt_file=judge_conf.get('prompt_file', 'judge.txt'),
-            is_cloud=True
+            is_cloud=True,
+            llm=self.llm,
+            prompt_budget=self.prompt_budget
         )
 
-        self.code_dir = "output/generated_code"
+        self.code_store = CodeStore()
         self.log_dir = "output/battle_logs"
-        os.makedirs(self.code_dir, exist_ok=True)
         os.makedirs(self.log_dir, exist_ok=True)
 
     def log(self, message):
@@ -38,6 +113,7 @@ class BattleArena:
         if self.log_callback: self.log_callback(message)
 
     def _load_config(self, path):
+        import yaml
         with open(path, 'r') as f: return yaml.safe_load(f)
 
     def _initialize_agents(self):
@@ -47,7 +123,9 @@ class BattleArena:
                 role=agent_conf['role'],
                 model=agent_conf['model'],
                 prompt_file=agent_conf['prompt_file'],
-                is_cloud=False
+                is_cloud=False,
+                llm=self.llm,
+                prompt_budget=self.prompt_budget
             ))
 
     def generate_test_case(self, problem):
@@ -58,45 +136,65 @@ class BattleArena:
         CRITICAL: Output PURE JSON ONLY {{ "input": ..., "output": ... }}.
         'input' must be the RAW argument.
         """
-        for _ in range(2):
-            try:
-                response = self.llm.get_response("gpt-4o", "You are a JSON generator.", prompt, force_local=False)
-                match = re.search(r'\{[\s\S]*\}', response)
-                if match: return json.loads(match.group(0))['input'], json.loads(match.group(0))['output']
-            except: continue
-        self.log("❌ Architect failed. Using defaults.")
+        try:
+            case = self.llm.get_json("gpt-4o", "You are a JSON generator.", prompt, TEST_CASE_SCHEMA, force_local=False)
+            return case['input'], case['output']
+        except StructuredOutputError as e:
+            self.log(f"❌ Architect failed ({e}). Using defaults.")
         raise Exception("Architect failed.")
 
     # --- PHASE 1: GENERATION & JUDGEMENT ---
-    def run_phase_1(self, problem, test_input=None, expected_output=None):
-        battle_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    def run_phase_1(self, problem, test_input=None, expected_output=None, reference=None):
+        battle_id = new_battle_id()
         self.log(f"⚔️  NEW BATTLE STARTED (ID: {battle_id})")
         
-        if test_input is None or expected_output is None:
+        # Without an expected output, either the local oracle (after generation) or the Architect decides it
+        use_oracle = expected_output is None and self.oracle.get('enabled', False)
+        if (test_input is None or expected_output is None) and not use_oracle:
             test_input, expected_output = self.generate_test_case(problem)
+        # A huge expected output travels to the workers as its fingerprint
+        if expected_output is not None: expected_output = compact(expected_output, self.comparator)
             
         self.log(f"📝 PROBLEM: {problem}")
-        self.log(f"🧪 INPUT: {test_input}") 
-        self.log(f"🎯 EXPECTED: {expected_output}")
-        
-        sandbox = LocalSandbox()
-        log_buffer = [f"BATTLE ID: {battle_id}", f"PROBLEM: {problem}", f"INPUT: {test_input}", f"EXPECTED: {expected_output}\n"]
+        if not use_oracle:
+            self.log(f"🧪 INPUT: {describe(test_input)}") 
+            self.log(f"🎯 EXPECTED: {describe(expected_output)}")
         
         self.log("\n--- ROUND 1: GENERATION ---")
         round1_scores = []
         r1_codes = {}
+        code_refs = {"R1": {}}
+        pending = []
+        generated = []
+        oracle_report = None
+        self.scheduler.reset()
+        if isinstance(self.pool, QueuePool): self.pool.reset()
+
+        for agent in self.scheduler.order(self.agents):
+            self.log(f"🤖 {agent.name} is thinking..." + (f" ({self.samples} samples)" if self.samples > 1 else ""))
+            samples = self._sample(agent, lambda temperature, usage, agent=agent: agent.generate_solution(problem, temperature, usage))
+            if use_oracle:
+                generated.append((agent, samples))
+            else:
+                # Benchmark in the worker pool while the next agent is generating
+                pending.append(self._submit_benchmark(agent, samples, test_input, expected_output))
+
+        if use_oracle:
+            test_input, expected_output, oracle_report = self._consensus_case(problem, generated, test_input, reference)
+            for agent, samples in generated:
+                pending.append(self._submit_benchmark(agent, samples, test_input, expected_output))
 
-        for agent in self.agents:
-            self.log(f"🤖 {agent.name} is thinking...")
-            code = agent.generate_solution(problem)
-            r1_codes[agent.name] = code
-            self._save_code(battle_id, agent.name, "R1", code)
-            stats = self._benchmark_agent(agent, code, sandbox, test_input, expected_output)
+        log_buffer = [f"BATTLE ID: {battle_id}", f"PROBLEM: {problem}", f"INPUT: {describe(test_input)}", f"EXPECTED: {describe(expected_output)}\n"]
+
+        for job in pending:
+            stats = self._collect_benchmark(job)
             stats['round'] = 1
+            r1_codes[stats['agent']] = stats['code']
+            code_refs["R1"][stats['agent']] = self._save_code(stats['code'])
             round1_scores.append(stats)
             icon = "✅" if stats['success'] else "❌"
-            self.log(f"   ↳ {agent.name} | Time: {stats['time']:.6f}s | {icon}")
-            log_buffer.append(f"{agent.name}: {stats['msg']}")
+            self.log(f"   ↳ {stats['agent']} | Time: {stats['time']:.6f}s | {icon}")
+            log_buffer.append(f"{stats['agent']}: {stats['msg']}")
 
         self.log("\n⚖️  THE JUDGE IS DELIBERATING...")
         verdict = self._call_ai_judge(problem, round1_scores)
@@ -109,57 +207,55 @@ class BattleArena:
             "expected_output": expected_output,
             "round1_scores": round1_scores,
             "r1_codes": r1_codes,
+            "code_refs": code_refs,
             "log_buffer": log_buffer,
-            "verdict": verdict
+            "verdict": verdict,
+            "oracle": oracle_report
         }
 
     # --- PHASE 2: HUMAN INTERVENTION & REFINEMENT ---
     def run_phase_2(self, state, human_critiques={}):
+        """
+        Refinement rounds 2..`rounds`. Human critiques apply to the first one. After
+        each round only the agents whose code changed are judged again (with the
+        current pick for reference), and only they keep refining; the loop stops
+        early once no code changed or no runtime improved by more than `min_improvement`.
+        """
         battle_id = state['battle_id']
         problem = state['problem']
         verdict = state['verdict']
         judge_pick = verdict.get('winner', 'None')
-        critiques = verdict.get('critiques', {})
-        
-        sandbox = LocalSandbox()
-        
-        # Determine R1 Winner Stats safely
-        winner_stats = next((s for s in state['round1_scores'] if s['agent'] == judge_pick), state['round1_scores'][0])
+        critiques = dict(verdict.get('critiques', {}))
+        latest = {s['agent']: s for s in state['round1_scores']} # Latest stats (and code) per agent
+        active = set(latest)
+        code_refs = dict(state.get('code_refs', {}))
+        rounds = []
 
-        self.log("\n--- ROUND 2: REFINEMENT ---")
-        final_scores = []
+        for rnd in range(2, self.rounds + 1):
+            previous = dict(latest)
+            refined = self._refine_round(rnd, state, latest, judge_pick, critiques, human_critiques if rnd == 2 else {}, active, code_refs)
+            changed = [name for name in refined if compact_code(latest[name]['code'] or "") != compact_code(previous[name]['code'] or "")]
+            improved = [name for name in changed if _improved(previous[name], latest[name], self.min_improvement)]
+            entry = {"round": rnd, "pick": judge_pick, "refined": refined, "changed": changed, "improved": improved}
+            rounds.append(entry)
+            if rnd == self.rounds: break
+            if not changed:
+                self.log("🧊 Converged: no agent changed its code.")
+                break
+            if not improved:
+                self.log(f"🧊 Converged: no runtime gain above {self.min_improvement:.0%}.")
+                break
+            # Re-judge only what changed; the current pick stays in as the yardstick
+            rejudge = [latest[name] for name in latest if name in changed or name == judge_pick]
+            round_verdict = self._call_ai_judge(problem, rejudge)
+            judge_pick = round_verdict.get('winner') or judge_pick
+            critiques.update(round_verdict.get('critiques', {}))
+            active = set(changed) | {s['agent'] for s in rejudge}
+            entry["rejudged"] = [s['agent'] for s in rejudge]
+            self.log(f"👑 JUDGE'S PICK: {judge_pick}")
 
-        for agent in self.agents:
-            if agent.name == judge_pick:
-                self.log(f"🏆 {agent.name} defends the throne.")
-                new_code = winner_stats['code']
-            else:
-                ai_critique = critiques.get(agent.name, "Optimize code.")
-                human_note = human_critiques.get(agent.name, "")
-                
-                # Construct combined critique
-                combined_critique = ai_critique
-                
-                self.log(f"🤔 {agent.name} is fixing:")
-                
-                # --- FIX: Log detailed critique separately ---
-                self.log(f"    → AI: \"{ai_critique}\"")
-                
-                if human_note:
-                    combined_critique += f"\n\n HUMAN INTERVENTION: {human_note}"
-                    self.log(f"    → ⚠️ HUMAN: \"{human_note}\"")
-                
-                new_code = agent.refine_solution_with_critique(
-                    problem, state['r1_codes'][agent.name], winner_stats['code'], combined_critique
-                )
-
-            self._save_code(battle_id, agent.name, "R2", new_code)
-            stats = self._benchmark_agent(agent, new_code, sandbox, state['test_input'], state['expected_output'])
-            stats['round'] = 2
-            
-            icon = "✅" if stats['success'] else "❌"
-            self.log(f"   ↳ {agent.name} | Time: {stats['time']:.6f}s | {icon}")
-            final_scores.append(stats)
+        final_scores = list(latest.values())
+        state['rounds'] = rounds
 
         # Final Calculations
         final_scores.sort(key=lambda x: (not x['success'], x['time']))
@@ -171,41 +267,305 @@ class BattleArena:
             agent_names = [a.name for a in self.agents]
             self.elo.update_ratings(agent_names, true_champion)
 
-        self._save_json(battle_id, problem, final_scores, state['log_buffer'], verdict, state['test_input'], state['expected_output'], true_champion)
+        for model, t in self.scheduler.report().items():
+            self.log(f"⏱️  {model}: load {t['load_s']:.2f}s, generation {t['generate_s']:.2f}s over {t['calls']} call(s)")
+
+        record = self._save_json(battle_id, problem, final_scores, state['log_buffer'], verdict, state['test_input'], state['expected_output'], true_champion, code_refs, state.get('oracle'), rounds)
+        notify_battle(record)
+        regressions.notify_battle(record)
         return final_scores
 
-    def _save_json(self, battle_id, problem_text, scoreboard, log_buffer, verdict, inp, out, champion):
+    def _refine_round(self, rnd, state, latest, judge_pick, critiques, human_critiques, active, code_refs):
+        """
+        One refinement round; updates `latest` in place and returns the agents that
+        were asked to refine. The pick defends, settled agents and code that comes
+        back unchanged keep their previous measurement instead of a new benchmark.
+        """
+        problem = state['problem']
+        winner_stats = latest.get(judge_pick) or next(iter(latest.values()))
+        self.log(f"\n--- ROUND {rnd}: REFINEMENT ---")
+        code_refs[f"R{rnd}"] = {}
+        pending, refined = [], []
+
+        for agent in self.scheduler.order(self.agents):
+            if agent.name == judge_pick:
+                self.log(f"🏆 {agent.name} defends the throne.")
+                continue
+            if agent.name not in active:
+                self.log(f"💤 {agent.name} has settled.")
+                continue
+            ai_critique = critiques.get(agent.name, "Optimize code.")
+            human_note = human_critiques.get(agent.name, "")
+            
+            # Construct combined critique
+            combined_critique = ai_critique
+            
+            self.log(f"🤔 {agent.name} is fixing:")
+            
+            # --- FIX: Log detailed critique separately ---
+            self.log(f"    → AI: \"{ai_critique}\"")
+            
+            if human_note:
+                combined_critique += f"\n\n HUMAN INTERVENTION: {human_note}"
+                self.log(f"    → ⚠️ HUMAN: \"{human_note}\"")
+            
+            prev_code = latest[agent.name]['code']
+            samples = self._sample(agent, lambda temperature, usage, agent=agent, prev_code=prev_code, critique=combined_critique: agent.refine_solution_with_critique(
+                problem, prev_code, winner_stats['code'], critique, temperature, usage
+            ))
+            refined.append(agent.name)
+            if all(compact_code(s['code'] or "") == compact_code(prev_code or "") for s in samples):
+                self.log(f"   ↳ {agent.name} | unchanged code, measurement reused")
+                continue
+            pending.append(self._submit_benchmark(agent, samples, state['test_input'], state['expected_output']))
+
+        for job in pending:
+            stats = self._collect_benchmark(job)
+            stats['round'] = rnd
+            latest[stats['agent']] = stats
+            
+            icon = "✅" if stats['success'] else "❌"
+            self.log(f"   ↳ {stats['agent']} | Time: {stats['time']:.6f}s | {icon}")
+        for name, stats in latest.items():
+            code_refs[f"R{rnd}"][name] = self._save_code(stats['code'])
+        return refined
+
+    def _save_json(self, battle_id, problem_text, scoreboard, log_buffer, verdict, inp, out, champion, code_refs=None, oracle=None, rounds=None):
+        # Code lives in the code store; records reference it by hash
+        results = []
+        for res in scoreboard:
+            entry = {k: v for k, v in res.items() if k != 'code'}
+            entry['code_hash'] = self.code_store.put(res['code'])
+            results.append(entry)
         json_path = os.path.join(self.log_dir, f"{battle_id}_data.json")
         data = {
             "battle_id": battle_id,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "problem": problem_text,
             "test_input": str(inp),
-            "expected_output": str(out),
+            "expected_output": _stored_output(out, self.comparator),
             "champion": champion,
             "log_lines": log_buffer,
-            "results": scoreboard,
-            "judge_verdict": verdict
+            "results": results,
+            "code_refs": code_refs or {},
+            "judge_verdict": verdict,
+            "oracle": oracle,
+            "rounds": rounds or [],
+            "ratings": {a.name: self.elo.get_rating(a.name) for a in self.agents},
+            "model_timings": self.scheduler.report()
         }
-        with open(json_path, "w") as f: json.dump(data, f, indent=4)
+        if isinstance(self.pool, QueuePool): data["queue"] = self.pool.report()
+        if self.worker_id: data["worker"] = self.worker_id
+        # Written under a temp name, so readers in other processes only see complete records
+        with open(json_path + ".tmp", "w") as f: json.dump(data, f, indent=4)
+        os.replace(json_path + ".tmp", json_path)
+        return data
 
     def _call_ai_judge(self, problem, results):
-        evidence = f"PROBLEM: {problem}\n\n"
-        for res in results:
-            evidence += f"AGENT: {res['agent']}\nSTATUS: {'Success' if res['success'] else 'FAILED'}\nTIME: {res['time']:.6f}s\nCODE:\n{res['code']}\n\n"
-        instruction = "\nIMPORTANT: You CANNOT pick a winner who has STATUS: FAILED."
-        response = self.judge.llm.get_response(self.judge.model, self.judge.personality + instruction, evidence, force_local=False)
+        submissions = build_submissions(results)
+        if len(submissions) < len(results):
+            self.log(f"   ↳ {len(results) - len(submissions)} duplicate submission(s) merged for the judge")
+        return self._judge_submissions(problem, submissions)
+
+    def _judge_submissions(self, problem, submissions):
+        # Large rosters are judged in parallel chunks, then the chunk winners face off
+        # A roster whose evidence exceeds the token budget is split too, rather than cut down
+        batch_size = max(2, self.config.get('judge', {}).get('batch_size', 4))
+        budget = budget_for("judge", self.prompt_budget)
+        fits = len(submissions) <= 2 or not budget or self._judge_tokens(render_evidence(problem, submissions)) <= budget
+        if len(submissions) <= batch_size and fits:
+            return self._judge_once(problem, submissions)
+
+        groups = chunk(submissions, batch_size if len(submissions) > batch_size else math.ceil(len(submissions) / 2))
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            verdicts = list(pool.map(lambda group: self._judge_submissions(problem, group), groups))
+
+        finalists = []
+        for group, verdict in zip(groups, verdicts):
+            pick = next((sub for sub in group if verdict.get('winner') in sub['agents'] and sub['status'] == "Success"), None)
+            if pick: finalists.append((pick, verdict))
+        if not finalists:
+            return merge_verdicts(verdicts, {"winner": None, "reasoning": "No passing submission."})
+        if len(finalists) == 1:
+            return merge_verdicts(verdicts, finalists[0][1])
+        return merge_verdicts(verdicts, self._judge_submissions(problem, [sub for sub, _ in finalists]))
+
+    def _judge_tokens(self, text):
+        return count_tokens(text, self.judge.model, cloud=True)
+
+    def _judge_once(self, problem, submissions):
+        system_prompt = self.judge.personality + JUDGE_INSTRUCTION
+        budget = budget_for("judge", self.prompt_budget)
+        evidence, trimmed = fit_evidence(problem, submissions, budget, self._judge_tokens, self._judge_tokens(system_prompt))
+        if trimmed: self.log(f"   ✂️ Judge evidence trimmed to {budget} tokens: {', '.join(trimmed)}")
+        passing = {agent for sub in submissions if sub['status'] == "Success" for agent in sub['agents']}
+        def check(verdict):
+            if passing and verdict.get('winner') not in passing:
+                return [f"'winner' must be one of {sorted(passing)}"]
+            return []
+        usage = {"prompt_estimate": self._judge_tokens(system_prompt + evidence)}
+        start = time.perf_counter()
         try:
-            return json.loads(response.replace("```json", "").replace("```", "").strip())
-        except:
-            return {"winner": results[0]['agent'], "reasoning": "Judge Error", "critiques": {}}
+            verdict = self.judge.llm.get_json(self.judge.model, system_prompt, evidence, VERDICT_SCHEMA, force_local=False, check=check, usage=usage)
+            verdict['critiques'] = expand_critiques(verdict['critiques'], submissions)
+            return verdict
+        except StructuredOutputError as e:
+            self.log(f"⚠️ Judge reply unusable: {e}")
+            fallback = next((sub for sub in submissions if sub['status'] == "Success"), submissions[0])
+            return {"winner": fallback['agents'][0], "reasoning": "Judge Error", "critiques": {}}
+        finally:
+            self.scheduler.record(self.judge, usage, time.perf_counter() - start)
 
-    def _save_code(self, battle_id, agent_name, round_tag, code):
-        filename = f"{battle_id}_{round_tag}_{agent_name}.py"
-        with open(os.path.join(self.code_dir, filename), "w") as f: f.write(code)
+    def _save_code(self, code):
+        return self.code_store.put(code)
 
-    def _benchmark_agent(self, agent, code, sandbox, test_input, expected_output):
-        comp_score = get_complexity_score(code)
-        exec_time, success, message = sandbox.run_benchmark(code, test_input, expected_output)
+    def _consensus_case(self, problem, generated, test_input=None, reference=None):
+        """
+        Local differential testing: every agent's first parseable candidate (and the
+        reference, if given) runs on seeded inputs of the inferred type, and the
+        expected output is the reference's or the majority's. The largest decided
+        case becomes the benchmark; all decided cases are added to the problem's test set.
+        Falls back to the Architect when nothing is decided.
+        """
+        codes = {}
+        for agent, samples in generated:
+            codes[agent.name] = next((s['code'] for s in samples if _parses(s['code'])), samples[0]['code'])
+        kind = "given" if test_input is not None else infer_kind(codes.values())
+        inputs = [test_input] if test_input is not None else generate_inputs(kind, self.oracle.get('cases', 5), self.oracle.get('seed', 0))
+        self.log(f"🗳️  Oracle: running {len(codes)} submission(s){' and the reference' if reference else ''} on {len(inputs)} {kind} input(s)")
+
+        futures = {name: self.pool.outputs(code, inputs, self.execution_timeout, self.comparator) for name, code in codes.items()}
+        ref_future = self.pool.outputs(reference, inputs, self.execution_timeout, self.comparator) if reference else None
+        outputs = {}
+        for name, future in futures.items():
+            try: outputs[name] = future.result()
+            except Exception as e: outputs[name] = [(False, f"Worker Error: {e}")] * len(inputs)
+        ref_outputs = None
+        if ref_future:
+            try: ref_outputs = ref_future.result()
+            except Exception as e: self.log(f"⚠️ Reference solution failed to run: {e}")
+
+        decided = consensus(outputs, ref_outputs, self.oracle.get('min_agreement', 0.5), self.comparator)
+        cases = [{"input": inp, "output": d['output'], "source": d['source'], "votes": d['votes'], "voters": d['voters']}
+                 for inp, d in zip(inputs, decided) if d]
+        if not cases:
+            self.log("❌ Oracle: no agreement on any input, asking the Architect.")
+            return (*self.generate_test_case(problem), {"kind": kind, "cases": 0, "fallback": "architect"})
+
+        dissent = collections.Counter(agent for d in decided if d for agent in d['dissent'])
+        for agent, n in dissent.items():
+            self.log(f"   ↳ {agent} disagreed on {n}/{len(cases)} case(s)")
+        _, added = save_cases(problem, cases, self.oracle.get('test_set_dir', "output/test_sets"))
+        if added: self.log(f"   ↳ {added} new case(s) added to the problem's test set")
+        primary = cases[-1]
+        self.log(f"🧪 INPUT: {describe(primary['input'])}")
+        self.log(f"🎯 EXPECTED: {describe(primary['output'])} ({primary['source']}, {primary['votes']}/{primary['voters']} agree)")
+        report = {"kind": kind, "cases": len(cases), "inputs": len(inputs), "source": primary['source'], "dissent": dict(dissent)}
+        return primary['input'], primary['output'], report
+
+    def _temperatures(self):
+        if self.samples <= 1: return [None] # Backend default, exactly as a single call always was
+        if self.sample_temperatures: return [self.sample_temperatures[i % len(self.sample_temperatures)] for i in range(self.samples)]
+        return [round(0.2 + 0.8 * i / (self.samples - 1), 2) for i in range(self.samples)]
+
+    def _sample(self, agent, call):
+        """
+        call(temperature, usage) -> code, run once or `samples` times concurrently
+        at spread temperatures. Returns sample dicts (code, temperature, wall_s, usage).
+        """
+        self.scheduler.warm(agent)
+        def one(temperature):
+            usage = {}
+            start = time.perf_counter()
+            code = call(temperature, usage)
+            wall_s = time.perf_counter() - start
+            self.scheduler.record(agent, usage, wall_s)
+            return {"code": code, "temperature": temperature, "wall_s": wall_s, "usage": usage}
+        temperatures = self._temperatures()
+        if len(temperatures) == 1: return [one(temperatures[0])]
+        with ThreadPoolExecutor(max_workers=len(temperatures)) as pool:
+            futures = [pool.submit(one, t) for t in temperatures]
+        samples = []
+        for future in futures:
+            try: samples.append(future.result())
+            except Exception as e: self.log(f"   ⚠️ {agent.name}: a sample failed ({e})")
+        if not samples: return [futures[0].result()] # Every sample failed: surface the error as before
+        return samples
+
+    def _submit_benchmark(self, agent, samples, test_input, expected_output):
+        # Compile and dedup first; only distinct, parseable candidates reach the pool
+        candidates, seen = [], set()
+        for sample in samples:
+            try:
+                ast.parse(sample['code'])
+            except (SyntaxError, ValueError):
+                sample['status'] = "syntax_error"
+                continue
+            key = compact_code(sample['code'])
+            if key in seen:
+                sample['status'] = "duplicate"
+                continue
+            seen.add(key)
+            candidates.append(sample)
+        if not candidates: candidates = samples[:1] # Nothing parses: let the sandbox report the error
+        for sample in candidates:
+            # Static analysis and the timed run proceed side by side in the pool
+            sample['analysis'] = self.pool.analyze(sample['code'])
+            sample['bench'] = self.pool.measure(sample['code'], test_input, expected_output, self.execution_timeout, self.comparator)
+        return agent.name, samples, candidates
+
+    def _collect_benchmark(self, job):
+        agent_name, samples, candidates = job
+        for sample in candidates:
+            try:
+                sample['result'] = sample['bench'].result()
+            except Exception as e:
+                sample['result'] = (float('inf'), False, f"Worker Error: {e}", None)
+            sample['status'] = "passed" if sample['result'][1] else "failed"
+        # Best passing candidate (fastest), otherwise the first one
+        best = min(candidates, key=lambda c: (not c['result'][1], c['result'][0] if c['result'][1] else 0))
+        exec_time, success, message, noise = best['result']
+        code = best['code']
+        try:
+            analysis = best['analysis'].result()
+        except Exception as e:
+            analysis = {"score": 100, "error": str(e)}
         if exec_time == float('inf'): exec_time = 999.0
-        return {"agent": agent.name, "complexity": comp_score, "time": exec_time, "success": success, "msg": message, "code": code}
\ No newline at end of file
+        metrics = {k: v for k, v in analysis.items() if k != 'score'}
+        for flag in metrics.get('red_flags', []):
+            self.log(f"   ⚠️ {agent_name}: {flag}")
+        if noise and noise['noisy']:
+            self.log(f"   📉 {agent_name}: noisy timing after {noise['attempts']} attempt(s) ({', '.join(noise['reasons'])})")
+        stats = {"agent": agent_name, "complexity": analysis['score'], "metrics": metrics, "time": exec_time, "success": success, "msg": message, "code": code, "noise": noise}
+        llm = _llm_report(samples)
+        if llm:
+            stats['llm'] = llm
+            if llm['trimmed']: self.log(f"   ✂️ {agent_name}: prompt trimmed to {llm['prompt_budget']} tokens ({'; '.join(llm['trimmed'])})")
+        if len(samples) > 1:
+            best['status'] = "selected"
+            stats['sampling'] = self._sampling_report(samples)
+            s = stats['sampling']
+            self.log(f"   🎲 {agent_name}: {s['n']} samples, {s['unique']} unique, {s['passing']} passing ({s['llm_wall_s']:.1f}s LLM)")
+        return stats
+
+    def _sampling_report(self, samples):
+        """Per-sample cost accounting for tuning N against throughput."""
+        rows = []
+        for sample in samples:
+            usage = sample.get('usage') or {}
+            result = sample.get('result')
+            rows.append({
+                "temperature": sample.get('temperature'),
+                "status": sample.get('status'),
+                "time": result[0] if result and result[1] else None,
+                "wall_s": round(sample.get('wall_s', 0.0), 3),
+                "tokens": usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0),
+            })
+        return {
+            "n": len(rows),
+            "unique": sum(r['status'] not in ("duplicate", "syntax_error") for r in rows),
+            "passing": sum(r['status'] in ("passed", "selected") for r in rows),
+            "llm_wall_s": round(sum(r['wall_s'] for r in rows), 3),
+            "tokens": sum(r['tokens'] for r in rows),
+            "samples": rows,
+        }
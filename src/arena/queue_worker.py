@@ -0,0 +1,129 @@
+import pickle
+import sqlite3
+import threading
+import time
+from src.arena.batch import run_battle
+from src.arena.job_queue import new_worker_id
+
+KINDS = ("battle", "benchmark", "measure", "outputs", "analyze")
+
+
+class QueueWorker:
+    """
+    Consumes jobs from a JobQueue: whole battles (run here, record written to the
+    shared battle logs) and single sandbox jobs sent by arenas whose settings have
+    queue.sandbox_jobs. A background thread renews the leases every heartbeat_s;
+    if this process dies, its job is requeued once the lease runs out.
+    """
+
+    def __init__(self, queue, worker_id=None, kinds=None, settings=None, arena_factory=None, pool=None, log=print):
+        self.queue = queue
+        self.worker_id = worker_id or new_worker_id()
+        self.kinds = list(kinds or KINDS)
+        self.settings = settings or {}
+        self.arena_factory = arena_factory or _default_arena
+        self.log = log
+        self._pool = pool
+        self._arena = None
+        self._stop = threading.Event()
+
+    def pool(self):
+        # Sandbox jobs always run in this host's own worker processes, never back onto the queue
+        if self._pool is None:
+            from src.judge.workers import pool_from_settings
+            self._pool = pool_from_settings(self.settings)
+        return self._pool
+
+    def arena(self):
+        if self._arena is None:
+            self._arena = self.arena_factory(self.pool())
+            self._arena.worker_id = self.worker_id
+        return self._arena
+
+    def stop(self):
+        """Finishes the current job, then returns from run()."""
+        self._stop.set()
+
+    def run(self, max_jobs=None, idle_exit=None):
+        """Claims and runs jobs until stopped, `max_jobs` ran or the queue stayed empty for `idle_exit` seconds."""
+        self.queue.register(self.worker_id, self.kinds)
+        beat = threading.Thread(target=self._beat, name="queue-heartbeat", daemon=True)
+        beat.start()
+        self.log(f"👷 Worker {self.worker_id} ready for {', '.join(self.kinds)} jobs on {self.queue.path}")
+        done, idle_since = 0, time.time()
+        try:
+            while not self._stop.is_set():
+                job = self.queue.claim(self.worker_id, self.kinds)
+                if job is None:
+                    if idle_exit is not None and time.time() - idle_since > idle_exit: break
+                    self._stop.wait(self.queue.settings["poll_s"])
+                    continue
+                self._run(job)
+                done += 1
+                idle_since = time.time()
+                if max_jobs and done >= max_jobs: break
+        finally:
+            self._stop.set()
+        self.log(f"👷 Worker {self.worker_id} stopped after {done} job(s)")
+        return done
+
+    def _run(self, job):
+        start = time.perf_counter()
+        label = f"[{job['kind']} #{job['id']}, attempt {job['attempts']}]"
+        try:
+            result = HANDLERS[job['kind']](self, job['payload'])
+        except KeyboardInterrupt:
+            self.queue.fail(job['id'], self.worker_id, "worker interrupted")
+            raise
+        except Exception as e:
+            self.queue.fail(job['id'], self.worker_id, f"{type(e).__name__}: {e}")
+            self.log(f"❌ {label} {type(e).__name__}: {e}")
+            return
+        try:
+            completed = self.queue.complete(job['id'], self.worker_id, result)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # Retrying would produce the same result object
+            self.queue.fail(job['id'], self.worker_id, f"Unserializable result: {e}", retry=False)
+            self.log(f"❌ {label} result cannot be stored: {e}")
+            return
+        if completed:
+            self.log(f"✅ {label} done in {time.perf_counter() - start:.2f}s")
+        else:
+            self.log(f"⚠️ {label} lease lost while running; result discarded")
+
+    def _beat(self):
+        while not self._stop.wait(self.queue.settings["heartbeat_s"]):
+            try:
+                self.queue.heartbeat(self.worker_id)
+            except sqlite3.Error as e:
+                self.log(f"⚠️ Heartbeat failed: {e}")
+
+
+def _battle(worker, payload):
+    problem = {"id": payload.get("id"), "problem": payload["problem"], "input": payload.get("input"),
+               "output": payload.get("output"), "reference": payload.get("reference")}
+    return {**run_battle(worker.arena(), problem, payload.get("policy", "auto")), "worker": worker.worker_id}
+
+
+def _benchmark(worker, payload):
+    return worker.pool().benchmark(payload["code"], payload["test_input"], payload["expected_output"], payload.get("timeout"), payload.get("compare")).result()
+
+
+def _measure(worker, payload):
+    return worker.pool().measure(payload["code"], payload["test_input"], payload["expected_output"], payload.get("timeout"), payload.get("compare")).result()
+
+
+def _outputs(worker, payload):
+    return worker.pool().outputs(payload["code"], payload["inputs"], payload.get("timeout"), payload.get("compare")).result()
+
+
+def _analyze(worker, payload):
+    return worker.pool().analyze(payload["code"]).result()
+
+
+HANDLERS = {"battle": _battle, "benchmark": _benchmark, "measure": _measure, "outputs": _outputs, "analyze": _analyze}
+
+
+def _default_arena(pool):
+    from src.arena.orchestrator import BattleArena
+    return BattleArena(pool=pool)
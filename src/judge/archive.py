@@ -0,0 +1,182 @@
+import csv
+import json
+import os
+from src.judge.regressions import problem_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Optional: CSV is written instead
+    pa = None
+
+# Columnar export of output/battle_logs for analytics. Every run appends one part
+# file per table (<out>/<table>/part-NNNNN.<ext>), so readers load a table with a
+# glob (pandas, polars, duckdb: "<out>/results/*.parquet"). Battles already
+# exported are listed in <out>/_export_state.json and skipped by file name,
+# without being parsed again.
+
+SCHEMAS = {
+    "battles": [
+        ("battle_id", "string"), ("timestamp", "string"), ("problem_key", "string"), ("problem", "string"),
+        ("test_input", "string"), ("expected_output", "string"), ("champion", "string"), ("judge_winner", "string"),
+        ("oracle_source", "string"), ("agents", "int64"), ("passed", "int64"), ("best_time", "float64"),
+        ("rounds", "int64"),
+    ],
+    "results": [
+        ("battle_id", "string"), ("timestamp", "string"), ("problem_key", "string"), ("agent", "string"),
+        ("round", "int64"), ("success", "bool"), ("time", "float64"), ("complexity", "float64"), ("msg", "string"),
+        ("code_hash", "string"), ("noisy", "bool"), ("samples", "int64"), ("champion", "bool"),
+        ("prompt_tokens", "int64"), ("completion_tokens", "int64"), ("llm_wall_s", "float64"),
+    ],
+    "rating_events": [
+        ("battle_id", "string"), ("timestamp", "string"), ("agent", "string"), ("rating", "float64"),
+        ("delta", "float64"), ("won", "bool"),
+    ],
+}
+FORMATS = ("parquet", "arrow", "csv")
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+STATE_FILE = "_export_state.json"
+
+
+def resolve_format(fmt="auto"):
+    if fmt == "auto": return "parquet" if pa is not None else "csv"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected auto or one of {', '.join(FORMATS)})")
+    if fmt != "csv" and pa is None:
+        raise ValueError(f"Format '{fmt}' needs pyarrow (pip install pyarrow); use csv instead")
+    return fmt
+
+
+def rows(record, last_ratings):
+    """
+    Flattens one battle record into {table: [row, ...]}. `last_ratings` (agent ->
+    rating) gives rating deltas and is updated in place.
+    """
+    battle_id, timestamp = record.get("battle_id"), record.get("timestamp")
+    key = problem_key(record["problem"], record.get("test_input")) if record.get("problem") else None
+    results = record.get("results", [])
+    champion = record.get("champion")
+    passing = [r.get("time") for r in results if r.get("success")]
+    expected = record.get("expected_output")
+    battle = {
+        "battle_id": battle_id, "timestamp": timestamp, "problem_key": key, "problem": record.get("problem"),
+        "test_input": _text(record.get("test_input")), "expected_output": _text(expected),
+        "champion": champion, "judge_winner": (record.get("judge_verdict") or {}).get("winner"),
+        "oracle_source": (record.get("oracle") or {}).get("source"),
+        "agents": len(results), "passed": len(passing), "best_time": min(passing) if passing else None,
+        "rounds": 1 + len(record.get("rounds") or [{}]),  # Records before multi-round battles had exactly two
+    }
+    result_rows = [{
+        "battle_id": battle_id, "timestamp": timestamp, "problem_key": key, "agent": r.get("agent"),
+        "round": r.get("round"), "success": bool(r.get("success")), "time": r.get("time"),
+        "complexity": r.get("complexity"), "msg": r.get("msg"), "code_hash": r.get("code_hash"),
+        "noisy": bool((r.get("noise") or {}).get("noisy")), "samples": (r.get("sampling") or {}).get("n", 1),
+        "champion": r.get("agent") == champion,
+        "prompt_tokens": (r.get("llm") or {}).get("prompt_tokens"), "completion_tokens": (r.get("llm") or {}).get("completion_tokens"),
+        "llm_wall_s": (r.get("llm") or {}).get("wall_s"),
+    } for r in results]
+    events = []
+    for agent, rating in sorted((record.get("ratings") or {}).items()):
+        previous = last_ratings.get(agent)
+        last_ratings[agent] = rating
+        events.append({"battle_id": battle_id, "timestamp": timestamp, "agent": agent, "rating": rating,
+                       "delta": rating - previous if previous is not None else None, "won": agent == champion})
+    return {"battles": [battle], "results": result_rows, "rating_events": events}
+
+
+def _text(value):
+    if value is None or isinstance(value, str): return value
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class ArchiveExporter:
+    """
+    Converts battle records to columnar tables, `batch_size` records per part file
+    so memory stays bounded however large the archive is. The state file is
+    rewritten after every part, so an interrupted export resumes where it stopped.
+    """
+
+    def __init__(self, log_dir="output/battle_logs", out_dir="output/analytics", fmt="auto", batch_size=5000, log=print):
+        self.log_dir = log_dir
+        self.out_dir = out_dir
+        self.fmt = resolve_format(fmt)
+        self.batch_size = max(1, batch_size)
+        self.log = log
+        self.state = self._load_state()
+        if self.state.setdefault("format", self.fmt) != self.fmt:
+            raise ValueError(f"{out_dir} already holds {self.state['format']} parts; export {self.fmt} to another directory")
+
+    def _state_path(self):
+        return os.path.join(self.out_dir, STATE_FILE)
+
+    def _load_state(self):
+        try:
+            with open(self._state_path(), "r", encoding="utf-8") as f: state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("exported", [])
+        state.setdefault("parts", 0)
+        state.setdefault("last_ratings", {})
+        return state
+
+    def _save_state(self):
+        tmp = self._state_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(self.state, f)
+        os.replace(tmp, self._state_path())
+
+    def pending(self):
+        """Record paths not exported yet, oldest first (battle ids sort by time)."""
+        if not os.path.isdir(self.log_dir): return []
+        done = set(self.state["exported"])
+        names = sorted(e.name for e in os.scandir(self.log_dir) if e.name.endswith("_data.json"))
+        return [os.path.join(self.log_dir, n) for n in names if n[:-len("_data.json")] not in done]
+
+    def run(self):
+        """Exports every new battle; returns {"battles", "parts", "skipped", "format"}."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        paths = self.pending()
+        counts = {"battles": 0, "parts": 0, "skipped": 0, "format": self.fmt}
+        for start in range(0, len(paths), self.batch_size):
+            tables = {name: [] for name in SCHEMAS}
+            ids = []
+            for path in paths[start:start + self.batch_size]:
+                try:
+                    with open(path, "r", encoding="utf-8") as f: record = json.load(f)
+                except (OSError, ValueError):
+                    counts["skipped"] += 1
+                    continue
+                record.setdefault("battle_id", os.path.basename(path)[:-len("_data.json")])
+                for name, table_rows in rows(record, self.state["last_ratings"]).items():
+                    tables[name].extend(table_rows)
+                ids.append(record["battle_id"])
+            if not ids: continue
+            part = self.state["parts"]
+            for name, table_rows in tables.items():
+                if table_rows: self._write(name, part, table_rows)
+            self.state["parts"] = part + 1
+            self.state["exported"].extend(ids)
+            self._save_state()
+            counts["battles"] += len(ids)
+            counts["parts"] += 1
+        self.log(f"📊 Exported {counts['battles']} battle(s) in {counts['parts']} part(s) as {self.fmt} to {self.out_dir}"
+                 + (f" ({counts['skipped']} unreadable skipped)" if counts["skipped"] else ""))
+        return counts
+
+    def _write(self, table, part, table_rows):
+        directory = os.path.join(self.out_dir, table)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{part:05d}{EXTENSIONS[self.fmt]}")
+        columns = [name for name, _ in SCHEMAS[table]]
+        if self.fmt == "csv":
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(table_rows)
+            return
+        schema = pa.schema([(name, getattr(pa, "bool_" if kind == "bool" else kind)()) for name, kind in SCHEMAS[table]])
+        batch = pa.Table.from_pydict({c: [r.get(c) for r in table_rows] for c in columns}, schema=schema)
+        if self.fmt == "parquet":
+            pa.parquet.write_table(batch, path)
+        else:
+            with pa.ipc.new_file(path, schema) as writer: writer.write_table(batch)
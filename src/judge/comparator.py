@@ -0,0 +1,193 @@
+import hashlib
+import math
+import reprlib
+
+# Structural output comparison for the sandbox. Options (settings.yaml `comparator`):
+#   rel_tol / abs_tol   float tolerance (math.isclose); ints and integral floats compare equal
+#   order               "strict", "unordered" (top-level sequence is a multiset)
+#                       or "deep_unordered" (every nested sequence is); there a set
+#                       matches a list or tuple holding the same items
+#   hash_threshold      outputs with more elements than this leave the worker only as a
+#                       {"$fingerprint", "preview", "size"} spec
+#   float_digits        significant digits kept when floats are fingerprinted
+
+DEFAULTS = {"rel_tol": 1e-9, "abs_tol": 1e-9, "order": "strict", "hash_threshold": 10_000, "float_digits": 9}
+ORDERS = ("strict", "unordered", "deep_unordered")
+
+_repr = reprlib.Repr()
+_repr.maxlist = _repr.maxtuple = _repr.maxset = _repr.maxdict = 8
+_repr.maxstring = _repr.maxother = 80
+_repr.maxlevel = 3
+
+
+def options(settings=None):
+    opts = {**DEFAULTS, **(settings or {})}
+    if opts["order"] not in ORDERS:
+        raise ValueError(f"Unknown comparator order '{opts['order']}' (expected one of {', '.join(ORDERS)})")
+    return opts
+
+
+def is_fingerprint(value):
+    return isinstance(value, dict) and "$fingerprint" in value
+
+
+def preview(value, limit=200):
+    """Bounded repr: never walks more than a few elements of a huge value."""
+    if is_fingerprint(value):
+        return f"<{value['$fingerprint'][:19]}… size={value.get('size')} {value.get('preview', '')}>"[:limit]
+    text = _repr.repr(value)
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def size_of(value, limit=None):
+    """Number of leaf elements, counting stops once `limit` is passed."""
+    if isinstance(value, (str, bytes)) or not hasattr(value, "__len__"):
+        return 1
+    if isinstance(value, dict): value = list(value.values())
+    total = 0
+    for item in value:
+        total += size_of(item, limit)
+        if limit is not None and total > limit: break
+    return total
+
+
+def fingerprint(value, opts=None):
+    """Canonical sha256 of a value under the comparator's equality (floats rounded)."""
+    opts = options(opts)
+    h = hashlib.sha256()
+    _feed(h, value, opts, opts["order"] != "strict")
+    return f"sha256:{h.hexdigest()}"
+
+
+def _digest(value, opts, unordered):
+    h = hashlib.sha256()
+    _feed(h, value, opts, unordered)
+    return h.digest()
+
+
+def _feed(h, value, opts, unordered):
+    if value is None:
+        h.update(b"n;")
+    elif isinstance(value, float) and value.is_integer():
+        h.update(f"i{int(value)};".encode())
+    elif isinstance(value, int):
+        h.update(f"i{value};".encode())
+    elif isinstance(value, float):
+        h.update(f"f{value:.{opts['float_digits']}g};".encode())
+    elif isinstance(value, str):
+        h.update(b"s%d:" % len(value) + value.encode("utf-8", "surrogatepass"))
+    elif isinstance(value, (list, tuple)) or (unordered and isinstance(value, (set, frozenset))):
+        # Where order is ignored a set is the same multiset as a list of its items
+        nested = opts["order"] == "deep_unordered"
+        if unordered:
+            h.update(b"M%d[" % len(value))
+            for d in sorted(_digest(v, opts, nested) for v in value): h.update(d)
+        else:
+            h.update(b"L%d[" % len(value))
+            for v in value: _feed(h, v, opts, nested)
+        h.update(b"]")
+    elif isinstance(value, (set, frozenset)):
+        h.update(b"S%d{" % len(value))
+        for d in sorted(_digest(v, opts, False) for v in value): h.update(d)
+        h.update(b"}")
+    elif isinstance(value, dict):
+        h.update(b"D%d{" % len(value))
+        for d in sorted(_digest(k, opts, False) + _digest(v, opts, False) for k, v in value.items()): h.update(d)
+        h.update(b"}")
+    else:
+        h.update(f"r{value!r};".encode())
+
+
+SCALARS = (type(None), bool, int, float, str)
+CONTAINERS = (list, tuple, set, frozenset)
+
+
+def to_plain(value):
+    """
+    Copy of a submission's output built only from exact builtin types, so it can
+    cross a process boundary: str/int/float subclasses become the base type and
+    anything else (user-defined classes, which could run code when unpickled,
+    and container subclasses) becomes its repr.
+    Call it where the submission runs, inside the sandbox.
+    """
+    kind = type(value)
+    if kind in SCALARS:
+        return value
+    if kind in CONTAINERS:
+        return kind(to_plain(v) for v in value)
+    if kind is dict:
+        return {to_plain(k): to_plain(v) for k, v in value.items()}
+    # Subclasses of str/int/float (e.g. IntEnum) keep their value, via the base type's own method
+    for base in (str, int, float):
+        if issubclass(kind, base): return getattr(base, f"__{base.__name__}__")(value)
+    return str.__str__(repr(value))  # A str subclass from __repr__ becomes a plain str too
+
+
+def compact(value, opts=None):
+    """The value itself if it is small, otherwise a fingerprint spec (what crosses the worker boundary)."""
+    opts = options(opts)
+    n = size_of(value, opts["hash_threshold"])
+    if n <= opts["hash_threshold"]:
+        return value
+    return {"$fingerprint": fingerprint(value, opts), "preview": preview(value, 120), "size": size_of(value)}
+
+
+def compare(got, expected, opts=None):
+    """(True, None) when equal under the options, else (False, short mismatch report)."""
+    opts = options(opts)
+    if is_fingerprint(expected):
+        fp = fingerprint(got, opts)
+        if fp == expected["$fingerprint"]: return True, None
+        return False, f"output fingerprint {fp[7:19]} != expected {expected['$fingerprint'][7:19]}; got {preview(got)}"
+    where = _diff(got, expected, opts, "", opts["order"] != "strict")
+    if where is None: return True, None
+    return False, f"{where}. Got {preview(got)}, expected {preview(expected)}"
+
+
+def _numbers(a, b):
+    # bool stays an int, as with plain == (True == 1)
+    return isinstance(a, (int, float)) and isinstance(b, (int, float))
+
+
+def _diff(got, exp, opts, path, unordered):
+    at = path or "output"
+    if _numbers(got, exp):
+        if got == exp or math.isclose(got, exp, rel_tol=opts["rel_tol"], abs_tol=opts["abs_tol"]): return None
+        return f"{at}: {preview(got, 60)} != {preview(exp, 60)}"
+    # Where order is ignored, sets compare as multisets too: {1, 2, 3} matches [3, 2, 1]
+    sequences = (list, tuple, set, frozenset) if unordered else (list, tuple)
+    if isinstance(got, sequences) and isinstance(exp, sequences):
+        if len(got) != len(exp):
+            return f"{at}: length {len(got)} != {len(exp)}"
+        nested = opts["order"] == "deep_unordered"
+        if unordered:
+            # Elements are matched by fingerprint, so floats match to float_digits here
+            got_counts, exp_counts = _multiset(got, opts, nested), _multiset(exp, opts, nested)
+            missing = [v for d, (v, n) in exp_counts.items() if got_counts.get(d, (None, 0))[1] < n]
+            extra = [v for d, (v, n) in got_counts.items() if exp_counts.get(d, (None, 0))[1] < n]
+            if not missing and not extra: return None
+            return f"{at}: missing {preview(missing[:5], 80)}, unexpected {preview(extra[:5], 80)} (order ignored)"
+        for i, (g, e) in enumerate(zip(got, exp)):
+            found = _diff(g, e, opts, f"{path}[{i}]", nested)
+            if found: return found
+        return None
+    if isinstance(got, dict) and isinstance(exp, dict):
+        if got.keys() != exp.keys():
+            # Sorted by repr, so keys of mixed types sort and 1 vs '1' stays visible
+            return f"{at}: keys {preview(sorted(got, key=repr), 80)} != {preview(sorted(exp, key=repr), 80)}"
+        for k in exp:
+            found = _diff(got[k], exp[k], opts, f"{path}[{k!r}]", False)
+            if found: return found
+        return None
+    if got == exp: return None
+    if type(got) is not type(exp) and not (isinstance(got, (set, frozenset)) and isinstance(exp, (set, frozenset))):
+        return f"{at}: {type(got).__name__} != {type(exp).__name__}"
+    return f"{at}: {preview(got, 60)} != {preview(exp, 60)}"
+
+
+def _multiset(values, opts, nested):
+    counts = {}
+    for v in values:
+        d = _digest(v, opts, nested)
+        counts[d] = (counts.get(d, (v, 0))[0], counts.get(d, (v, 0))[1] + 1)
+    return counts
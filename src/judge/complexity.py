@@ -1,19 +1,94 @@
-import radon.complexity as cc
+import ast
+import collections
+import hashlib
+import threading
+from src.judge.red_flags import scan
+
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+CACHE_SIZE = 2048
+
+_cache = collections.OrderedDict()
+_cache_lock = threading.Lock()
 
 def get_complexity_score(code_str):
     """
     Calculates Cyclomatic Complexity.
     Lower score = Simpler code (Better).
     1-5: Simple, 6-10: Complex, 11+: Very Complex
+    Summed over every function (helpers included), 100 if unparseable.
+    """
+    return analyze_code(code_str)["score"]
+
+def analyze_code(code_str):
+    """
+    Static metrics from a single parse, cached by code hash:
+    cyclomatic complexity per function, Halstead metrics, maintainability index,
+    the deepest loop nesting and algorithmic red flags.
     """
+    key = hashlib.sha256((code_str or "").encode("utf-8")).hexdigest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    metrics = _analyze(code_str or "")
+    with _cache_lock:
+        _cache[key] = metrics
+        if len(_cache) > CACHE_SIZE: _cache.popitem(last=False)
+    return metrics
+
+def _analyze(code_str):
     try:
-        # Analyze the code string
-        results = cc.cc_visit(code_str)
-        if not results:
-            return 100 # Penalty if code is unparseable
-        
-        # Return the complexity of the first function found
-        return results[0].complexity
-    except Exception as e:
-        print(f"Complexity Error: {e}")
-        return 100 # High penalty for broken code
\ No newline at end of file
+        tree = ast.parse(code_str)
+    except (SyntaxError, ValueError) as e:
+        return {"score": 100, "error": f"Unparseable: {e}"}
+
+    from radon.visitors import ComplexityVisitor
+    from radon.metrics import h_visit_ast, mi_compute
+    from radon.raw import analyze
+
+    visitor = ComplexityVisitor.from_ast(tree)
+    functions = {f.name: f.complexity for f in visitor.functions}
+    for cls in visitor.classes:
+        for method in cls.methods: functions[f"{cls.name}.{method.name}"] = method.complexity
+    if not functions:
+        return {"score": 100, "error": "No function found"}
+
+    risk = scan(tree)
+    halstead = h_visit_ast(tree).total
+    raw = analyze(code_str)
+    total_cc = sum(functions.values())
+    # Same inputs as radon's mi_parameters: logical lines and comment percentage (docstrings count)
+    comment_pct = (raw.comments + raw.multi) / raw.sloc * 100 if raw.sloc else 0
+    mi = mi_compute(halstead.volume, total_cc, raw.lloc, comment_pct)
+    return {
+        "score": total_cc,
+        "cyclomatic": {
+            "total": total_cc,
+            "max": max(functions.values()),
+            "avg": round(total_cc / len(functions), 2),
+            "functions": functions,
+        },
+        "halstead": {
+            "volume": round(halstead.volume, 2),
+            "difficulty": round(halstead.difficulty, 2),
+            "effort": round(halstead.effort, 2),
+            "bugs": round(halstead.bugs, 4),
+        },
+        "maintainability_index": round(mi, 2),
+        "max_loop_depth": loop_depth(tree),
+        "sloc": raw.sloc,
+        "cost_class": risk["cost_class"],
+        "red_flags": risk["flags"],
+    }
+
+def loop_depth(node, depth=0):
+    """Deepest nesting of loops/comprehensions; nested functions start from zero."""
+    best = depth
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            best = max(best, loop_depth(child, 0))
+        elif isinstance(child, LOOP_NODES):
+            best = max(best, loop_depth(child, depth + 1))
+        else:
+            best = max(best, loop_depth(child, depth))
+    return best
@@ -0,0 +1,236 @@
+import ast
+import mmap
+import os
+import random
+import string
+import sys
+from src.judge.comparator import is_fingerprint, preview
+
+# Test inputs can reference data instead of embedding it:
+#   {"$dataset": "data/numbers.npy"}
+#   {"$dataset": "data/numbers.bin", "dtype": "int32"}
+#   {"$dataset": "data/words.txt"}
+#   {"$generate": "int_list", "size": 1000000, "seed": 42}
+# Only the small spec travels between processes. Each process maps the file
+# once (read-only, backed by the shared page cache) or regenerates the same
+# data from the seed; generated data is cached and every caller gets its own
+# copy, since solutions may mutate their argument.
+
+DTYPES = {
+    "int8": "b", "uint8": "B", "int16": "h", "uint16": "H",
+    "int32": "i", "uint32": "I", "int64": "q", "uint64": "Q",
+    "float32": "f", "float64": "d",
+}
+NPY_DTYPES = {
+    "i1": "b", "u1": "B", "i2": "h", "u2": "H", "i4": "i", "u4": "I",
+    "i8": "q", "u8": "Q", "f4": "f", "f8": "d", "b1": "?",
+}
+LINE_EXTENSIONS = (".txt", ".lines", ".jsonl", ".csv")
+
+_cache = {}
+
+
+def is_dataset_spec(value):
+    return isinstance(value, dict) and ("$dataset" in value or "$generate" in value)
+
+
+def resolve_input(value):
+    """
+    Turns a dataset/generator spec into the actual input value.
+    Anything that is not a spec is returned unchanged. Mapped datasets are
+    read-only and shared; generated data is a fresh copy on every call.
+    """
+    if not is_dataset_spec(value):
+        return value
+    key = _cache_key(value)
+    if key not in _cache:
+        if "$dataset" in value:
+            _cache[key] = _load_dataset(value)
+        else:
+            _cache[key] = generate(value["$generate"], value.get("size", 1000), value.get("seed", 0), **_generator_options(value))
+    if "$dataset" in value:
+        return _cache[key]
+    return _fresh(_cache[key])
+
+
+def resolve_expected(value):
+    """
+    resolve_input for expected outputs. A dataset is copied into plain lists: a
+    memoryview never equals the list a solution returns, and a numpy array
+    compared with == has no single truth value.
+    """
+    value = resolve_input(value)
+    if isinstance(value, LineDataset):
+        return list(value)
+    if isinstance(value, memoryview) or hasattr(value, "tolist"):
+        return value.tolist()
+    return value
+
+
+def describe(value):
+    """Short human-readable label for logs and reports."""
+    if is_fingerprint(value):
+        return preview(value)
+    if not is_dataset_spec(value):
+        return str(value)
+    if "$dataset" in value:
+        return f"<dataset {value['$dataset']}>"
+    return f"<{value['$generate']} size={value.get('size', 1000)} seed={value.get('seed', 0)}>"
+
+
+def _cache_key(spec):
+    items = tuple(sorted((k, repr(v)) for k, v in spec.items()))
+    if "$dataset" in spec:
+        st = os.stat(spec["$dataset"])
+        items += (st.st_mtime_ns, st.st_size)
+    return items
+
+
+def _fresh(value):
+    # Generated values are str, flat lists or lists of lists (int_matrix)
+    if isinstance(value, list):
+        return [list(row) for row in value] if value and isinstance(value[0], list) else value.copy()
+    return value
+
+
+def _generator_options(spec):
+    return {k: v for k, v in spec.items() if k not in ("$generate", "size", "seed")}
+
+
+# --- ON-DISK DATASETS ---
+
+def _load_dataset(spec):
+    path = spec["$dataset"]
+    if path.endswith(".npy"):
+        return _load_npy(path)
+    if path.endswith(LINE_EXTENSIONS):
+        return LineDataset(path)
+    dtype = spec.get("dtype", "int64")
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown dtype '{dtype}' for {path}")
+    return _map_file(path).cast(DTYPES[dtype])
+
+
+def _map_file(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b"")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mm)
+
+
+def _load_npy(path):
+    try:
+        import numpy as np
+    except ImportError:
+        return _load_npy_raw(path)
+    return np.load(path, mmap_mode="r")
+
+
+def _load_npy_raw(path):
+    """Minimal .npy reader for when numpy is not installed (C-order, native endian only)."""
+    buf = _map_file(path)
+    if bytes(buf[:6]) != b"\x93NUMPY":
+        raise ValueError(f"{path} is not a .npy file")
+    major = buf[6]
+    if major == 1:
+        header_len = int.from_bytes(buf[8:10], "little")
+        offset = 10
+    else:
+        header_len = int.from_bytes(buf[8:12], "little")
+        offset = 12
+    header = ast.literal_eval(bytes(buf[offset:offset + header_len]).decode("latin1"))
+    descr = header["descr"]
+    byteorder, code = descr[0], descr[1:]
+    native = "<" if sys.byteorder == "little" else ">"
+    if header["fortran_order"] or code not in NPY_DTYPES or byteorder not in (native, "|", "="):
+        raise ValueError(f"Unsupported .npy layout {descr} in {path} (install numpy)")
+    shape = header["shape"]
+    body = buf[offset + header_len:]
+    return body.cast(NPY_DTYPES[code], shape) if shape else body.cast(NPY_DTYPES[code])
+
+
+class LineDataset:
+    """Read-only, re-iterable view over a line-delimited file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._data = _map_file(path).obj or b""
+        self._offsets = None
+
+    def __iter__(self):
+        data, start, end = self._data, 0, len(self._data)
+        while start < end:
+            nl = data.find(b"\n", start)
+            if nl == -1:
+                nl = end
+            yield data[start:nl].decode("utf-8").rstrip("\r")
+            start = nl + 1
+
+    def _index(self):
+        if self._offsets is None:
+            offsets, pos = [0], self._data.find(b"\n")
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = self._data.find(b"\n", pos + 1)
+            if offsets[-1] == len(self._data):
+                offsets.pop()
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self):
+        return len(self._index())
+
+    def __getitem__(self, i):
+        offsets = self._index()
+        start = offsets[i]
+        i = i % len(offsets)
+        end = offsets[i + 1] - 1 if i + 1 < len(offsets) else len(self._data)
+        return self._data[start:end].decode("utf-8").rstrip("\r\n")
+
+    def __repr__(self):
+        return f"LineDataset({self.path!r})"
+
+
+# --- SEEDED GENERATORS ---
+
+def _int_list(rng, size, low=0, high=1_000_000):
+    return [rng.randint(low, high) for _ in range(size)]
+
+
+def _sorted_int_list(rng, size, low=0, high=1_000_000):
+    return sorted(_int_list(rng, size, low, high))
+
+
+def _float_list(rng, size, low=0.0, high=1.0):
+    return [rng.uniform(low, high) for _ in range(size)]
+
+
+def _text(rng, size, alphabet=string.ascii_lowercase):
+    return "".join(rng.choices(alphabet, k=size))
+
+
+def _word_list(rng, size, length=8, alphabet=string.ascii_lowercase):
+    return ["".join(rng.choices(alphabet, k=length)) for _ in range(size)]
+
+
+def _int_matrix(rng, size, cols=None, low=0, high=100):
+    cols = cols or size
+    return [[rng.randint(low, high) for _ in range(cols)] for _ in range(size)]
+
+
+GENERATORS = {
+    "int_list": _int_list,
+    "sorted_int_list": _sorted_int_list,
+    "float_list": _float_list,
+    "text": _text,
+    "word_list": _word_list,
+    "int_matrix": _int_matrix,
+}
+
+
+def generate(kind, size, seed=0, **options):
+    """Same (kind, size, seed, options) always yields the same data."""
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown generator '{kind}'. Available: {', '.join(GENERATORS)}")
+    return GENERATORS[kind](random.Random(seed), size, **options)
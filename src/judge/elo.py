@@ -1,9 +1,32 @@
 import json
 import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
 
 ELO_FILE = "output/elo_ratings.json"
 
+@contextmanager
+def _file_lock():
+    # Queue workers in other processes update the same ratings file
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(ELO_FILE) or ".", exist_ok=True)
+    with open(ELO_FILE + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
 class EloSystem:
+    _lock = threading.Lock() # Parallel battles may share one instance
+
     def __init__(self):
         self._load()
 
@@ -23,6 +46,12 @@ class EloSystem:
         """
         K = 32 # Volatility factor
 
+        with self._lock, _file_lock():
+            self._load() # Pick up updates saved by other processes since this one loaded
+            self._update(agents_list, winner_name, K)
+            self._save()
+
+    def _update(self, agents_list, winner_name, K):
         for agent in agents_list:
             if agent == winner_name:
                 continue
@@ -38,11 +67,12 @@ class EloSystem:
             # Update Loser
             self.ratings[agent] = round(r_lose + K * (0 - (1 - expected_win)))
 
-        self._save()
-
     def _save(self):
-        with open(ELO_FILE, 'w') as f:
+        # Write-then-rename: readers in other processes never see a half-written file
+        tmp = f"{ELO_FILE}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
             json.dump(self.ratings, f, indent=4)
+        os.replace(tmp, ELO_FILE)
             
     def get_leaderboard(self):
         # Return sorted list
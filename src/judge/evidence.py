@@ -0,0 +1,128 @@
+import ast
+import hashlib
+import io
+import json
+import tokenize
+from src.llm.budget import truncate
+
+MAX_MSG_CHARS = 160
+TIGHT_MSG_CHARS = 60
+
+
+def compact_code(code):
+    """
+    Strips comments, docstrings and blank lines so the judge only pays for logic.
+    Falls back to a token-level comment strip if the code does not parse.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return _strip_comments(code)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+    return ast.unparse(tree)
+
+
+def _strip_comments(code):
+    lines = code.splitlines()
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type == tokenize.COMMENT:
+                row, col = tok.start
+                lines[row - 1] = lines[row - 1][:col]
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        pass  # Keep whatever was stripped before the tokenizer gave up
+    return "\n".join(line.rstrip() for line in lines if line.strip())
+
+
+def build_submissions(results):
+    """
+    Groups agents that submitted the same (compacted) code so each distinct
+    solution is shown to the judge once.
+    """
+    submissions = {}
+    for res in results:
+        compact = compact_code(res['code'] or "")
+        key = hashlib.sha256(compact.encode("utf-8")).hexdigest()
+        if key not in submissions:
+            msg = res.get('msg', '')
+            submissions[key] = {
+                "agents": [],
+                "status": "Success" if res['success'] else "FAILED",
+                "time_s": float(f"{res['time']:.3g}"),
+                "complexity": res.get('complexity'),
+                "cost_class": (res.get('metrics') or {}).get('cost_class'),
+                "msg": msg if len(msg) <= MAX_MSG_CHARS else msg[:MAX_MSG_CHARS] + "...",
+                "code": compact,
+            }
+        submissions[key]["agents"].append(res['agent'])
+    return list(submissions.values())
+
+
+def render_evidence(problem, submissions):
+    payload = {"problem": problem, "submissions": []}
+    for sub in submissions:
+        entry = dict(sub)
+        if sub["status"] == "Success":
+            entry.pop("msg")
+        payload["submissions"].append(entry)
+    note = "Agents listed together in one submission wrote identical code; critique each of them."
+    return note + "\n" + json.dumps(payload, separators=(",", ":"))
+
+
+def fit_evidence(problem, submissions, budget=None, count=len, reserved=0):
+    """
+    render_evidence within `budget` tokens (`count` measures text, `reserved` is the
+    system prompt): failure messages are shortened first, then the problem, then
+    every submission's code is cut to an equal share. Returns (evidence, trimmed).
+    """
+    evidence = render_evidence(problem, submissions)
+    trimmed = []
+    if not budget or reserved + count(evidence) <= budget:
+        return evidence, trimmed
+    submissions = [dict(sub, msg=sub["msg"][:TIGHT_MSG_CHARS]) for sub in submissions]
+    trimmed.append("messages")
+    evidence = render_evidence(problem, submissions)
+    if reserved + count(evidence) > budget and count(problem) > budget // 4:
+        problem = truncate(problem, budget // 4)
+        trimmed.append("problem")
+        evidence = render_evidence(problem, submissions)
+    if reserved + count(evidence) > budget:
+        skeleton = count(render_evidence(problem, [dict(sub, code="") for sub in submissions]))
+        share = max(1, (budget - reserved - skeleton) // max(1, len(submissions)))
+        submissions = [dict(sub, code=truncate(sub["code"], share, "head")) for sub in submissions]
+        trimmed.append(f"code (~{share} tokens each)")
+        evidence = render_evidence(problem, submissions)
+    return evidence, trimmed
+
+
+def chunk(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def expand_critiques(critiques, submissions):
+    """Copies a critique given to one agent of a duplicate group to its twins."""
+    expanded = dict(critiques)
+    for sub in submissions:
+        shared = next((critiques[a] for a in sub["agents"] if a in critiques), None)
+        if shared:
+            for agent in sub["agents"]:
+                expanded.setdefault(agent, shared)
+    return expanded
+
+
+def merge_verdicts(chunk_verdicts, final_verdict):
+    """Chunk critiques are the detailed ones; the final round only picks among chunk winners."""
+    critiques = {}
+    for verdict in chunk_verdicts:
+        critiques.update(verdict.get('critiques', {}) or {})
+    for agent, text in (final_verdict.get('critiques', {}) or {}).items():
+        critiques.setdefault(agent, text)
+    return {
+        "winner": final_verdict.get('winner'),
+        "reasoning": final_verdict.get('reasoning', ''),
+        "critiques": critiques,
+    }
@@ -1,54 +1,208 @@
+import ast
+import copy
+import signal
+import threading
 import time
 import inspect
 import textwrap
+from contextlib import contextmanager, nullcontext
+from src.judge.comparator import compact, compare, options, to_plain
+from src.judge.datasets import resolve_expected, resolve_input
+from src.judge.isolation import SandboxViolation, guard, restricted_builtins
+from src.judge.red_flags import scan, plan_probe
+
+class ProbeTimeout(BaseException):
+    # BaseException so submissions with `except Exception` cannot swallow it
+    pass
+
+@contextmanager
+def time_limit(seconds):
+    """SIGALRM-based limit; only enforceable on the main thread (always true in pool workers)."""
+    if not seconds or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    def on_alarm(signum, frame):
+        raise ProbeTimeout()
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _assigned_names(tree):
+    names = set()
+    for node in tree.body:
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target] if isinstance(node, ast.AnnAssign) and node.value else []
+        names.update(t.id for t in targets if isinstance(t, ast.Name))
+    return names
+
+
+def resolve_entry_point(tree):
+    """
+    Decides which callable to benchmark without executing anything.
+    Returns (function_name, None) for a module-level function,
+    (class_name, method_name) for a LeetCode-style `class Solution`,
+    or (None, None) if nothing callable is defined.
+    """
+    functions = [n for n in tree.body if isinstance(n, FUNCTION_NODES)]
+    names = [f.name for f in functions]
+    # `solution = lambda n: ...` or `solution = math.factorial` count as well (checked callable after exec)
+    if "solution" in names or "solution" in _assigned_names(tree):
+        return "solution", None
+    if len(functions) == 1:
+        return functions[0].name, None
+    if functions:
+        # Entry point = a function no other top-level function calls; prefer the last defined
+        called = set()
+        for func in functions:
+            for node in ast.walk(func):
+                if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id != func.name:
+                    called.add(node.func.id)
+        roots = [name for name in names if name not in called]
+        return (roots or names)[-1], None
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name.lower() == "solution":
+            methods = [m.name for m in node.body if isinstance(m, FUNCTION_NODES) and not m.name.startswith("_")]
+            if methods:
+                return node.name, methods[0]
+    return None, None
+
+
+def _drive(coroutine):
+    """
+    Runs an `async def solution` to completion without an event loop (the sandbox
+    forbids the sockets one needs); awaiting real I/O or timers is an error.
+    """
+    try:
+        while True:
+            if coroutine.send(None) is not None:
+                coroutine.close()
+                raise RuntimeError("async solutions cannot await I/O or timers")
+    except StopIteration as done:
+        return done.value
+
 
 class LocalSandbox:
-    def __init__(self):
-        pass
+    def __init__(self, timeout=None, max_runs=100, restricted=False, allowed_imports=None, compare=None):
+        self.timeout = timeout
+        self.max_runs = max_runs
+        self.restricted = restricted
+        self.allowed_imports = allowed_imports
+        self.compare = options(compare)
 
     def run_benchmark(self, code_str, test_input, expected_output=None):
         """
         Runs the code and returns (execution_time, success_status, error_message)
+        The number of timed runs is planned from a static scan of the code, and
+        `timeout` (if set) bounds the whole probe.
+        In restricted mode the code sees a trimmed set of builtins, may only import
+        allowlisted modules and cannot touch files, processes or sockets.
+        Outputs are checked with the comparator (float tolerance, order mode); an
+        expected fingerprint spec is matched by hash.
         """
-        local_scope = {}
-        
         try:
-            # 1. Compile the code
-            # We wrap it in try/except to catch syntax errors immediately
-            try:
-                exec(code_str, local_scope, local_scope)
-            except SyntaxError as e:
-                return float('inf'), False, f"Syntax Error: {e}"
-
-            # 2. Find the function automatically
-            # We look for any callable function inside the code
-            func = None
-            if 'solution' in local_scope:
-                func = local_scope['solution']
-            else:
-                # Fallback: Find the first function defined in the code
-                for key, value in local_scope.items():
-                    if callable(value) and key != '__builtins__':
-                        func = value
-                        break
-            
+            # 0. Resolve dataset/generator specs (mapped once per process)
+            test_input = resolve_input(test_input)
+            expected_output = resolve_expected(expected_output)
+
+            # 1-2. Parse, resolve the entry point, execute the definitions
+            func, tree = self._load(code_str)
             if func is None:
-                return float('inf'), False, "No function found in code."
-
-            # 3. Measure Rapidity (Run 100 times)
-            start_time = time.perf_counter()
-            runs = 100
-            for _ in range(runs):
-                result = func(test_input)
-            end_time = time.perf_counter()
+                return float('inf'), False, tree
+
+            # 3. Measure Rapidity: one calibration run, then as many of the planned runs as the budget allows
+            risk = scan(tree)
+            runs, timeout = plan_probe(risk['cost_class'], self.max_runs, self.timeout)
+            try:
+                with time_limit(timeout), guard() if self.restricted else nullcontext():
+                    start_time = time.perf_counter()
+                    result = func(test_input)
+                    first_time = time.perf_counter() - start_time
+                    if timeout and first_time > 0:
+                        runs = max(1, min(runs, int(timeout * 0.5 / first_time)))
+                    for _ in range(runs - 1):
+                        result = func(test_input)
+                    end_time = time.perf_counter()
+            except ProbeTimeout:
+                return float('inf'), False, f"Timeout: exceeded {timeout}s (estimated {risk['cost_class']})"
             
             avg_time = (end_time - start_time) / runs
 
             # 4. Verify Correctness
-            if expected_output is not None and result != expected_output:
-                return avg_time, False, f"Wrong Answer. Got {result}, expected {expected_output}"
+            if expected_output is not None:
+                ok, diff = compare(result, expected_output, self.compare)
+                if not ok:
+                    return avg_time, False, f"Wrong Answer: {diff}"
 
             return avg_time, True, "Success"
 
+        except ProbeTimeout:
+            return float('inf'), False, f"Timeout: module body exceeded {plan_probe(None, 1, self.timeout)[1]}s"
+        except MemoryError:
+            return float('inf'), False, "Memory Limit Exceeded"
+        except SandboxViolation as e:
+            return float('inf'), False, f"Sandbox Violation: {e}"
         except Exception as e:
-            return float('inf'), False, f"Runtime Error: {str(e)}"
\ No newline at end of file
+            return float('inf'), False, f"Runtime Error: {str(e)}"
+
+    def _load(self, code_str):
+        """(callable, tree), or (None, error message) when the code cannot provide an entry point."""
+        local_scope = {}
+        if self.restricted:
+            local_scope = {"__name__": "solution", "__builtins__": restricted_builtins(self.allowed_imports)}
+
+        # Parse and resolve the entry point before running anything
+        try:
+            tree = ast.parse(code_str)
+        except SyntaxError as e:
+            return None, f"Syntax Error: {e}"
+        func_name, method_name = resolve_entry_point(tree)
+        if func_name is None:
+            return None, "No function found in code."
+
+        # Execute the definitions and fetch the resolved callable; the module body is
+        # untrusted code too, so it runs under a time limit (the cost class is unknown here)
+        _, timeout = plan_probe(None, 1, self.timeout)
+        with time_limit(timeout), guard() if self.restricted else nullcontext():
+            exec(compile(tree, "<solution>", "exec"), local_scope, local_scope)
+        func = local_scope.get(func_name)
+        if method_name is not None and func is not None:
+            func = getattr(func(), method_name)
+        if not callable(func):
+            return None, f"Entry point '{func_name}' is not callable."
+        if inspect.iscoroutinefunction(func):
+            coroutine = func
+            func = lambda value: _drive(coroutine(value))
+        return func, tree
+
+    def run_outputs(self, code_str, inputs):
+        """
+        One untimed call per input, for differential testing.
+        Returns [(True, output) | (False, error message), ...] in input order.
+        Outputs are converted to plain builtin data here, inside the sandbox, so
+        nothing the submission defines is ever unpickled by the caller; outputs over the comparator's hash_threshold come back as fingerprint specs.
+        """
+        try:
+            func, error = self._load(code_str)
+        except ProbeTimeout:
+            func, error = None, f"Timeout: module body exceeded {plan_probe(None, 1, self.timeout)[1]}s"
+        except Exception as e:
+            func, error = None, f"Runtime Error: {e}"
+        if func is None:
+            return [(False, error)] * len(inputs)
+        outputs = []
+        for value in inputs:
+            try:
+                # Each call gets its own copy: solutions may mutate their argument
+                with time_limit(self.timeout), guard() if self.restricted else nullcontext():
+                    outputs.append((True, compact(to_plain(func(copy.deepcopy(resolve_input(value)))), self.compare)))
+            except ProbeTimeout:
+                outputs.append((False, f"Timeout: exceeded {self.timeout}s"))
+            except Exception as e:
+                outputs.append((False, f"Runtime Error: {e}"))
+        return outputs
\ No newline at end of file
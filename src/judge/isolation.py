@@ -0,0 +1,152 @@
+import builtins
+import signal
+import sys
+import types
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits
+    resource = None
+
+# Defense in depth for untrusted submissions. None of these layers is a security
+# boundary on its own; together with a recycled, rlimited worker process they
+# keep a hostile or runaway submission from degrading the rest of the host.
+
+DEFAULT_ALLOWED_IMPORTS = (
+    "math", "cmath", "itertools", "functools", "collections", "heapq", "bisect",
+    "re", "string", "operator", "typing", "dataclasses", "decimal", "fractions",
+    "statistics", "random", "array", "copy", "enum", "numbers", "sys",
+)
+BLOCKED_BUILTINS = (
+    "open", "exec", "eval", "compile", "input", "breakpoint", "exit", "quit",
+    "help", "globals", "locals", "vars", "__import__",
+)
+BLOCKED_EVENT_PREFIXES = (
+    "open", "socket.", "subprocess.", "os.", "shutil.", "ctypes.", "pty.",
+    "webbrowser.", "urllib.", "ftplib.", "smtplib.", "http.", "sqlite3.", "import",
+)
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+_guard_active = False
+_hook_installed = False
+
+
+class SandboxViolation(Exception):
+    pass
+
+
+class CpuLimitExceeded(BaseException):
+    pass
+
+
+def _audit(event, args):
+    if _guard_active and event.startswith(BLOCKED_EVENT_PREFIXES):
+        raise SandboxViolation(f"'{event}' is not allowed in the sandbox")
+
+
+@contextmanager
+def guard():
+    """Blocks file, process and network access while submission code runs."""
+    global _guard_active
+    _guard_active = _hook_installed
+    try:
+        yield
+    finally:
+        _guard_active = False
+
+
+@contextmanager
+def _unguarded():
+    global _guard_active
+    previous, _guard_active = _guard_active, False
+    try:
+        yield
+    finally:
+        _guard_active = previous
+
+
+def _sys_shim():
+    # Solutions commonly touch sys for recursion limits or maxsize; nothing else is exposed
+    return types.SimpleNamespace(
+        setrecursionlimit=lambda n: sys.setrecursionlimit(min(int(n), 100_000)),
+        getrecursionlimit=sys.getrecursionlimit,
+        maxsize=sys.maxsize, float_info=sys.float_info, int_info=sys.int_info,
+        version_info=sys.version_info, byteorder=sys.byteorder,
+    )
+
+
+def restricted_builtins(allowed_imports=None):
+    allowed = set(allowed_imports or DEFAULT_ALLOWED_IMPORTS)
+
+    def guarded_import(name, globals=None, locals=None, fromlist=(), level=0):
+        root = name.split(".")[0]
+        if level or root not in allowed:
+            raise ImportError(f"import of '{name}' is not allowed in the sandbox")
+        if root == "sys": return _sys_shim()
+        with _unguarded():  # Loading an allowed module legitimately reads files
+            return builtins.__import__(name, globals, locals, fromlist, level)
+
+    safe = {k: v for k, v in vars(builtins).items() if k not in BLOCKED_BUILTINS}
+    safe["__import__"] = guarded_import
+    return safe
+
+
+def _unshare_network():
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+    except (OSError, ImportError):
+        return False
+    for flags in (CLONE_NEWNET, CLONE_NEWUSER | CLONE_NEWNET):
+        if libc.unshare(flags) == 0: return True
+    return False
+
+
+def harden_process(limits):
+    """
+    Pool worker initializer: rlimits, an empty network namespace when the kernel
+    allows it, and the audit hook behind `guard()`.
+    """
+    global _hook_installed
+    if resource:
+        mb = limits.get("memory_mb")
+        if mb: _set_limit(resource.RLIMIT_AS, mb * 1024 * 1024)
+        files = limits.get("max_open_files")
+        if files: _set_limit(resource.RLIMIT_NOFILE, files)
+        if limits.get("no_fork", True) and hasattr(resource, "RLIMIT_NPROC"):
+            _set_limit(resource.RLIMIT_NPROC, 0)
+    if limits.get("no_network", True) and not _unshare_network():
+        print("🟠 Sandbox worker: network namespace unavailable, relying on the audit hook")
+    if not _hook_installed:
+        sys.addaudithook(_audit)
+        _hook_installed = True
+
+
+def _set_limit(kind, value):
+    soft, hard = resource.getrlimit(kind)
+    if hard != resource.RLIM_INFINITY: value = min(value, hard)
+    try: resource.setrlimit(kind, (value, hard))
+    except (ValueError, OSError): pass
+
+
+@contextmanager
+def cpu_budget(seconds):
+    """Per-job CPU cap on top of the wall-clock timeout (catches busy loops that ignore signals)."""
+    if not seconds or not resource or not hasattr(signal, "SIGXCPU"):
+        yield
+        return
+    used = resource.getrusage(resource.RUSAGE_SELF)
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    limit = int(used.ru_utime + used.ru_stime + seconds) + 1
+    if hard != resource.RLIM_INFINITY: limit = min(limit, hard)
+    def on_xcpu(signum, frame):
+        raise CpuLimitExceeded()
+    previous = signal.signal(signal.SIGXCPU, on_xcpu)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+        signal.signal(signal.SIGXCPU, previous)
@@ -0,0 +1,166 @@
+import json
+import math
+import os
+import statistics
+import threading
+import time
+from src.judge import elo
+
+DEFAULT_RATING = 1200
+
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def log_dir_stamp(log_dir):
+    """
+    file_stamp of the log dir plus its record count and latest record name. The
+    directory mtime alone is too coarse on some filesystems: two records written
+    within one tick would leave it unchanged.
+    """
+    stamp = file_stamp(log_dir)
+    if stamp is None: return None
+    names = [name for name in os.listdir(log_dir) if name.endswith("_data.json")]
+    return (*stamp, len(names), max(names, default=""))
+
+
+def read_new_records(log_dir, seen_files):
+    """
+    Loads the `_data.json` records in `log_dir` not yet in `seen_files` (which is
+    updated). Returns (records, complete); unreadable files are left unseen, and
+    `complete` is False, so the next call tries them again.
+    """
+    records, complete = [], True
+    if not os.path.isdir(log_dir): return records, complete
+    for filename in sorted(os.listdir(log_dir)):
+        if not filename.endswith("_data.json") or filename in seen_files: continue
+        try:
+            with open(os.path.join(log_dir, filename), "r") as f: records.append(json.load(f))
+        except (OSError, ValueError):
+            complete = False
+            continue
+        seen_files.add(filename)
+    return records, complete
+
+
+class LeaderboardService:
+    """
+    In-memory ratings plus per-agent aggregates, built once from output/battle_logs
+    and then updated incrementally as battles finish. Battles run by other
+    processes (batch mode, queue workers) are picked up on read, when the log dir
+    or the ratings file changed. `etag()` changes on every update.
+    """
+
+    def __init__(self, log_dir="output/battle_logs"):
+        self.log_dir = log_dir
+        self._lock = threading.Lock()
+        self.version = 0
+        self._epoch = f"{int(time.time() * 1000):x}"  # Keeps ETags unique across restarts
+        self.ratings = {}
+        self._agents = {}
+        self._seen = set()
+        self._files = set()
+        self._stamps = {}
+        self._sync()
+
+    def _sync(self):
+        """Folds in what changed on disk since the last check; True if anything did."""
+        changed = False
+        log_stamp = log_dir_stamp(self.log_dir)
+        if log_stamp != self._stamps.get("logs"):
+            records, complete = read_new_records(self.log_dir, self._files)
+            for record in records: self._apply(record)
+            # A record still being written is retried on the next read
+            self._stamps["logs"] = log_stamp if complete else None
+            changed = bool(records)
+        elo_stamp = file_stamp(elo.ELO_FILE)
+        if elo_stamp != self._stamps.get("elo"):
+            try:
+                self.ratings.update(elo.EloSystem().ratings)
+                self._stamps["elo"] = elo_stamp
+                changed = True
+            except ValueError:
+                pass
+        return changed
+
+    def refresh(self):
+        with self._lock:
+            if self._sync(): self.version += 1
+
+    def _agent(self, name):
+        if name not in self._agents:
+            self._agents[name] = {"battles": 0, "wins": 0, "passes": 0, "speedup_logs": [], "rating_history": []}
+        return self._agents[name]
+
+    def _apply(self, record):
+        battle_id = record.get("battle_id")
+        if battle_id in self._seen: return
+        self._seen.add(battle_id)
+        results = record.get("results", [])
+        passing_times = {r["agent"]: r["time"] for r in results if r.get("success") and r.get("time", 0) > 0}
+        for res in results:
+            stats = self._agent(res["agent"])
+            stats["battles"] += 1
+            stats["wins"] += record.get("champion") == res["agent"]
+            stats["passes"] += bool(res.get("success"))
+            others = [t for name, t in passing_times.items() if name != res["agent"]]
+            if res["agent"] in passing_times and others:
+                stats["speedup_logs"].append(math.log(statistics.median(others) / passing_times[res["agent"]]))
+        for name, rating in (record.get("ratings") or {}).items():
+            self._agent(name)["rating_history"].append({"battle_id": battle_id, "rating": rating})
+
+    def etag(self):
+        """Picks up new records from disk, then tags the current state (for HTTP caching)."""
+        self.refresh()
+        with self._lock:
+            return f"{self._epoch}-{self.version}-{len(self._files)}"
+
+    def record_battle(self, record):
+        with self._lock:
+            self._apply(record)
+            if record.get("ratings"): self.ratings.update(record["ratings"])
+            self.version += 1
+
+    def leaderboard(self):
+        self.refresh()
+        with self._lock:
+            return sorted(self.ratings.items(), key=lambda x: x[1], reverse=True)
+
+    def stats(self):
+        self.refresh()
+        with self._lock:
+            out = {}
+            for name, s in self._agents.items():
+                logs = s["speedup_logs"]
+                out[name] = {
+                    "rating": self.ratings.get(name, DEFAULT_RATING),
+                    "battles": s["battles"],
+                    "wins": s["wins"],
+                    "win_rate": round(s["wins"] / s["battles"], 3) if s["battles"] else 0.0,
+                    "pass_rate": round(s["passes"] / s["battles"], 3) if s["battles"] else 0.0,
+                    # Geometric mean of (field median time / own time); >1 means faster than the field
+                    "avg_speedup": round(math.exp(sum(logs) / len(logs)), 3) if logs else None,
+                    "rating_history": list(s["rating_history"]),
+                }
+            return out
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_leaderboard_service(log_dir="output/battle_logs"):
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = LeaderboardService(log_dir)
+        return _service
+
+def notify_battle(record):
+    """Feeds a finished battle to the live service; a no-op until something has read it."""
+    if _service is not None:
+        _service.record_battle(record)
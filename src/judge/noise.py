@@ -0,0 +1,134 @@
+import os
+
+try:
+    import resource
+except ImportError:  # Windows: no rusage
+    resource = None
+
+# Measurement isolation: each sandbox worker owns one core, everything else
+# (Flask, judge threads, local inference) is kept on the remaining cores, and
+# every timing carries the host conditions it was taken under.
+
+DEFAULT_LIMITS = {
+    "max_load_per_core": 1.0,        # 1-minute load average / online cores
+    "max_involuntary_switches": 20,  # Preemptions during one probe
+    "max_freq_drop": 0.15,           # Relative drop of the core clock during one probe
+    "retries": 2,
+}
+
+_core = None  # Core this worker is pinned to
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_cores(workers, cores=None):
+    """
+    (worker_cores, other_cores). Workers take the highest cores; pinning is skipped
+    (both lists empty) when at least one core cannot be left for everything else.
+    """
+    usable = sorted(cores) if cores else available_cores()
+    if not workers or len(usable) <= workers:
+        return [], []
+    return usable[-workers:], usable[:-workers]
+
+
+def keep_off(other_cores):
+    """
+    Confines every thread of this process to `other_cores`; threads and children
+    started later inherit the mask. sched_setaffinity only moves the thread it is
+    given, so each task in /proc/self/task is set. Call once from the entry point.
+    """
+    if not other_cores or not hasattr(os, "sched_setaffinity"): return
+    try: tasks = [int(tid) for tid in os.listdir("/proc/self/task")]
+    except OSError: tasks = [0]  # No procfs: only the calling thread
+    for tid in tasks:
+        try: os.sched_setaffinity(tid, other_cores)
+        except ProcessLookupError: pass  # Thread exited meanwhile
+
+
+def pin_worker(cores, slots):
+    """
+    Pool worker initializer. `slots` is a shared array holding the pid that owns
+    each core; a recycled worker takes over the slot of the one it replaces.
+    """
+    global _core
+    if not cores or not hasattr(os, "sched_setaffinity"): return
+    with slots.get_lock():
+        for i, owner in enumerate(slots):
+            if owner == 0 or not _alive(owner):
+                slots[i] = os.getpid()
+                _core = cores[i]
+                break
+        else:
+            return
+    os.sched_setaffinity(0, {_core})
+
+
+def _alive(pid):
+    try: os.kill(pid, 0)
+    except ProcessLookupError: return False
+    except PermissionError: return True
+    return True
+
+
+def cpu_freq_mhz(core):
+    if core is None: return None
+    try:
+        with open(f"/sys/devices/system/cpu/cpu{core}/cpufreq/scaling_cur_freq") as f:
+            return int(f.read()) / 1000
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot():
+    usage = resource.getrusage(resource.RUSAGE_SELF) if resource else None
+    return {
+        "load": os.getloadavg()[0] if hasattr(os, "getloadavg") else None,
+        "freq_mhz": cpu_freq_mhz(_core),
+        "voluntary": usage.ru_nvcsw if usage else 0,
+        "involuntary": usage.ru_nivcsw if usage else 0,
+    }
+
+
+def assess(before, after, limits=None):
+    """Noise report for one probe; `noisy` is set when any limit is exceeded."""
+    limits = {**DEFAULT_LIMITS, **(limits or {})}
+    report = {
+        "core": _core,
+        "load_avg": after["load"],
+        "freq_mhz": after["freq_mhz"],
+        "voluntary_switches": after["voluntary"] - before["voluntary"],
+        "involuntary_switches": after["involuntary"] - before["involuntary"],
+        "reasons": [],
+    }
+    loaded = after["load"] is not None and after["load"] / (os.cpu_count() or 1) > limits["max_load_per_core"]
+    if loaded:
+        report["reasons"].append(f"load average {after['load']:.2f}")
+    if report["involuntary_switches"] > limits["max_involuntary_switches"]:
+        report["reasons"].append(f"{report['involuntary_switches']} involuntary context switches")
+    if before["freq_mhz"] and after["freq_mhz"] and after["freq_mhz"] < before["freq_mhz"] * (1 - limits["max_freq_drop"]):
+        report["reasons"].append(f"clock dropped {before['freq_mhz']:.0f} -> {after['freq_mhz']:.0f} MHz")
+    report["noisy"] = bool(report["reasons"])
+    # The load average moves over minutes, so only the per-probe signals are worth a retry
+    report["transient"] = len(report["reasons"]) > int(loaded)
+    return report
+
+
+def measure(run, limits=None):
+    """
+    Calls run() -> (time, success, msg), retrying successful probes that were
+    disturbed while they ran.
+    Returns (result, report); the report describes the attempt that was kept.
+    """
+    retries = {**DEFAULT_LIMITS, **(limits or {})}["retries"]
+    for attempt in range(retries + 1):
+        before = snapshot()
+        result = run()
+        report = assess(before, snapshot(), limits)
+        report["attempts"] = attempt + 1
+        if not report["transient"] or not result[1]: break
+    return result, report
@@ -0,0 +1,152 @@
+import ast
+import collections
+import json
+import os
+import random
+import re
+from src.judge.comparator import fingerprint, is_fingerprint
+from src.judge.datasets import generate
+from src.judge.execution import resolve_entry_point
+from src.judge.regressions import problem_key
+
+# Case sizes, smallest first; the last (largest) case becomes the benchmark input
+SIZES = (1, 3, 8, 20, 50, 200, 1000)
+INT_SIZES = (1, 3, 5, 8, 12, 16, 20)  # Scalars stay small: naive recursive solutions must still finish
+
+ANNOTATION_KINDS = {
+    "int": "int", "float": "float", "str": "text",
+    "list[int]": "int_list", "List[int]": "int_list",
+    "list[float]": "float_list", "List[float]": "float_list",
+    "list[str]": "word_list", "List[str]": "word_list",
+    "list[list[int]]": "int_matrix", "List[List[int]]": "int_matrix",
+}
+NAME_HINTS = (
+    (r"^(n|k|m|num|number|x|count|limit|target)$", "int"),
+    (r"(words|tokens|strs|strings)", "word_list"),
+    (r"(matrix|grid|board)", "int_matrix"),
+    (r"^(s|text|string|word|sentence|phrase)$", "text"),
+    (r"(nums|arr|array|numbers|values|lst|list|data|items|heights|prices|seq)", "int_list"),
+)
+DEFAULT_KIND = "int_list"
+
+
+def infer_kind(codes):
+    """
+    Input type from the submissions' entry points: parameter annotations first,
+    then parameter names, by majority over the submissions.
+    """
+    votes = collections.Counter()
+    for code in codes:
+        try: tree = ast.parse(code)
+        except (SyntaxError, ValueError): continue
+        kind = _param_kind(tree)
+        if kind: votes[kind] += 1
+    return votes.most_common(1)[0][0] if votes else DEFAULT_KIND
+
+
+def _definition(body, name):
+    """The def, class or `name = lambda ...` node that defines `name`."""
+    for node in body:
+        if getattr(node, "name", None) == name: return node
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Lambda) and any(getattr(t, "id", None) == name for t in node.targets):
+            return node.value
+    return None
+
+
+def _param_kind(tree):
+    func_name, method_name = resolve_entry_point(tree)
+    if func_name is None: return None
+    func = _definition(tree.body, func_name)
+    if func is not None and method_name:
+        func = _definition(func.body, method_name)
+    if func is None: return None  # e.g. `solution = math.factorial`: no signature to read
+    args = [a for a in func.args.args if a.arg != "self"]
+    if not args: return None
+    if args[0].annotation is not None:
+        kind = ANNOTATION_KINDS.get(ast.unparse(args[0].annotation).replace(" ", ""))
+        if kind: return kind
+    for pattern, kind in NAME_HINTS:
+        if re.search(pattern, args[0].arg.lower()): return kind
+    return None
+
+
+def generate_inputs(kind, cases=5, seed=0):
+    """Seeded inputs of growing size; the same (kind, cases, seed) always gives the same inputs."""
+    rng = random.Random(seed)
+    inputs = []
+    for i in range(cases):
+        if kind == "int":
+            inputs.append(rng.randint(0, INT_SIZES[min(i, len(INT_SIZES) - 1)]))
+        elif kind == "float":
+            inputs.append(round(rng.uniform(0, SIZES[min(i, len(SIZES) - 1)]), 3))
+        else:
+            inputs.append(generate(kind, SIZES[min(i, len(SIZES) - 1)], seed=seed + i))
+    return inputs
+
+
+def output_key(value, compare=None):
+    """Equality key for voting under the comparator's options; fingerprinted outputs group by their hash."""
+    return value["$fingerprint"] if is_fingerprint(value) else fingerprint(value, compare)
+
+
+def consensus(outputs_by_voter, reference=None, min_agreement=0.5, compare=None):
+    """
+    outputs_by_voter: {voter: [(ok, value), ...]} over the same inputs.
+    Per input, the reference output wins when it ran cleanly; otherwise the most
+    common output wins if more than `min_agreement` of the voters that produced
+    an output agree (and at least two do). Returns one entry per input:
+    {"output", "source": "reference" | "consensus", "votes", "voters", "dissent"} or None.
+    """
+    n_inputs = len(next(iter(outputs_by_voter.values()))) if outputs_by_voter else len(reference or [])
+    decided = []
+    for i in range(n_inputs):
+        if reference and reference[i][0]:
+            value = reference[i][1]
+            agree = [v for v, outs in outputs_by_voter.items() if outs[i][0] and output_key(outs[i][1], compare) == output_key(value, compare)]
+            decided.append({"output": value, "source": "reference", "votes": len(agree), "voters": len(outputs_by_voter),
+                            "dissent": sorted(set(outputs_by_voter) - set(agree))})
+            continue
+        groups = collections.defaultdict(list)
+        for voter, outs in outputs_by_voter.items():
+            if outs[i][0]: groups[output_key(outs[i][1], compare)].append(voter)
+        answered = sum(len(g) for g in groups.values())
+        if not groups:
+            decided.append(None)
+            continue
+        key, agree = max(groups.items(), key=lambda kv: len(kv[1]))
+        if len(agree) < 2 or len(agree) <= answered * min_agreement:
+            decided.append(None)
+            continue
+        value = next(outs[i][1] for v, outs in outputs_by_voter.items() if v == agree[0])
+        decided.append({"output": value, "source": "consensus", "votes": len(agree), "voters": len(outputs_by_voter),
+                        "dissent": sorted(set(outputs_by_voter) - set(agree))})
+    return decided
+
+
+def save_cases(problem, cases, root="output/test_sets"):
+    """Adds decided cases to the problem's test set (one JSONL file per problem); known inputs are skipped."""
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, f"{problem_key(problem, '')}.jsonl")
+    return path, _append_new(path, cases)
+
+
+def load_cases(problem, root="output/test_sets"):
+    path = os.path.join(root, f"{problem_key(problem, '')}.jsonl")
+    if not os.path.exists(path): return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _append_new(path, cases):
+    known = set()
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            known = {output_key(json.loads(line)["input"]) for line in f if line.strip()}
+    added = 0
+    with open(path, "a", encoding="utf-8") as f:
+        for case in cases:
+            if output_key(case["input"]) in known: continue
+            known.add(output_key(case["input"]))
+            f.write(json.dumps(case, default=repr) + "\n")
+            added += 1
+    return added
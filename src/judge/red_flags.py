@@ -0,0 +1,168 @@
+import ast
+
+MEMO_DECORATORS = {"lru_cache", "cache", "memoize", "memoized"}
+MEMO_NAMES = {"memo", "cache", "dp", "seen", "visited", "table", "lookup"}
+LINEAR_METHODS = {"index", "count", "remove", "insert"}
+
+# Probe plan per cost class: how many timed runs are safe to attempt, and the
+# time budget (s) for the whole probe. Expensive classes are cut off sooner:
+# a blow-up is likelier than a legitimately long run.
+PROBE_RUNS = {"O(1)": 100, "O(n)": 100, "O(n^2)": 20, "O(n^3)": 5, "O(n^k)": 2, "O(2^n)": 1}
+PROBE_TIMEOUTS = {"O(1)": 10.0, "O(n)": 10.0, "O(n^2)": 10.0, "O(n^3)": 5.0, "O(n^k)": 5.0, "O(2^n)": 5.0}
+
+
+def scan(tree):
+    """
+    Pre-execution check for algorithmic red flags. Returns
+    {"flags": [str, ...], "cost_class": "O(1)" | "O(n)" | ... | "O(2^n)"}.
+    The estimate is deliberately pessimistic: it only decides how carefully
+    the sandbox probes the code, not whether the code is accepted.
+    """
+    flags = []
+    degree = 0
+    exponential = False
+    functions = {n.name: n for n in ast.walk(tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))}
+
+    for func in functions.values():
+        self_calls = [n for n in ast.walk(func) if isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id == func.name]
+        if not self_calls: continue
+        if _is_memoized(func):
+            degree = max(degree, 1)
+        elif len(self_calls) > 1:
+            flags.append(f"'{func.name}' branches recursively without memoization (exponential)")
+            exponential = True
+        else:
+            flags.append(f"'{func.name}' recurses once per call (deep inputs may hit the recursion limit)")
+            degree = max(degree, 1)
+
+    visitor = _LoopVisitor()
+    visitor.visit(tree)
+    flags.extend(visitor.flags)
+    degree = max(degree, visitor.degree)
+
+    if exponential: cost_class = "O(2^n)"
+    elif degree == 0: cost_class = "O(1)"
+    elif degree == 1: cost_class = "O(n)"
+    elif degree <= 3: cost_class = f"O(n^{degree})"
+    else: cost_class = "O(n^k)"
+    return {"flags": flags, "cost_class": cost_class}
+
+
+def plan_probe(cost_class, max_runs=100, timeout=None):
+    """
+    (runs, timeout) for the sandbox; the timeout is the budget for the whole probe,
+    picked from the cost class and capped by the configured `timeout`.
+    An unknown class (None) gets one run and the largest budget.
+    """
+    budget = PROBE_TIMEOUTS.get(cost_class, max(PROBE_TIMEOUTS.values()))
+    return min(max_runs, PROBE_RUNS.get(cost_class, 1)), min(timeout, budget) if timeout else budget
+
+
+def _is_memoized(func):
+    for dec in func.decorator_list:
+        target = dec.func if isinstance(dec, ast.Call) else dec
+        name = target.attr if isinstance(target, ast.Attribute) else getattr(target, "id", "")
+        if name in MEMO_DECORATORS: return True
+    names = {n.id for n in ast.walk(func) if isinstance(n, ast.Name)} | {a.arg for a in func.args.args}
+    return bool(names & MEMO_NAMES)
+
+
+def _is_bounded(iterable):
+    # range(<constant>) and literal collections do not scale with the input
+    if isinstance(iterable, (ast.List, ast.Tuple, ast.Set, ast.Constant)):
+        return True
+    if isinstance(iterable, ast.Call) and getattr(iterable.func, "id", None) == "range":
+        return all(isinstance(a, ast.Constant) for a in iterable.args)
+    return False
+
+
+class _LoopVisitor(ast.NodeVisitor):
+    def __init__(self):
+        self.flags = []
+        self.degree = 0
+        self._loops = []      # Iterable source of each enclosing scaling loop
+        self._lists = set()   # Names bound to lists
+        self._strings = set() # Names bound to strings
+
+    def _enter(self, node, iterable, body_nodes):
+        scaling = iterable is None or not _is_bounded(iterable)
+        if scaling:
+            source = ast.dump(iterable) if iterable is not None else None
+            if source is not None and source in self._loops:
+                self.flags.append(f"nested loops over the same iterable (line {node.lineno})")
+            self._loops.append(source)
+            self.degree = max(self.degree, len(self._loops))
+        for child in body_nodes: self.visit(child)
+        if scaling: self._loops.pop()
+
+    def visit_FunctionDef(self, node):
+        outer, self._loops = self._loops, []
+        self.generic_visit(node)
+        self._loops = outer
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_For(self, node):
+        self.visit(node.iter)
+        self._enter(node, node.iter, node.body + node.orelse)
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node):
+        self.visit(node.test)
+        self._enter(node, None, node.body + node.orelse)
+
+    def _visit_comprehension(self, node, elements):
+        def walk(generators):
+            if not generators:
+                for element in elements: self.visit(element)
+                return
+            gen = generators[0]
+            self.visit(gen.iter)
+            scaling = not _is_bounded(gen.iter)
+            if scaling:
+                self._loops.append(ast.dump(gen.iter))
+                self.degree = max(self.degree, len(self._loops))
+            for cond in gen.ifs: self.visit(cond)
+            walk(generators[1:])
+            if scaling: self._loops.pop()
+        walk(node.generators)
+
+    def visit_ListComp(self, node): self._visit_comprehension(node, [node.elt])
+    def visit_SetComp(self, node): self._visit_comprehension(node, [node.elt])
+    def visit_GeneratorExp(self, node): self._visit_comprehension(node, [node.elt])
+    def visit_DictComp(self, node): self._visit_comprehension(node, [node.key, node.value])
+
+    def visit_Assign(self, node):
+        value = node.value
+        for target in node.targets:
+            if not isinstance(target, ast.Name): continue
+            if isinstance(value, (ast.List, ast.ListComp)) or (isinstance(value, ast.Call) and getattr(value.func, "id", None) == "list"):
+                self._lists.add(target.id)
+            elif isinstance(value, ast.Constant) and isinstance(value.value, str) or isinstance(value, ast.JoinedStr):
+                self._strings.add(target.id)
+        self.generic_visit(node)
+
+    def _hidden_linear(self, node, what):
+        if self._loops:
+            self.flags.append(f"{what} inside a loop (line {node.lineno})")
+            self.degree = max(self.degree, len(self._loops) + 1)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Attribute) and node.func.attr in LINEAR_METHODS:
+            target = node.func.value
+            if not (isinstance(target, ast.Name) and target.id in self._strings):
+                self._hidden_linear(node, f"list.{node.func.attr}()")
+        self.generic_visit(node)
+
+    def visit_Compare(self, node):
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)) and (isinstance(right, ast.List) or (isinstance(right, ast.Name) and right.id in self._lists)):
+                self._hidden_linear(node, "membership test on a list")
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        if isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name) and node.target.id in self._strings and self._loops:
+            self.flags.append(f"string concatenation in a loop (line {node.lineno})")
+            self.degree = max(self.degree, len(self._loops) + 1)
+        self.generic_visit(node)
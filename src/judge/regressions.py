@@ -0,0 +1,176 @@
+import hashlib
+import re
+import statistics
+import threading
+import time
+from src.judge.leaderboard import log_dir_stamp, read_new_records
+
+DEFAULTS = {
+    "window": 5,         # Previous passing runs that form the baseline
+    "threshold": 0.25,   # Relative slowdown that counts as a regression
+    "min_delta": 1e-6,   # Absolute floor (s); sub-microsecond jitter is not a regression
+    "min_points": 2,     # Baseline runs needed before anything is reported
+}
+
+
+def normalize_problem(text):
+    """Lowercased, whitespace-collapsed problem text without trailing punctuation."""
+    return re.sub(r"\s+", " ", (text or "").lower()).strip().rstrip(".!?:; ")
+
+
+def problem_key(problem, test_input=None):
+    """
+    Stable id for "the same problem": normalized text plus the test input, since
+    timings for different inputs are not comparable. Inputs are keyed by str(),
+    which is how battle records store them.
+    """
+    canonical = test_input if isinstance(test_input, str) else str(test_input)
+    digest = hashlib.sha256(f"{normalize_problem(problem)}\0{canonical}".encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+def detect(points, window=DEFAULTS["window"], threshold=DEFAULTS["threshold"], min_delta=DEFAULTS["min_delta"], min_points=DEFAULTS["min_points"]):
+    """
+    Compares the latest point of one agent's series with the median of the
+    `window` passing runs before it. Returns a finding dict or None.
+    """
+    if len(points) < 2: return None
+    latest, history = points[-1], points[:-1]
+    baseline_times = [p["time"] for p in history if p["success"]][-window:]
+    if len(baseline_times) < min_points: return None
+    baseline = statistics.median(baseline_times)
+    finding = {"battle_id": latest["battle_id"], "baseline": baseline, "latest": latest["time"] if latest["success"] else None}
+    if not latest["success"]:
+        return {**finding, "kind": "failure", "ratio": None}
+    ratio = latest["time"] / baseline if baseline > 0 else None
+    if ratio and ratio > 1 + threshold and latest["time"] - baseline > min_delta:
+        return {**finding, "kind": "slowdown", "ratio": round(ratio, 3), "noisy": bool(latest.get("noisy"))}
+    return None
+
+
+class RegressionTracker:
+    """
+    Per-problem runtime history built from output/battle_logs: for every problem
+    key, a time series per agent plus the field's best and median per battle.
+    Updated incrementally like the leaderboard, including battles recorded by
+    other processes; `etag()` changes on every update.
+    """
+
+    def __init__(self, log_dir="output/battle_logs", **settings):
+        self.log_dir = log_dir
+        self.settings = {**DEFAULTS, **settings}
+        self._lock = threading.Lock()
+        self.version = 0
+        self._epoch = f"{int(time.time() * 1000):x}"
+        self._problems = {}
+        self._seen = set()
+        self._files = set()
+        self._log_stamp = None
+        self._sync()
+
+    def _sync(self):
+        """Applies records written since the last check (by any process); True if there were any."""
+        stamp = log_dir_stamp(self.log_dir)
+        if stamp == self._log_stamp: return False
+        records, complete = read_new_records(self.log_dir, self._files)
+        self._log_stamp = stamp if complete else None
+        for record in sorted(records, key=lambda r: (r.get("timestamp") or "", r.get("battle_id") or "")):
+            self._apply(record)
+        return bool(records)
+
+    def refresh(self):
+        with self._lock:
+            if self._sync(): self.version += 1
+
+    def _apply(self, record):
+        battle_id = record.get("battle_id")
+        # Early records did not store the problem, so they cannot be keyed
+        if battle_id in self._seen or not record.get("problem"): return
+        self._seen.add(battle_id)
+        key = problem_key(record["problem"], record.get("test_input"))
+        problem = self._problems.setdefault(key, {"problem": record["problem"], "battles": [], "agents": {}})
+        passing = []
+        for res in record.get("results", []):
+            success = bool(res.get("success"))
+            point = {"battle_id": battle_id, "timestamp": record.get("timestamp"), "time": res.get("time"), "success": success,
+                     "noisy": bool((res.get("noise") or {}).get("noisy"))}
+            problem["agents"].setdefault(res["agent"], []).append(point)
+            if success: passing.append(res["time"])
+        problem["battles"].append({
+            "battle_id": battle_id,
+            "timestamp": record.get("timestamp"),
+            "best": min(passing) if passing else None,
+            "median": statistics.median(passing) if passing else None,
+            "passed": len(passing),
+        })
+
+    def etag(self):
+        """Picks up new records from disk, then tags the current state (for HTTP caching)."""
+        self.refresh()
+        with self._lock:
+            return f"{self._epoch}-{self.version}-{len(self._files)}"
+
+    def record_battle(self, record):
+        with self._lock:
+            self._apply(record)
+            self.version += 1
+
+    def problems(self):
+        """Summary per problem key, most recently run first."""
+        self.refresh()
+        with self._lock:
+            out = []
+            for key, p in self._problems.items():
+                bests = [b["best"] for b in p["battles"] if b["best"] is not None]
+                out.append({
+                    "key": key,
+                    "problem": p["problem"][:120],
+                    "battles": len(p["battles"]),
+                    "last_run": p["battles"][-1]["timestamp"],
+                    "best": min(bests) if bests else None,
+                    "median_best": statistics.median(bests) if bests else None,
+                })
+            return sorted(out, key=lambda x: x["last_run"] or "", reverse=True)
+
+    def series(self, key):
+        self.refresh()
+        with self._lock:
+            p = self._problems.get(key)
+            if p is None: return None
+            agents = {}
+            for name, points in p["agents"].items():
+                times = [pt["time"] for pt in points if pt["success"]]
+                agents[name] = {
+                    "points": list(points),
+                    "best": min(times) if times else None,
+                    "median": statistics.median(times) if times else None,
+                }
+            return {"key": key, "problem": p["problem"], "battles": list(p["battles"]), "agents": agents}
+
+    def regressions(self, key=None):
+        """Latest-run regressions for every agent on every problem (or one problem)."""
+        self.refresh()
+        with self._lock:
+            findings = []
+            for k, p in self._problems.items():
+                if key and k != key: continue
+                for name, points in p["agents"].items():
+                    finding = detect(points, **self.settings)
+                    if finding: findings.append({"key": k, "problem": p["problem"][:120], "agent": name, **finding})
+            return findings
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+def get_regression_tracker(log_dir="output/battle_logs", **settings):
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = RegressionTracker(log_dir, **settings)
+        return _tracker
+
+def notify_battle(record):
+    """Feeds a finished battle to the live tracker; a no-op until something has read it."""
+    if _tracker is not None:
+        _tracker.record_battle(record)
@@ -0,0 +1,183 @@
+import builtins
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from src.judge.complexity import analyze_code
+from src.judge.execution import LocalSandbox
+from src.judge.isolation import CpuLimitExceeded, cpu_budget, harden_process
+from src.judge.noise import keep_off, measure, pin_worker, plan_cores
+
+_isolation = None  # Set in hardened workers by _init_worker
+
+
+def _init_worker(isolation, cores, slots):
+    global _isolation
+    pin_worker(cores, slots)
+    if isolation:
+        harden_process(isolation)
+    _isolation = isolation
+
+
+def _sandbox(timeout, compare):
+    if _isolation is None:
+        return LocalSandbox(timeout=timeout, compare=compare)
+    return LocalSandbox(timeout=timeout, restricted=True, allowed_imports=_isolation.get("allowed_imports"), compare=compare)
+
+
+def _contained(job):
+    """
+    Job results and exceptions are pickled back to the arena. A BaseException
+    class defined by the submission (Exception is already caught by the sandbox)
+    is replaced by a RuntimeError carrying only its text.
+    """
+    @functools.wraps(job)
+    def run(*args, **kwargs):
+        try:
+            return job(*args, **kwargs)
+        except BaseException as e:
+            # __module__ can be anything for classes made by exec, so check identity
+            if getattr(builtins, type(e).__name__, None) is type(e): raise
+            raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    return run
+
+
+@_contained
+def _benchmark_job(code, test_input, expected_output, timeout, compare=None):
+    sandbox = _sandbox(timeout, compare)
+    if _isolation is None:
+        return sandbox.run_benchmark(code, test_input, expected_output)
+    try:
+        with cpu_budget(_isolation.get("cpu_seconds")):
+            return sandbox.run_benchmark(code, test_input, expected_output)
+    except CpuLimitExceeded:
+        return float('inf'), False, f"Timeout: exceeded CPU limit of {_isolation['cpu_seconds']}s"
+
+
+def _measure_job(code, test_input, expected_output, timeout, noise_limits=None, compare=None):
+    result, report = measure(lambda: _benchmark_job(code, test_input, expected_output, timeout, compare), noise_limits)
+    return (*result, report)
+
+
+@_contained
+def _outputs_job(code, inputs, timeout, compare=None):
+    sandbox = _sandbox(timeout, compare)
+    if _isolation is None:
+        outputs = sandbox.run_outputs(code, inputs)
+    else:
+        try:
+            with cpu_budget(_isolation.get("cpu_seconds")):
+                outputs = sandbox.run_outputs(code, inputs)
+        except CpuLimitExceeded:
+            outputs = [(False, f"Timeout: exceeded CPU limit of {_isolation['cpu_seconds']}s")] * len(inputs)
+    # run_outputs already reduced every output to plain builtin data (see to_plain)
+    return outputs
+
+
+def _analyze_job(code):
+    return analyze_code(code)
+
+
+class WorkerPool:
+    """
+    Runs sandbox benchmarks and static analysis off the orchestrator thread.
+    With max_workers=0 jobs run inline (same results, no processes), which is
+    what tests and constrained hosts use.
+
+    With `isolation` (the `sandbox` section of settings.yaml) every worker is
+    hardened at startup (rlimits, no network, audit hook), runs submissions with
+    restricted builtins and is replaced after `recycle_after` jobs so leaked
+    memory or state never outlives a few battles.
+
+    With `measurement` (settings.yaml) each worker is pinned to a core of its own;
+    `measure()` jobs return the host noise seen during the probe and retry probes
+    that were disturbed. The pool never moves this process: entry points call
+    reserve_worker_cores once at startup.
+    """
+
+    def __init__(self, max_workers=2, start_method="fork", isolation=None, measurement=None):
+        self.max_workers = max_workers
+        self.isolation = isolation if isolation and isolation.get("enabled", True) else None
+        if self.isolation and self.isolation.get("recycle_after") and start_method == "fork":
+            start_method = "forkserver"  # max_tasks_per_child cannot be combined with fork
+        self.start_method = start_method
+        measurement = measurement if measurement and measurement.get("enabled", True) else {}
+        self.noise_limits = measurement.get("limits")
+        self.worker_cores, self.other_cores = plan_cores(max_workers, measurement.get("cores")) if measurement.get("pin", True) else ([], [])
+        self._slots = multiprocessing.get_context(start_method).Array('i', len(self.worker_cores)) if self.worker_cores else None
+        self._lock = threading.Lock()
+        self._executor = self._new_executor() if max_workers else None
+
+    def _new_executor(self):
+        context = multiprocessing.get_context(self.start_method)
+        if not self.isolation and not self.worker_cores:
+            return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=context,
+            initializer=_init_worker, initargs=(self.isolation, self.worker_cores, self._slots),
+            max_tasks_per_child=(self.isolation or {}).get("recycle_after") or None,
+        )
+
+    def submit(self, fn, *args):
+        if self._executor is None:
+            future = Future()
+            try: future.set_result(fn(*args))
+            except Exception as e: future.set_exception(e)
+            return future
+        with self._lock:
+            try:
+                return self._executor.submit(fn, *args)
+            except BrokenProcessPool:
+                # A submission killed its worker (e.g. os._exit); start a fresh pool
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+                return self._executor.submit(fn, *args)
+
+    def benchmark(self, code, test_input, expected_output, timeout=None, compare=None):
+        """
+        Future of (avg_time, success, message); inputs travel as-is, so prefer dataset
+        specs for big data and a fingerprint spec (comparator.compact) for big expected outputs.
+        """
+        return self.submit(_benchmark_job, code, test_input, expected_output, timeout, compare)
+
+    def measure(self, code, test_input, expected_output, timeout=None, compare=None):
+        """Future of (avg_time, success, message, noise_report); see noise.assess."""
+        return self.submit(_measure_job, code, test_input, expected_output, timeout, self.noise_limits, compare)
+
+    def outputs(self, code, inputs, timeout=None, compare=None):
+        """Future of [(ok, output_or_error), ...], one untimed call per input; big outputs come back fingerprinted."""
+        return self.submit(_outputs_job, code, inputs, timeout, compare)
+
+    def analyze(self, code):
+        return self.submit(_analyze_job, code)
+
+    def shutdown(self):
+        if self._executor: self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_worker_pool(max_workers=2, start_method="fork", isolation=None, measurement=None):
+    """One shared pool per configuration per process."""
+    key = (max_workers, start_method, repr(isolation), repr(measurement))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = WorkerPool(max_workers, start_method, isolation, measurement)
+        return _pools[key]
+
+
+def pool_from_settings(settings):
+    """The shared pool described by settings.yaml (battle_settings, sandbox, measurement)."""
+    battle_settings = settings.get('battle_settings', {}) or {}
+    return get_worker_pool(battle_settings.get('workers', 2), battle_settings.get('start_method', 'fork'), settings.get('sandbox'), settings.get('measurement'))
+
+
+def reserve_worker_cores(settings):
+    """
+    Moves this whole process (Flask, judge threads, local inference) off the cores
+    the settings' pool pins its workers to. Called once by entry points, early,
+    so threads started afterwards inherit the mask.
+    """
+    keep_off(pool_from_settings(settings).other_cores)
@@ -0,0 +1,123 @@
+import functools
+import math
+
+try:
+    import tiktoken
+except ImportError:  # Optional: token counts are estimated from the text length instead
+    tiktoken = None
+
+# Prompt tokens (system + user) allowed per request, by kind; settings.yaml `prompt_budget` overrides
+DEFAULT_BUDGETS = {"generate": 2000, "refine": 3000, "judge": 6000}
+CHARS_PER_TOKEN = 3.5  # Heuristic; code and JSON tokenize denser than prose, so this errs high
+MIN_KEEP_TOKENS = 40   # A truncated section keeps at least this much
+MARKER_TOKENS = 12     # Room for the "[... n chars trimmed ...]" marker
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model, cloud):
+    if tiktoken is None: return None
+    if cloud:
+        try: return tiktoken.encoding_for_model(model or "gpt-4o")
+        except KeyError: pass
+    # Ollama exposes no tokenizer; Llama 3's vocabulary is close to cl100k
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def counter_name(model=None, cloud=False):
+    encoding = _encoding(model, cloud)
+    return f"tiktoken:{encoding.name}" if encoding else "heuristic"
+
+
+def count_tokens(text, model=None, cloud=False):
+    """Tokens `text` costs on the backend: exact for OpenAI models with tiktoken installed, estimated otherwise."""
+    if not text: return 0
+    encoding = _encoding(model, cloud)
+    if encoding: return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def budget_for(kind, settings=None):
+    return (settings or {}).get(kind, DEFAULT_BUDGETS.get(kind))
+
+
+def truncate(text, tokens, mode="middle", model=None, cloud=False):
+    """
+    Cuts `text` to roughly `tokens`: "middle" keeps head and tail, "head" keeps the
+    start (code: whole lines), "tail" keeps the end (logs). The cut is marked.
+    """
+    have = count_tokens(text, model, cloud)
+    if have <= tokens: return text
+    keep = max(1, int(len(text) * tokens / have))
+    dropped = len(text) - keep
+    if mode == "head":
+        cut = text[:keep]
+        if "\n" in cut: cut = cut[:cut.rindex("\n")]
+        return f"{cut}\n# ... [{len(text) - len(cut)} chars trimmed]"
+    if mode == "tail":
+        return f"[... {dropped} chars trimmed]\n{text[-keep:]}"
+    head = keep * 2 // 3
+    return f"{text[:head]} [... {dropped} chars trimmed ...] {text[len(text) - (keep - head):]}"
+
+
+class PromptBuilder:
+    """
+    Assembles a prompt from labelled sections and fits it into a token budget.
+    When over budget it first minifies code sections, then drops optional
+    sections, then truncates the rest; lowest priority goes first every time,
+    and sections added with kind="fixed" are never touched.
+    """
+
+    MODES = {"text": "middle", "code": "head", "log": "tail"}
+
+    def __init__(self, budget=None, model=None, cloud=False, reserved=""):
+        self.budget = budget
+        self.model = model
+        self.cloud = cloud
+        self.reserved = count_tokens(reserved, model, cloud)  # The system prompt also counts
+        self.sections = []
+        self.trimmed = []
+
+    def add(self, label, text, priority=0, kind="text", optional=False):
+        if text is None or text == "": return self
+        self.sections.append({"label": label, "text": str(text), "priority": priority, "kind": kind, "optional": optional})
+        return self
+
+    def _render(self):
+        return "\n".join(f"{s['label']}: {s['text']}" if s['label'] else s['text'] for s in self.sections)
+
+    def tokens(self):
+        return self.reserved + count_tokens(self._render(), self.model, self.cloud)
+
+    def build(self):
+        """(prompt, report); report holds tokens, budget, counter and what was trimmed."""
+        if self.budget:
+            self._fit()
+        tokens = self.tokens()
+        report = {"tokens": tokens, "budget": self.budget, "counter": counter_name(self.model, self.cloud), "trimmed": self.trimmed}
+        if self.budget and tokens > self.budget: report["over_budget"] = True
+        return self._render(), report
+
+    def _fit(self):
+        from src.judge.evidence import compact_code
+        by_priority = sorted(self.sections, key=lambda s: s['priority'])
+        for section in by_priority:
+            if self.tokens() <= self.budget: return
+            if section['kind'] == "code":
+                minified = compact_code(section['text'])
+                if len(minified) < len(section['text']):
+                    section['text'] = minified
+                    self.trimmed.append(f"{section['label']}: minified")
+        for section in by_priority:
+            if self.tokens() <= self.budget: return
+            if section['optional']:
+                self.sections.remove(section)
+                self.trimmed.append(f"{section['label']}: dropped")
+        for section in by_priority:
+            excess = self.tokens() - self.budget
+            if excess <= 0: return
+            if section['kind'] == "fixed" or not any(s is section for s in self.sections): continue
+            have = count_tokens(section['text'], self.model, self.cloud)
+            target = max(MIN_KEEP_TOKENS, have - excess - MARKER_TOKENS)
+            if target >= have: continue
+            section['text'] = truncate(section['text'], target, self.MODES[section['kind']], self.model, self.cloud)
+            self.trimmed.append(f"{section['label']}: truncated to ~{target} tokens")
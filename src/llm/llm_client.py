@@ -1,65 +1,173 @@
 import os
-import ollama
-from openai import OpenAI
-from dotenv import load_dotenv, find_dotenv
+from src.llm.structured import JsonStreamExtractor, StructuredOutputError, validate, repair_prompt
 
-# Load Env
-env_file = find_dotenv(usecwd=True)
-if env_file: load_dotenv(env_file)
+# Backend SDKs (openai, ollama, dotenv) are imported on first use so that
+# importing the arena does not pay for backends a run never touches.
+_env_loaded = False
+_clients = {}
+
+def _load_env():
+    global _env_loaded
+    if _env_loaded: return
+    from dotenv import load_dotenv, find_dotenv
+    env_file = find_dotenv(usecwd=True)
+    if env_file: load_dotenv(env_file)
+    _env_loaded = True
+
+def _openai_client(token):
+    # One client (and connection pool) per token, shared by every agent
+    if token not in _clients:
+        from openai import OpenAI
+        _clients[token] = OpenAI(
+            base_url="https://models.inference.ai.azure.com",
+            api_key=token
+        )
+    return _clients[token]
+
+def resolve_local_model(model_name):
+    """Ollama model actually served for a configured model name."""
+    return "mistral" if "mistral" in (model_name or "").lower() else "llama3.1"
+
+def _ollama_usage(response, usage):
+    # Ollama reports durations in nanoseconds; load time is separate from generation
+    if usage is None or response is None: return
+    ns = lambda key: (response.get(key) or 0) / 1e9
+    usage.update({
+        "load_s": ns('load_duration'),
+        "prompt_eval_s": ns('prompt_eval_duration'),
+        "generate_s": ns('eval_duration'),
+        "prompt_tokens": response.get('prompt_eval_count') or 0,
+        "completion_tokens": response.get('eval_count') or 0,
+    })
 
 class LocalLLM:
-    def __init__(self):
+    def __init__(self, local_options=None, keep_alive=None):
+        _load_env()
+        self.local_options = local_options # Extra Ollama options, e.g. num_thread
+        self.keep_alive = keep_alive # How long Ollama keeps a model loaded after a call, e.g. "10m"
         self.github_token = os.getenv("GITHUB_TOKEN")
-        self.client = None
-        
+
         if self.github_token:
             masked = self.github_token[:4] + "..." + self.github_token[-4:]
             print(f"🟢 API Client Ready ({masked})")
-            self.client = OpenAI(
-                base_url="https://models.inference.ai.azure.com",
-                api_key=self.github_token
-            )
         else:
             print("🟠 API Client Disabled (No Token)")
 
-    def get_response(self, model_name, system_prompt, user_prompt, force_local=False):
+    @property
+    def client(self):
+        return _openai_client(self.github_token) if self.github_token else None
+
+    def get_response(self, model_name, system_prompt, user_prompt, force_local=False, usage=None, temperature=None):
+        # `usage` (a dict) is filled with load/generation timings and token counts when the backend reports them
+        return self._chat(model_name, system_prompt, user_prompt, force_local, usage=usage, temperature=temperature)
+
+    def preload(self, model_name):
+        """Loads a local model ahead of use (an empty generate call) and returns its usage."""
+        import ollama
+        kwargs = {'keep_alive': self.keep_alive} if self.keep_alive else {}
+        usage = {}
+        _ollama_usage(ollama.generate(model=resolve_local_model(model_name), prompt="", **kwargs), usage)
+        return usage
+
+    def get_json(self, model_name, system_prompt, user_prompt, schema, force_local=False, check=None, max_repairs=1, usage=None):
+        """
+        Requests a JSON object matching `schema` (see structured.validate).
+        Uses the backend's JSON mode, stops streaming once the object closes, and on a
+        bad reply resends only the broken fragment for repair instead of the full prompt.
+        `check(obj)` may return extra semantic errors (e.g. an unknown winner).
+        `usage` accumulates token counts and timings over the repair attempts.
+        """
+        prompt = user_prompt
+        for attempt in range(max_repairs + 1):
+            extractor = JsonStreamExtractor()
+            call_usage = {} if usage is not None else None
+            self._chat(model_name, system_prompt, prompt, force_local, json_mode=True, on_chunk=extractor.feed, usage=call_usage)
+            for key, value in (call_usage or {}).items(): usage[key] = usage.get(key, 0) + value
+            try:
+                obj = extractor.result()
+                errors = validate(obj, schema) + (check(obj) if check and isinstance(obj, dict) else [])
+                fragment = extractor.fragment
+            except StructuredOutputError as e:
+                obj, errors, fragment = None, [str(e)], e.fragment or extractor.fragment
+            if not errors:
+                return obj
+            print(f"🟠 Malformed JSON ({'; '.join(errors)}), attempt {attempt + 1}")
+            prompt = repair_prompt(fragment or "(empty)", errors, schema)
+            system_prompt = "You repair JSON. Output JSON only."
+        raise StructuredOutputError(f"Invalid JSON after {max_repairs} repair(s): {'; '.join(errors)}", fragment)
+
+    def _chat(self, model_name, system_prompt, user_prompt, force_local=False, json_mode=False, on_chunk=None, usage=None, temperature=None):
+        # on_chunk(text) streams the reply; returning True stops reading early
         try:
             # --- STRATEGY 1: GITHUB API (Only if client exists AND not forced local) ---
-            if self.client and not force_local:
+            if self.github_token and not force_local:
                 real_model = model_name
-                
+
                 # Check for GPT-4o
-                if "gpt-4o" in model_name.lower(): 
+                if "gpt-4o" in model_name.lower():
                     real_model = "gpt-4o"
-                
+
                 # Determine Role (GPT-4o uses 'system', o1/o3 uses 'developer')
                 role_name = "system"
                 if real_model.startswith("o1") or real_model.startswith("o3"):
                     role_name = "developer"
 
+                kwargs = {}
+                if json_mode: kwargs['response_format'] = {"type": "json_object"}
+                if on_chunk is not None and usage is not None: kwargs['stream_options'] = {"include_usage": True}
                 response = self.client.chat.completions.create(
                     messages=[
                         {"role": role_name, "content": system_prompt},
                         {"role": "user", "content": user_prompt}
                     ],
                     model=real_model,
-                    temperature=0.7,
-                    max_tokens=4096
+                    temperature=0.7 if temperature is None else temperature,
+                    max_tokens=4096,
+                    stream=on_chunk is not None,
+                    **kwargs
                 )
-                return response.choices[0].message.content
+                if on_chunk is None:
+                    if usage is not None and response.usage:
+                        usage.update(prompt_tokens=response.usage.prompt_tokens, completion_tokens=response.usage.completion_tokens)
+                    return response.choices[0].message.content
+                parts = []
+                for event in response:
+                    if usage is not None and getattr(event, 'usage', None):
+                        usage.update(prompt_tokens=event.usage.prompt_tokens, completion_tokens=event.usage.completion_tokens)
+                    delta = event.choices[0].delta.content if event.choices else None
+                    if not delta: continue
+                    parts.append(delta)
+                    # The usage event comes last; in JSON mode little else follows the object
+                    if on_chunk(delta) and usage is None: break
+                response.close()
+                return "".join(parts)
 
             # --- STRATEGY 2: LOCAL OLLAMA ---
             else:
-                clean_model = "llama3.1" # Fallback
-                if "mistral" in model_name.lower(): clean_model = "mistral"
-                
+                import ollama
+                clean_model = resolve_local_model(model_name)
+
                 messages = [
                     {'role': 'system', 'content': system_prompt},
                     {'role': 'user', 'content': user_prompt}
                 ]
-                response = ollama.chat(model=clean_model, messages=messages)
-                return response['message']['content']
+                kwargs = {'format': 'json'} if json_mode else {}
+                options = dict(self.local_options or {})
+                if temperature is not None: options['temperature'] = temperature
+                if options: kwargs['options'] = options
+                if self.keep_alive: kwargs['keep_alive'] = self.keep_alive
+                if on_chunk is None:
+                    response = ollama.chat(model=clean_model, messages=messages, **kwargs)
+                    _ollama_usage(response, usage)
+                    return response['message']['content']
+                parts = []
+                for event in ollama.chat(model=clean_model, messages=messages, stream=True, **kwargs):
+                    delta = event['message']['content']
+                    parts.append(delta)
+                    if event.get('done'): _ollama_usage(event, usage)
+                    if on_chunk(delta): break
+                return "".join(parts)
 
         except Exception as e:
             print(f"❌ LLM Error: {e}")
-            raise e
\ No newline at end of file
+            raise e
@@ -0,0 +1,77 @@
+import threading
+import time
+from src.llm.llm_client import resolve_local_model
+
+
+class LocalModelScheduler:
+    """
+    Orders local (Ollama) agent calls so each model is loaded once per round.
+
+    Agents are grouped by the model Ollama actually serves; the group whose model
+    is already resident goes first, and each group's model is preloaded (with
+    keep_alive) right before its calls so the load is timed on its own. Keeping
+    one model's calls back to back also lets Ollama reuse its KV cache for
+    repeated prompt prefixes (same agent personality across rounds).
+    """
+
+    def __init__(self, llm, log=print):
+        self.llm = llm
+        self.log = log
+        self.current_model = None
+        self._lock = threading.RLock()
+        self._stats = {}
+
+    def model_of(self, agent):
+        return None if agent.is_cloud else resolve_local_model(agent.model)
+
+    def order(self, agents):
+        """Agents grouped by resolved model (resident model first, cloud agents last), config order within a group."""
+        groups = {}
+        for agent in agents:
+            groups.setdefault(self.model_of(agent), []).append(agent)
+        keys = sorted(groups, key=lambda m: (m is None, m != self.current_model, list(groups).index(m)))
+        return [agent for key in keys for agent in groups[key]]
+
+    def warm(self, agent):
+        """Preloads the agent's model if it is not the resident one; the load is recorded separately."""
+        model = self.model_of(agent)
+        if model is None or model == self.current_model: return
+        start = time.perf_counter()
+        try:
+            usage = self.llm.preload(model)
+        except Exception as e:
+            self.log(f"   ⚠️ Could not preload {model}: {e}")
+            return
+        load_s = usage.get("load_s") or time.perf_counter() - start
+        with self._lock:
+            self._entry(model)["load_s"] += load_s
+            self._entry(model)["loads"] += 1
+        self.current_model = model
+        self.log(f"📦 Loaded {model} in {load_s:.2f}s")
+
+    def record(self, agent, usage, wall_s):
+        """Accounts one call; a cold load that happened inside the call still counts as load time."""
+        model = self.model_of(agent) or agent.model
+        load_s = usage.get("load_s", 0.0)
+        with self._lock:  # Best-of-N samples record concurrently
+            entry = self._entry(model)
+            entry["calls"] += 1
+            entry["load_s"] += load_s
+            entry["generate_s"] += usage.get("generate_s", wall_s - load_s) + usage.get("prompt_eval_s", 0.0)
+            entry["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            entry["completion_tokens"] += usage.get("completion_tokens", 0)
+            if self.model_of(agent): self.current_model = model
+
+    def reset(self):
+        """Starts a new accounting period (one battle); the resident model is kept."""
+        with self._lock:
+            self._stats = {}
+
+    def _entry(self, model):
+        with self._lock:
+            return self._stats.setdefault(model, {"calls": 0, "loads": 0, "load_s": 0.0, "generate_s": 0.0, "prompt_tokens": 0, "completion_tokens": 0})
+
+    def report(self):
+        """Per-model totals; load_s and generate_s are kept apart."""
+        with self._lock:
+            return {m: {k: round(v, 3) if isinstance(v, float) else v for k, v in s.items()} for m, s in self._stats.items()}
@@ -0,0 +1,113 @@
+import ast
+import json
+import re
+
+
+class StructuredOutputError(Exception):
+    def __init__(self, message, fragment=""):
+        super().__init__(message)
+        self.fragment = fragment
+
+
+class JsonStreamExtractor:
+    """
+    Incrementally scans model output for the first complete top-level JSON object.
+    Prose, markdown fences and anything after the closing brace are ignored, so a
+    streaming caller can stop reading as soon as `feed` returns True.
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        self.complete = False
+
+    def feed(self, chunk):
+        for ch in chunk:
+            if self.complete:
+                break
+            if not self.started:
+                if ch != "{":
+                    continue
+                self.started = True
+            self.buffer.append(ch)
+            if self.in_string:
+                if self.escaped: self.escaped = False
+                elif ch == "\\": self.escaped = True
+                elif ch == '"': self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+        return self.complete
+
+    @property
+    def fragment(self):
+        return "".join(self.buffer)
+
+    def result(self):
+        if not self.started:
+            raise StructuredOutputError("No JSON object found in response.")
+        text = self.fragment
+        if not self.complete:
+            raise StructuredOutputError("JSON object is truncated.", text)
+        return loads_tolerant(text)
+
+
+def loads_tolerant(text):
+    """json.loads plus the usual LLM slips: trailing commas and Python literals."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        error = e
+    cleaned = re.sub(r",\s*([}\]])", r"\1", text)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        pass
+    try:
+        value = ast.literal_eval(cleaned)
+        if isinstance(value, dict): return value
+    except (ValueError, SyntaxError):
+        pass
+    raise StructuredOutputError(f"Invalid JSON: {error}", text)
+
+
+def extract_json(text):
+    extractor = JsonStreamExtractor()
+    extractor.feed(text)
+    return extractor.result()
+
+
+def validate(obj, schema):
+    """
+    Minimal schema check. `schema` maps required keys to a type, a tuple of types,
+    or None for "any value". Returns a list of error strings (empty when valid).
+    """
+    if not isinstance(obj, dict):
+        return [f"expected a JSON object, got {type(obj).__name__}"]
+    errors = []
+    for key, expected in schema.items():
+        if key not in obj:
+            errors.append(f"missing key '{key}'")
+        elif expected is not None and not isinstance(obj[key], expected):
+            names = expected.__name__ if isinstance(expected, type) else "/".join(t.__name__ for t in expected)
+            errors.append(f"'{key}' must be {names}")
+    return errors
+
+
+def repair_prompt(fragment, errors, schema):
+    keys = ", ".join(schema)
+    return (
+        "The following JSON is broken or does not match the required shape.\n"
+        f"PROBLEMS: {'; '.join(errors)}\n"
+        f"REQUIRED KEYS: {keys}\n"
+        f"JSON:\n{fragment}\n"
+        "Return ONLY the corrected JSON object. Keep every value that is already valid."
+    )
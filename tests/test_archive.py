@@ -0,0 +1,74 @@
+import sys
+import os
+import csv
+import glob
+import json
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.judge.archive import ArchiveExporter, rows
+
+def battle(battle_id, champion, ratings):
+    results = [{"agent": "A", "time": 0.01, "success": True, "complexity": 2, "msg": "Success", "round": 2, "code_hash": "h1"},
+               {"agent": "B", "time": 999.0, "success": False, "complexity": 5, "msg": "Wrong Answer", "round": 2, "code_hash": "h2",
+                "sampling": {"n": 3}}]
+    return {"battle_id": battle_id, "timestamp": "2026-01-01 00:00:00", "problem": "Sum a list.", "test_input": "[1, 2]",
+            "expected_output": {"$fingerprint": "sha256:ab", "size": 20000}, "champion": champion, "results": results, "ratings": ratings}
+
+def read_table(out, table):
+    out_rows = []
+    for path in sorted(glob.glob(os.path.join(out, table, "*.csv"))):
+        with open(path, newline="") as f: out_rows.extend(csv.DictReader(f))
+    return out_rows
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logs = os.path.join(self.tmp.name, "logs")
+        self.out = os.path.join(self.tmp.name, "analytics")
+        os.makedirs(self.logs)
+        self.add("b1", "A", {"A": 1216, "B": 1184})
+        self.add("b2", "A", {"A": 1230, "B": 1170})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, battle_id, champion, ratings):
+        with open(os.path.join(self.logs, f"{battle_id}_data.json"), "w") as f:
+            json.dump(battle(battle_id, champion, ratings), f)
+
+    def exporter(self, batch_size=5000):
+        return ArchiveExporter(self.logs, self.out, fmt="csv", batch_size=batch_size, log=lambda msg: None)
+
+    def test_rows(self):
+        last = {"A": 1200}
+        tables = rows(battle("b1", "A", {"A": 1216, "B": 1184}), last)
+        self.assertEqual(tables["battles"][0]["passed"], 1)
+        self.assertEqual(tables["battles"][0]["expected_output"], '{"$fingerprint": "sha256:ab", "size": 20000}')
+        self.assertEqual([r["samples"] for r in tables["results"]], [1, 3])
+        self.assertEqual([(e["agent"], e["delta"]) for e in tables["rating_events"]], [("A", 16), ("B", None)])
+        self.assertEqual(last, {"A": 1216, "B": 1184})
+
+    def test_incremental_export(self):
+        self.assertEqual(self.exporter(batch_size=1).run()["parts"], 2)
+        self.assertEqual(len(read_table(self.out, "results")), 4)
+        self.assertEqual(self.exporter().run()["battles"], 0)
+
+        self.add("b3", "B", {"A": 1214, "B": 1186})
+        self.assertEqual(self.exporter().run()["battles"], 1)
+        self.assertEqual(len(read_table(self.out, "battles")), 3)
+        events = read_table(self.out, "rating_events")
+        self.assertEqual([e["delta"] for e in events if e["agent"] == "B"], ["", "-14", "16"])
+
+    def test_format_cannot_change(self):
+        self.exporter().run()
+        with open(os.path.join(self.out, "_export_state.json")) as f: state = json.load(f)
+        state["format"] = "parquet"
+        with open(os.path.join(self.out, "_export_state.json"), "w") as f: json.dump(state, f)
+        with self.assertRaises(ValueError):
+            self.exporter()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.arena.batch import BatchRunner, auto_critiques, read_completed, read_problems
+
+def score(agent, success, time, msg="Success"):
+    return {"agent": agent, "success": success, "time": time, "msg": msg, "complexity": 1}
+
+class FakeArena:
+    def __init__(self, calls):
+        self.calls = calls
+        self.elo = object()
+
+    def run_phase_1(self, problem, test_input, expected_output, reference=None):
+        if "explode" in problem: raise RuntimeError("boom")
+        self.calls.append(problem)
+        return {"battle_id": f"b{len(self.calls)}", "verdict": {"winner": "A"}, "round1_scores": [score("A", True, 0.001), score("B", False, 999.0, "Wrong Answer")]}
+
+    def run_phase_2(self, state, human_critiques):
+        return [score("A", True, 0.001), score("B", True, 0.002)]
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.problems = os.path.join(self.tmp.name, "problems.jsonl")
+        self.out = os.path.join(self.tmp.name, "results.jsonl")
+        with open(self.problems, "w") as f:
+            f.write(json.dumps({"id": "p1", "problem": "Sum a list.", "input": [1, 2], "output": 3}) + "\n")
+            f.write("not json\n\n")
+            f.write(json.dumps({"request_id": "p2", "body": "Reverse a string.", "input": "ab", "output": "ba"}) + "\n")
+            f.write(json.dumps({"id": "p3", "problem": "explode"}) + "\n")
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def runner(self, parallelism=2):
+        return BatchRunner(self.problems, self.out, parallelism=parallelism, arena_factory=lambda: FakeArena(self.calls), log=lambda msg: None)
+
+    def test_runs_and_resumes(self):
+        self.assertEqual(self.runner().run(), {"ok": 2, "error": 1, "skipped": 0})
+        self.assertEqual(read_completed(self.out), {"p1", "p2"})
+        with open(self.out, "a") as f: f.write('{"id": "p9", "sta') # Torn line from a crash
+        self.calls.clear()
+        self.assertEqual(self.runner().run(), {"ok": 0, "error": 1, "skipped": 2})
+        self.assertEqual(self.calls, [])
+        with open(self.out) as f: lines = f.read().splitlines()
+        self.assertEqual(json.loads(lines[-1])["id"], "p3") # Written on a fresh line
+
+    def test_read_problems_keeps_input_without_output(self):
+        with open(self.problems, "a") as f:
+            f.write(json.dumps({"id": "p4", "problem": "Double it.", "input": 21}) + "\n")
+            f.write(json.dumps({"id": "p5", "problem": "Double it.", "output": 42}) + "\n")
+            f.write(json.dumps({"id": "p6", "input": 1}) + "\n")
+        logged = []
+        problems = {p["id"]: p for p in read_problems(self.problems, logged.append)}
+        self.assertEqual((problems["p4"]["input"], problems["p4"]["output"]), (21, None))
+        self.assertEqual((problems["p5"]["input"], problems["p5"]["output"]), (None, None))
+        self.assertEqual(len(logged), 2) # The bad JSON line and the line without a problem
+        self.assertIn("not valid JSON", logged[0])
+
+    def test_critique_policy(self):
+        state = {"verdict": {"winner": "A"}, "round1_scores": [score("A", True, 0.001), score("B", False, 999.0, "Wrong Answer"), score("C", True, 0.004)]}
+        self.assertEqual(auto_critiques("none", state), {})
+        self.assertEqual(set(auto_critiques("failures", state)), {"B"})
+        self.assertIn("4.0x slower", auto_critiques("speed", state)["C"])
+        self.assertEqual(set(auto_critiques("auto", state)), {"B", "C"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,12 @@
 import sys
 import os
+import tempfile
 import unittest
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.judge.complexity import get_complexity_score
+from src.judge.complexity import get_complexity_score, analyze_code
+from src.judge.workers import WorkerPool
 
 class TestComplexity(unittest.TestCase):
     
@@ -41,5 +43,102 @@ def solution(n):
         score = get_complexity_score(code)
         self.assertEqual(score, 100)
 
+    def test_helpers_are_counted(self):
+        code = """
+def helper(x):
+    if x > 0:
+        return x
+    return -x
+
+def solution(n):
+    return helper(n)
+"""
+        metrics = analyze_code(code)
+        self.assertEqual(metrics["cyclomatic"]["functions"], {"helper": 2, "solution": 1})
+        self.assertEqual(metrics["score"], 3)
+
+    def test_static_metrics(self):
+        code = """
+def solution(grid):
+    total = 0
+    for row in grid:
+        for cell in row:
+            total += sum(x for x in range(cell))
+    return total
+"""
+        metrics = analyze_code(code)
+        self.assertEqual(metrics["max_loop_depth"], 3)
+        self.assertGreater(metrics["halstead"]["volume"], 0)
+        self.assertTrue(0 < metrics["maintainability_index"] <= 100)
+        self.assertIs(metrics, analyze_code(code)) # Cached by hash
+
+    def test_maintainability_index_matches_radon(self):
+        from radon.metrics import mi_visit
+        code = '''
+def solution(nums):
+    """Largest pairwise gap."""
+    # Sort once, then scan neighbours
+    nums = sorted(nums)
+    best = 0
+    for a, b in zip(nums, nums[1:]):
+        if b - a > best:
+            best = b - a
+    return best
+'''
+        self.assertEqual(analyze_code(code)["maintainability_index"], round(mi_visit(code, True), 2))
+
+class TestWorkerPool(unittest.TestCase):
+    def test_process_pool_matches_inline(self):
+        code = "def solution(n):\n    return n * 2\n"
+        for workers in (0, 1):
+            pool = WorkerPool(max_workers=workers)
+            try:
+                time, success, msg = pool.benchmark(code, 5, 10).result(timeout=30)
+                self.assertTrue(success, msg)
+                self.assertEqual(pool.analyze(code).result(timeout=30)["score"], 1)
+            finally:
+                pool.shutdown()
+
+    def test_isolated_workers(self):
+        pool = WorkerPool(max_workers=1, isolation={"memory_mb": 512, "cpu_seconds": 1, "recycle_after": 2})
+        try:
+            self.assertTrue(pool.benchmark("def solution(n):\n    return n * 2\n", 5, 10).result(timeout=60)[1])
+            # Builtins are trimmed, but os is still reachable through object graphs; the audit hook stops it
+            escape = "def solution(n):\n    wrap = [c for c in object.__subclasses__() if c.__name__ == '_wrap_close'][0]\n    return wrap.__init__.__globals__['system']('true')\n"
+            self.assertIn("Sandbox Violation", pool.benchmark(escape, 1, None).result(timeout=60)[2])
+            self.assertIn("Memory", pool.benchmark("def solution(n):\n    return len(bytearray(2 * 1024 ** 3))\n", 1, None).result(timeout=60)[2])
+            self.assertIn("CPU limit", pool.benchmark("def solution(n):\n    while True: pass\n", 1, None).result(timeout=60)[2])
+        finally:
+            pool.shutdown()
+
+    def test_outputs_never_unpickle_submission_objects(self):
+        # An output whose __reduce__ runs code must not run it in the arena process
+        with tempfile.TemporaryDirectory() as tmp:
+            marker = os.path.join(tmp, "pwned")
+            payload = f"open({marker!r}, 'w').close()"
+            code = (
+                "class Payload:\n"
+                "    def __reduce__(self):\n"
+                f"        return (exec, ({payload!r},))\n"
+                "class Boom(BaseException):\n"
+                "    def __reduce__(self):\n"
+                f"        return (exec, ({payload!r},))\n"
+                "def solution(n):\n"
+                "    if n < 0: raise Boom('bad input')\n"
+                "    return [Payload(), {n: (n, 2.5)}]\n"
+            )
+            for workers in (0, 1):
+                pool = WorkerPool(max_workers=workers)
+                try:
+                    [(ok, value)] = pool.outputs(code, [1], 2.0).result(timeout=30)
+                    self.assertTrue(ok)
+                    self.assertIs(type(value[0]), str)
+                    self.assertEqual(value[1], {1: (1, 2.5)})
+                    with self.assertRaisesRegex(RuntimeError, "Boom: bad input"):
+                        pool.outputs(code, [-1], 2.0).result(timeout=30)
+                finally:
+                    pool.shutdown()
+            self.assertFalse(os.path.exists(marker))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import sys
+import os
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents import Agent
+from src.llm.budget import PromptBuilder, count_tokens, truncate
+from src.judge.evidence import fit_evidence
+
+class RecordingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def get_response(self, model_name, system_prompt, user_prompt, force_local=False, usage=None, temperature=None):
+        self.prompts.append(user_prompt)
+        usage.update(prompt_tokens=len(user_prompt) // 4, completion_tokens=10)
+        return "```python\ndef solution(n):\n    return n\n```"
+
+LONG_CODE = "def solution(n):\n    \"\"\"" + "Explains things. " * 200 + "\"\"\"\n" + "".join(f"    x{i} = n + {i}  # step {i}\n" for i in range(200)) + "    return n\n"
+
+class TestBudget(unittest.TestCase):
+    def test_under_budget_is_untouched(self):
+        prompt, report = PromptBuilder(budget=1000).add("PROBLEM", "Sum a list.").add("TASK", "Return code.", kind="fixed").build()
+        self.assertEqual(prompt, "PROBLEM: Sum a list.\nTASK: Return code.")
+        self.assertEqual(report["trimmed"], [])
+
+    def test_shrinks_lowest_priority_first(self):
+        builder = PromptBuilder(budget=900)
+        builder.add("PREV CODE", LONG_CODE, priority=3, kind="code")
+        builder.add("WINNING CODE", LONG_CODE.replace("n + ", "n * "), priority=1, kind="code", optional=True)
+        builder.add("CRITIQUE", "Too slow. " * 300, priority=2)
+        builder.add("TASK", "Return ONLY code.", kind="fixed")
+        prompt, report = builder.build()
+        self.assertLessEqual(report["tokens"], 900)
+        self.assertIn("WINNING CODE: dropped", report["trimmed"])
+        self.assertIn("PREV CODE: minified", report["trimmed"])
+        self.assertNotIn("Explains things", prompt)
+        self.assertTrue(prompt.endswith("TASK: Return ONLY code."))
+
+    def test_truncate_modes(self):
+        text = "\n".join(f"line {i}" for i in range(500))
+        self.assertTrue(truncate(text, 50, "head").startswith("line 0\n"))
+        self.assertTrue(truncate(text, 50, "tail").endswith("line 499"))
+        cut = truncate(text, 50)
+        self.assertIn("chars trimmed", cut)
+        self.assertLess(count_tokens(cut), 80)
+
+    def test_refine_uses_winner_code_within_budget(self):
+        llm = RecordingLLM()
+        agent = Agent("A", "coder", "llama3", "missing.txt", llm=llm, prompt_budget={"refine": 3000})
+        usage = {}
+        agent.refine_solution_with_critique("Sum.", "def solution(n):\n    return 0", "def solution(n):\n    return n", "Wrong.", usage=usage)
+        self.assertIn("WINNING CODE: def solution(n):\n    return n", llm.prompts[-1])
+        self.assertEqual(usage["trimmed"], [])
+        self.assertEqual(usage["completion_tokens"], 10)
+
+        agent.refine_solution_with_critique("Sum.", "def solution(n):\n    return n", "def solution(n):\n    # same\n    return n", "Fine.")
+        self.assertNotIn("WINNING CODE", llm.prompts[-1])
+
+        agent.prompt_budget = {"refine": 700}
+        agent.refine_solution_with_critique("Sum.", LONG_CODE, LONG_CODE.replace("n + ", "n - "), "Wrong.")
+        self.assertLessEqual(agent.last_usage["prompt_estimate"], 700)
+        self.assertNotIn("WINNING CODE", llm.prompts[-1])
+
+    def test_concurrent_samples_keep_their_own_usage(self):
+        barrier = threading.Barrier(2)
+        class SlowLLM(RecordingLLM):
+            def get_response(self, model_name, system_prompt, user_prompt, force_local=False, usage=None, temperature=None):
+                barrier.wait()  # Both samples have built their prompts before either reports usage
+                return super().get_response(model_name, system_prompt, user_prompt, force_local, usage, temperature)
+        agent = Agent("A", "coder", "llama3", "missing.txt", llm=SlowLLM())
+        usages = [{}, {}]
+        problems = ["Sum.", "Sum a very long list of numbers. " * 20]
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(lambda i: agent.generate_solution(problems[i], usage=usages[i]), range(2)))
+        self.assertLess(usages[0]["prompt_tokens"], usages[1]["prompt_tokens"])
+        self.assertLess(usages[0]["prompt_estimate"], usages[1]["prompt_estimate"])
+
+    def test_judge_evidence_fits(self):
+        subs = [{"agents": [f"A{i}"], "status": "FAILED", "time_s": 1.0, "complexity": 1, "cost_class": None,
+                 "msg": "Runtime Error: " + "x" * 150, "code": LONG_CODE} for i in range(3)]
+        evidence, trimmed = fit_evidence("Sum a list.", subs, budget=1500, count=count_tokens, reserved=100)
+        self.assertLessEqual(count_tokens(evidence) + 100, 1500)
+        self.assertEqual(trimmed[0], "messages")
+        self.assertTrue(trimmed[-1].startswith("code"))
+        self.assertEqual(fit_evidence("Sum.", subs[:1], budget=None)[1], [])
+
+if __name__ == '__main__':
+    unittest.main()
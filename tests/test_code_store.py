@@ -0,0 +1,47 @@
+import sys
+import os
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.arena.code_store import CodeStore, record_code_refs, hydrate_record
+
+class TestCodeStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "store")
+        self.store = CodeStore(self.root, segment_max_bytes=256)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_dedup(self):
+        code = "def solution(n):\n    return n * 2\n"
+        h1 = self.store.put(code)
+        h2 = self.store.put(code)
+        self.assertEqual(h1, h2)
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.get(h1), code)
+
+    def test_segments_roll_over(self):
+        hashes = [self.store.put(f"def solution(n):\n    return {os.urandom(64).hex()!r}\n") for _ in range(10)]
+        segments = [f for f in os.listdir(self.root) if f.endswith(".pack")]
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(self.store.get(h).startswith("def solution") for h in hashes))
+
+    def test_other_instance_sees_new_entries(self):
+        other = CodeStore(self.root)
+        code_hash = self.store.put("x = 1")
+        self.assertIn(code_hash, other)
+        self.assertEqual(other.get(code_hash), "x = 1")
+
+    def test_export_and_hydrate(self):
+        code_hash = self.store.put("def solution(n):\n    return n\n")
+        record = {"battle_id": "b1", "code_refs": {"R1": {"Tim": code_hash}}, "results": [{"agent": "Tim", "code_hash": code_hash}]}
+        paths = self.store.export(record_code_refs(record), os.path.join(self.tmp.name, "out"))
+        self.assertEqual([os.path.basename(p) for p in paths], ["b1_R1_Tim.py"])
+        self.assertEqual(hydrate_record(record, self.store)["results"][0]["code"], "def solution(n):\n    return n\n")
+
+if __name__ == '__main__':
+    unittest.main()
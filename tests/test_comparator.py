@@ -0,0 +1,86 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.judge.comparator import compact, compare, fingerprint, is_fingerprint
+from src.judge.execution import LocalSandbox
+from src.judge.oracle import consensus
+
+class TestComparator(unittest.TestCase):
+    def test_float_tolerance(self):
+        self.assertTrue(compare(0.1 + 0.2, 0.3)[0])
+        self.assertTrue(compare([1.0, 2], [1, 2.0])[0])
+        self.assertFalse(compare(0.31, 0.3)[0])
+        self.assertTrue(compare(0.31, 0.3, {"abs_tol": 0.05})[0])
+        self.assertFalse(compare(None, 0)[0])
+
+    def test_order_modes(self):
+        self.assertFalse(compare([3, 1, 2], [1, 2, 3])[0])
+        self.assertTrue(compare([3, 1, 2], [1, 2, 3], {"order": "unordered"})[0])
+        self.assertFalse(compare([[2, 1]], [[1, 2]], {"order": "unordered"})[0])
+        self.assertTrue(compare([[2, 1], [3]], [[3], [1, 2]], {"order": "deep_unordered"})[0])
+        ok, msg = compare([1, 1, 2], [1, 2, 2], {"order": "unordered"})
+        self.assertFalse(ok)
+        self.assertIn("missing [2]", msg)
+
+    def test_sets_are_multisets_when_order_is_ignored(self):
+        unordered = {"order": "unordered"}
+        self.assertTrue(compare({1, 2, 3}, [3, 2, 1], unordered)[0])
+        self.assertTrue(compare([3, 2, 1], frozenset({1, 2, 3}), unordered)[0])
+        self.assertTrue(compare([{2, 1}, {3}], [[3], (1, 2)], {"order": "deep_unordered"})[0])
+        self.assertFalse(compare({1, 2}, [1, 2, 2], unordered)[0])
+        self.assertFalse(compare({1, 2, 3}, [3, 2, 1])[0])  # Strict still tells a set from a list
+        self.assertEqual(fingerprint({1, 2, 3}, unordered), fingerprint([3, 2, 1], unordered))
+        self.assertTrue(compare({3, 2, 1}, compact([1, 2, 3], {**unordered, "hash_threshold": 1}), unordered)[0])
+
+    def test_mismatch_path_and_truncation(self):
+        ok, msg = compare([[1, 2], [3, 4]], [[1, 2], [3, 5]])
+        self.assertFalse(ok)
+        self.assertTrue(msg.startswith("[1][1]: 4 != 5"))
+        ok, msg = compare(list(range(100000)), list(range(1, 100001)))
+        self.assertFalse(ok)
+        self.assertLess(len(msg), 600)
+        ok, msg = compare({0: 0, 1: 1}, {"0": 0, "1": 1})
+        self.assertFalse(ok)
+        self.assertIn("keys [0, 1] != ['0', '1']", msg)
+
+    def test_fingerprint_matches_comparator_equality(self):
+        self.assertEqual(fingerprint([1.0, {"a": 2}]), fingerprint([1, {"a": 2.0}]))
+        self.assertEqual(fingerprint({1, 2, 3}), fingerprint({3, 2, 1}))
+        self.assertNotEqual(fingerprint([1, 2]), fingerprint([2, 1]))
+        self.assertEqual(fingerprint([1, 2], {"order": "unordered"}), fingerprint([2, 1], {"order": "unordered"}))
+
+    def test_large_outputs_are_fingerprinted(self):
+        small = compact([1, 2, 3], {"hash_threshold": 10})
+        self.assertEqual(small, [1, 2, 3])
+        big = compact(list(range(50)), {"hash_threshold": 10})
+        self.assertTrue(is_fingerprint(big))
+        self.assertEqual(big["size"], 50)
+        self.assertTrue(compare(list(range(50)), big)[0])
+        self.assertFalse(compare(list(range(1, 51)), big)[0])
+
+    def test_sandbox_uses_comparator(self):
+        code = "def solution(n):\n    return [i / 10 for i in range(n)]"
+        expected = [i * 0.1 for i in range(5)]
+        _, success, msg = LocalSandbox(max_runs=1).run_benchmark(code, 5, expected)
+        self.assertTrue(success, msg)
+
+        sandbox = LocalSandbox(max_runs=1, compare={"hash_threshold": 100})
+        [(ok, out)] = sandbox.run_outputs("def solution(n):\n    return list(range(n))", [1000])
+        self.assertTrue(ok)
+        self.assertTrue(is_fingerprint(out))
+        _, success, _ = sandbox.run_benchmark("def solution(n):\n    return list(range(n))", 1000, out)
+        self.assertTrue(success)
+        _, success, msg = sandbox.run_benchmark("def solution(n):\n    return list(range(1, n + 1))", 1000, out)
+        self.assertFalse(success)
+        self.assertIn("Wrong Answer", msg)
+
+    def test_consensus_groups_within_tolerance(self):
+        outputs = {"A": [(True, 0.30000000000000004)], "B": [(True, 0.3)], "C": [(True, 0.4)]}
+        decided = consensus(outputs)
+        self.assertEqual(decided[0]["votes"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
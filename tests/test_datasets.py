@@ -0,0 +1,90 @@
+import sys
+import os
+import struct
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.judge.datasets import resolve_expected, resolve_input, generate, describe
+from src.judge.execution import LocalSandbox
+
+class TestDatasets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_plain_values_pass_through(self):
+        self.assertEqual(resolve_input([1, 2, 3]), [1, 2, 3])
+        self.assertEqual(resolve_input({"a": 1}), {"a": 1})
+
+    def test_generator_is_deterministic(self):
+        a = generate("int_list", 1000, seed=7)
+        b = generate("int_list", 1000, seed=7)
+        c = generate("int_list", 1000, seed=8)
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_binary_dataset_is_memory_mapped(self):
+        path = self._path("nums.bin")
+        with open(path, "wb") as f: f.write(struct.pack("5i", 1, 2, 3, 4, 5))
+        data = resolve_input({"$dataset": path, "dtype": "int32"})
+        self.assertEqual(list(data), [1, 2, 3, 4, 5])
+        self.assertTrue(data.readonly)
+        # Mapped once per process
+        self.assertIs(data, resolve_input({"$dataset": path, "dtype": "int32"}))
+
+    def test_npy_dataset(self):
+        path = self._path("nums.npy")
+        header = "{'descr': '<i8', 'fortran_order': False, 'shape': (3,), }"
+        header = header.ljust(118) + "\n"
+        with open(path, "wb") as f:
+            f.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+            f.write(struct.pack("<3q", 10, 20, 30))
+        self.assertEqual([int(x) for x in resolve_input({"$dataset": path})], [10, 20, 30])
+
+    def test_line_dataset(self):
+        path = self._path("words.txt")
+        with open(path, "w") as f: f.write("alpha\nbeta\ngamma\n")
+        lines = resolve_input({"$dataset": path})
+        self.assertEqual(list(lines), ["alpha", "beta", "gamma"])
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[1], "beta")
+        self.assertEqual(lines[-1], "gamma")
+
+    def test_sandbox_resolves_specs(self):
+        spec = {"$generate": "int_list", "size": 10000, "seed": 3}
+        expected = sum(generate("int_list", 10000, seed=3))
+        sandbox = LocalSandbox()
+        time, success, msg = sandbox.run_benchmark("def solution(xs):\n    return sum(xs)\n", spec, expected)
+        self.assertTrue(success, msg)
+        self.assertEqual(describe(spec), "<int_list size=10000 seed=3>")
+
+    def test_dataset_as_expected_output(self):
+        nums, words = self._path("sorted.bin"), self._path("words.txt")
+        with open(nums, "wb") as f: f.write(struct.pack("4i", 1, 2, 3, 4))
+        with open(words, "w") as f: f.write("a\nb\n")
+        self.assertEqual(resolve_expected({"$dataset": nums, "dtype": "int32"}), [1, 2, 3, 4])
+        self.assertIs(type(resolve_expected({"$dataset": nums, "dtype": "int32"})), list)
+        sandbox = LocalSandbox(max_runs=1)
+        time, success, msg = sandbox.run_benchmark("def solution(xs):\n    return sorted(xs)\n", [4, 2, 3, 1], {"$dataset": nums, "dtype": "int32"})
+        self.assertTrue(success, msg)
+        time, success, msg = sandbox.run_benchmark("def solution(xs):\n    return xs\n", ["a", "b"], {"$dataset": words})
+        self.assertTrue(success, msg)
+
+    def test_generated_data_is_fresh_per_job(self):
+        spec = {"$generate": "int_matrix", "size": 3, "seed": 1}
+        mutate = "def solution(m):\n    m[0].append(1)\n    m.append([])\n    return len(m) + len(m[0])\n"
+        sandbox = LocalSandbox(max_runs=1)
+        first = sandbox.run_benchmark(mutate, spec, 8)
+        second = sandbox.run_benchmark(mutate, spec, 8)
+        self.assertTrue(first[1] and second[1], (first, second))
+        self.assertEqual(resolve_input(spec), generate("int_matrix", 3, seed=1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import sys
+import os
+import asyncio
+import importlib.util
+import threading
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.arena.events import EventLog, format_sse, parse_last_event_id
+
+class TestEventLog(unittest.TestCase):
+    def test_multiple_readers_see_everything(self):
+        log = EventLog()
+        for i in range(3): log.publish(f"line {i}")
+        for _ in range(2):
+            events, dropped = log.read(0, timeout=0, linger=0)
+            self.assertEqual([m for _, m in events], ["line 0", "line 1", "line 2"])
+            self.assertEqual(dropped, 0)
+
+    def test_replay_from_last_event_id(self):
+        log = EventLog()
+        for i in range(5): log.publish(i)
+        events, _ = log.read(3, timeout=0, linger=0)
+        self.assertEqual([m for _, m in events], [3, 4])
+
+    def test_slow_reader_skips_ahead_with_bounded_memory(self):
+        log = EventLog(capacity=10)
+        for i in range(25): log.publish(i)
+        events, dropped = log.read(0, timeout=0, linger=0)
+        self.assertEqual(dropped, 15)
+        self.assertEqual(events[0], (16, 15))
+        self.assertEqual(len(events), 10)
+
+    def test_reader_wakes_on_publish_and_batches_burst(self):
+        log = EventLog()
+        def burst():
+            for i in range(50): log.publish(i)
+        threading.Timer(0.05, burst).start()
+        events, _ = log.read(0, timeout=2, linger=0.2)
+        self.assertEqual(len(events), 50)
+
+    def test_drained_after_close(self):
+        log = EventLog()
+        log.publish("DONE")
+        log.close()
+        self.assertFalse(log.is_drained(0))
+        self.assertTrue(log.is_drained(1))
+
+    def test_sse_format(self):
+        text = format_sse([(1, "a"), (2, "\n--- ROUND 1 ---")], stream_id="s1")
+        self.assertEqual(text, "id: s1:2\ndata: a\ndata: \ndata: --- ROUND 1 ---\n\n")
+        self.assertEqual(parse_last_event_id("s1:2", "s1"), 2)
+        self.assertEqual(parse_last_event_id("old:9", "s1"), 0)
+
+    def test_async_reader_wakes_on_publish_from_another_thread(self):
+        log = EventLog()
+        async def read():
+            threading.Timer(0.05, lambda: [log.publish(i) for i in range(3)]).start()
+            return await log.aread(0, timeout=2, linger=0.1)
+        events, dropped = asyncio.run(read())
+        self.assertEqual([m for _, m in events], [0, 1, 2])
+        self.assertEqual(asyncio.run(log.aread(3, timeout=0.05)), ([], 0))  # Times out empty
+
+@unittest.skipUnless(importlib.util.find_spec("asgiref") and importlib.util.find_spec("flask"), "async mode needs asgiref and flask")
+class TestAsgiStream(unittest.TestCase):
+    def setUp(self):
+        sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'overview')))
+        import asgi
+        self.asgi = asgi
+
+    def stream(self, query):
+        sent = []
+        async def receive():
+            await asyncio.sleep(10)  # The client stays connected
+        async def send(message):
+            sent.append(message)
+        scope = {"type": "http", "path": "/api/stream_logs", "query_string": query, "headers": []}
+        asyncio.run(asyncio.wait_for(self.asgi.stream_logs(scope, receive, send), 5))
+        return sent
+
+    def test_streams_until_the_log_is_closed(self):
+        log = EventLog()
+        self.asgi.web.event_logs["t1"] = log
+        try:
+            log.publish("hello")
+            def finish():
+                log.publish("DONE")
+                log.close()
+            threading.Timer(0.1, finish).start()
+            sent = self.stream(b"stream=t1")
+        finally:
+            del self.asgi.web.event_logs["t1"]
+        self.assertEqual(sent[0]["status"], 200)
+        body = b"".join(m.get("body", b"") for m in sent[1:]).decode()
+        self.assertIn("id: t1:1\ndata: hello\n", body)
+        self.assertIn("data: DONE", body)
+        self.assertFalse(sent[-1]["more_body"])
+
+    def test_resumes_after_last_event_id_and_404s_unknown_streams(self):
+        log = EventLog()
+        for line in ("a", "b", "c"): log.publish(line)
+        log.close()
+        self.asgi.web.event_logs["t2"] = log
+        try:
+            body = b"".join(m.get("body", b"") for m in self.stream(b"stream=t2&last_event_id=t2:2")[1:]).decode()
+        finally:
+            del self.asgi.web.event_logs["t2"]
+        self.assertEqual(body, "id: t2:3\ndata: c\n\n")
+        self.assertEqual(self.stream(b"stream=missing")[0]["status"], 404)
+
+if __name__ == '__main__':
+    unittest.main()
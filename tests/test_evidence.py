@@ -0,0 +1,77 @@
+import sys
+import os
+import json
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.judge.evidence import compact_code, build_submissions, expand_critiques
+from src.arena.orchestrator import BattleArena
+from src.llm.scheduler import LocalModelScheduler
+from src.llm.llm_client import LocalLLM
+
+def result(agent, code, success=True, time=0.001):
+    return {"agent": agent, "code": code, "success": success, "time": time, "msg": "Success" if success else "Wrong Answer", "complexity": 1}
+
+class FakeLLM(LocalLLM):
+    def __init__(self):
+        self.prompts = []
+
+    def _chat(self, model, system_prompt, user_prompt, force_local=False, json_mode=False, on_chunk=None, usage=None):
+        self.prompts.append(user_prompt)
+        payload = json.loads(user_prompt.split("\n", 1)[1])
+        passing = [s for s in payload["submissions"] if s["status"] == "Success"]
+        winner = min(passing, key=lambda s: s["time_s"])["agents"][0]
+        reply = json.dumps({"winner": winner, "reasoning": "fastest", "critiques": {s["agents"][0]: "ok" for s in payload["submissions"]}})
+        on_chunk(reply)
+        return reply
+
+class FakeJudge:
+    model = "gpt-4o"
+    personality = "judge"
+    is_cloud = True
+
+    def __init__(self):
+        self.llm = FakeLLM()
+
+class TestEvidence(unittest.TestCase):
+    def test_compact_code_strips_docstrings_and_comments(self):
+        code = '''
+def solution(n):
+    """Doubles n."""
+    # multiply
+    return n * 2  # done
+'''
+        compact = compact_code(code)
+        self.assertNotIn("Doubles", compact)
+        self.assertNotIn("#", compact)
+        self.assertIn("return n * 2", compact)
+
+    def test_unparseable_code_still_compacted(self):
+        self.assertEqual(compact_code("def broken(:  # oops\n\n    pass"), "def broken(:\n    pass")
+
+    def test_duplicates_are_merged(self):
+        subs = build_submissions([
+            result("A", "def solution(n):\n    return n"),
+            result("B", "def solution(n):\n    # same logic\n    return n"),
+            result("C", "def solution(n):\n    return -n", success=False),
+        ])
+        self.assertEqual(len(subs), 2)
+        self.assertEqual(subs[0]["agents"], ["A", "B"])
+        self.assertEqual(expand_critiques({"A": "fine"}, subs), {"A": "fine", "B": "fine"})
+
+    def test_large_roster_is_judged_in_chunks(self):
+        arena = BattleArena.__new__(BattleArena)
+        arena.config = {"judge": {"batch_size": 2}}
+        arena.log_callback = None
+        arena.judge = FakeJudge()
+        arena.prompt_budget = {}
+        arena.scheduler = LocalModelScheduler(llm=None, log=lambda msg: None)
+        results = [result(f"Agent_{i}", f"def solution(n):\n    return n + {i}", time=0.01 * (5 - i)) for i in range(5)]
+        verdict = arena._call_ai_judge("problem", results)
+        self.assertEqual(verdict["winner"], "Agent_4")
+        self.assertEqual(set(verdict["critiques"]), {f"Agent_{i}" for i in range(5)})
+        self.assertTrue(all(len(json.loads(p.split("\n", 1)[1])["submissions"]) <= 2 for p in arena.judge.llm.prompts))
+
+if __name__ == '__main__':
+    unittest.main()
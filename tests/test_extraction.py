@@ -0,0 +1,63 @@
+import sys
+import os
+import ast
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.extraction import extract_code
+from src.judge.execution import resolve_entry_point, LocalSandbox
+
+class TestExtraction(unittest.TestCase):
+    def test_prefers_block_defining_solution(self):
+        text = "Usage:\n```python\nprint(solution(5))\n```\nCode:\n```python\ndef solution(n):\n    return n\n```"
+        self.assertEqual(extract_code(text), "def solution(n):\n    return n")
+
+    def test_skips_unparseable_block(self):
+        text = "```python\ndef solution(n)\n    return n\n```\n```\ndef solution(n):\n    return n + 1\n```"
+        self.assertEqual(extract_code(text), "def solution(n):\n    return n + 1")
+
+    def test_joins_helper_blocks(self):
+        text = "```python\ndef helper(n):\n    return n\n```\n```python\ndef solution(n):\n    return helper(n)\n```"
+        code = extract_code(text)
+        self.assertIn("def solution", code)
+
+    def test_unfenced_and_leaked_tag(self):
+        self.assertEqual(extract_code("def solution(n):\n    return n"), "def solution(n):\n    return n")
+        self.assertEqual(extract_code("```\nmarkdown\ndef solution(n):\n    return n\n```"), "def solution(n):\n    return n")
+
+    def test_unterminated_fence(self):
+        self.assertEqual(extract_code("```python\ndef solution(n):\n    return n\n"), "def solution(n):\n    return n")
+
+class TestEntryPoint(unittest.TestCase):
+    def resolve(self, code):
+        return resolve_entry_point(ast.parse(code))
+
+    def test_solution_wins(self):
+        self.assertEqual(self.resolve("from math import factorial\ndef helper(): pass\ndef solution(n): return helper()"), ("solution", None))
+
+    def test_uncalled_function_is_entry(self):
+        self.assertEqual(self.resolve("def main(n):\n    return helper(n)\ndef helper(n):\n    return n"), ("main", None))
+
+    def test_imported_names_are_ignored(self):
+        self.assertEqual(self.resolve("from math import factorial"), (None, None))
+
+    def test_leetcode_class(self):
+        self.assertEqual(self.resolve("class Solution:\n    def twoSum(self, n):\n        return n"), ("Solution", "twoSum"))
+        time, success, msg = LocalSandbox().run_benchmark("class Solution:\n    def double(self, n):\n        return n * 2", 4, 8)
+        self.assertTrue(success, msg)
+
+    def test_assigned_and_async_solutions(self):
+        sandbox = LocalSandbox()
+        for code in ("solution = lambda n: n * 2",
+                     "import math\ndef double(n):\n    return math.prod([n, 2])\nsolution = double",
+                     "def helper(n):\n    return n * 2\nsolution: callable = helper",
+                     "async def solution(n):\n    return n * 2"):
+            self.assertEqual(self.resolve(code), ("solution", None))
+            time, success, msg = sandbox.run_benchmark(code, 4, 8)
+            self.assertTrue(success, f"{code!r}: {msg}")
+        self.assertTrue(sandbox.run_benchmark("import math\nsolution = math.factorial", 4, 24)[1])
+        self.assertIn("not callable", sandbox.run_benchmark("solution = 3", 4, 8)[2])
+
+if __name__ == '__main__':
+    unittest.main()
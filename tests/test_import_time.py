@@ -0,0 +1,34 @@
+import sys
+import os
+import json
+import subprocess
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_BACKENDS = ("ollama", "openai", "dotenv", "radon", "yaml")
+IMPORT_BUDGET_S = 0.25 # Measured ~0.03s lazily vs ~0.64s with eager backends
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import src.arena.orchestrator
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_BACKENDS,)
+
+class TestImportTime(unittest.TestCase):
+    def _probe(self):
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True)
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+    def test_backends_are_not_imported_eagerly(self):
+        self.assertEqual(self._probe()["loaded"], [])
+
+    def test_import_budget(self):
+        # Best of three to ride out a cold disk cache
+        elapsed = min(self._probe()["elapsed"] for _ in range(3))
+        self.assertLess(elapsed, IMPORT_BUDGET_S)
+
+if __name__ == '__main__':
+    unittest.main()
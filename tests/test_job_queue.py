@@ -0,0 +1,136 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.arena.job_queue import JobQueue, QueuePool
+from src.arena.queue_worker import QueueWorker
+from src.judge.workers import WorkerPool
+
+FAST = "def solution(n):\n    return n * (n + 1) // 2\n"
+
+class FakeArena:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def run_phase_1(self, problem, test_input, expected_output, reference=None):
+        if "explode" in problem: raise RuntimeError("boom")
+        return {"battle_id": "b1", "verdict": {"winner": "A"}, "round1_scores": [{"agent": "A", "success": True, "time": 0.001, "msg": "Success"}]}
+
+    def run_phase_2(self, state, human_critiques):
+        return [{"agent": "A", "success": True, "time": 0.001, "complexity": 1}]
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self.tmp.name, "queue.db"), retry_delay_s=0, poll_s=0.01, heartbeat_s=0.01)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def worker(self, **kwargs):
+        return QueueWorker(self.queue, worker_id="w", pool=WorkerPool(max_workers=0), arena_factory=FakeArena, log=lambda msg: None, **kwargs)
+
+    def test_claim_is_exclusive(self):
+        a, b = self.queue.enqueue("analyze", {"code": "x"}), self.queue.enqueue("measure", {"code": "y"})
+        self.assertEqual(self.queue.claim("w1")["id"], a)
+        self.assertEqual(self.queue.claim("w2", kinds=["analyze", "measure"])["id"], b)
+        self.assertIsNone(self.queue.claim("w3"))
+        self.assertTrue(self.queue.complete(a, "w1", {"ok": True}))
+        self.assertFalse(self.queue.complete(b, "w1", {"ok": True}))  # Not w1's job
+        self.assertEqual(self.queue.get(a)["result"], {"ok": True})
+
+    def test_dead_worker_job_is_requeued(self):
+        self.queue.settings["lease_s"] = 0.05
+        job_id = self.queue.enqueue("measure", {}, max_attempts=2)
+        self.queue.claim("dead")
+        time.sleep(0.1)
+        job = self.queue.claim("alive")
+        self.assertEqual((job["id"], job["attempts"]), (job_id, 2))
+        self.assertIn("dead", self.queue.get(job_id)["error"])
+        self.assertFalse(self.queue.complete(job_id, "dead", {}))  # The lost lease cannot finish it
+        time.sleep(0.1)
+        self.assertIsNone(self.queue.claim("other"))
+        self.assertEqual(self.queue.get(job_id)["status"], "failed")  # Out of attempts
+
+    def test_failed_job_is_retried(self):
+        job_id = self.queue.enqueue("battle", {"problem": "explode"}, max_attempts=2)
+        self.assertEqual(self.worker().run(idle_exit=0), 2)
+        job = self.queue.get(job_id)
+        self.assertEqual((job["status"], job["attempts"]), ("failed", 2))
+        self.assertIn("boom", job["error"])
+
+    def test_worker_runs_battles_and_sandbox_jobs(self):
+        battle = self.queue.enqueue("battle", {"id": "p1", "problem": "Sum 0..n."})
+        measure = self.queue.enqueue("measure", {"code": FAST, "test_input": 100, "expected_output": 5050})
+        self.assertEqual(self.worker().run(idle_exit=0), 2)
+        done = self.queue.wait([battle, measure], timeout=1)
+        self.assertEqual(done[battle]["result"]["champion"], "A")
+        self.assertEqual(done[battle]["result"]["worker"], "w")
+        self.assertTrue(done[measure]["result"][1])
+
+    def test_queue_pool_round_trip(self):
+        worker = self.worker()
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        try:
+            pool = QueuePool(self.queue, timeout=10)
+            exec_time, success, msg, noise = pool.measure(FAST, 100, 5050).result(timeout=10)
+            self.assertTrue(success, msg)
+            [(ok, value)] = pool.outputs(FAST, [3]).result(timeout=10)
+            self.assertEqual((ok, value), (True, 6))
+            self.assertEqual(pool.analyze(FAST).result(timeout=10)["score"], pool.analyze(FAST).result(timeout=10)["score"])
+            report = pool.report()
+            self.assertEqual((report["jobs"], report["retries"], report["workers"]), (4, 0, {"w": 4}))
+        finally:
+            worker.stop()
+            thread.join()
+        self.assertEqual(self.queue.stats()["jobs"], {"done": 4})
+
+    def test_values_round_trip_like_the_local_pool(self):
+        # Int dict keys, sets and tuples must survive the queue unchanged
+        squares = "def solution(xs):\n    return {x: x * x for x in sorted(xs)}\n"
+        worker = self.worker()
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        try:
+            pool = QueuePool(self.queue, timeout=10)
+            local = WorkerPool(max_workers=0)
+            args = (squares, {2, 0, 1}, {0: 0, 1: 1, 2: 4})
+            queued = pool.measure(*args).result(timeout=10)
+            self.assertTrue(queued[1], queued[2])
+            self.assertEqual(queued[1:3], local.measure(*args).result()[1:3])
+            self.assertEqual(pool.outputs(squares, [{3}]).result(timeout=10), [(True, {3: 9})])
+        finally:
+            worker.stop()
+            thread.join()
+
+    def test_poller_restarts_after_going_idle(self):
+        pool = QueuePool(self.queue, timeout=None)
+        first = pool.analyze(FAST)
+        self.assertEqual(self.worker().run(idle_exit=0), 1)
+        first.result(timeout=5)
+        for _ in range(100):  # The idle poller exits and clears its slot
+            with pool._lock:
+                if pool._poller is None: break
+            time.sleep(0.01)
+        second = pool.analyze(FAST)
+        self.worker().run(idle_exit=0)
+        self.assertEqual(second.result(timeout=5), first.result())
+
+    def test_enqueue_with_key_reuses_jobs(self):
+        a = self.queue.enqueue("battle", {"id": "p1"}, batch="probs.jsonl", key="p1")
+        self.assertEqual(self.queue.enqueue("battle", {"id": "p1"}, batch="probs.jsonl", key="p1"), a)
+        self.assertNotEqual(self.queue.enqueue("battle", {"id": "p1"}, batch="other.jsonl", key="p1"), a)
+        job = self.queue.claim("w1")
+        self.queue.fail(job["id"], "w1", "boom", retry=False)
+        self.assertEqual(self.queue.get(a)["status"], "failed")
+        self.assertEqual(self.queue.enqueue("battle", {"id": "p1"}, batch="probs.jsonl", key="p1"), a)
+        self.assertEqual((self.queue.get(a)["status"], self.queue.get(a)["attempts"]), ("queued", 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.judge import elo
+from src.judge.leaderboard import LeaderboardService
+
+def battle(battle_id, champion, times, ratings=None):
+    results = [{"agent": a, "time": t if t else 999.0, "success": bool(t)} for a, t in times.items()]
+    return {"battle_id": battle_id, "champion": champion, "results": results, "ratings": ratings or {}}
+
+class TestLeaderboard(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.elo_file, elo.ELO_FILE = elo.ELO_FILE, os.path.join(self.tmp.name, "elo.json")
+        with open(os.path.join(self.tmp.name, "b1_data.json"), "w") as f:
+            json.dump(battle("b1", "A", {"A": 0.001, "B": 0.004, "C": None}, {"A": 1216, "B": 1184}), f)
+        self.service = LeaderboardService(self.tmp.name)
+
+    def tearDown(self):
+        elo.ELO_FILE = self.elo_file
+        self.tmp.cleanup()
+
+    def test_stats_from_archive(self):
+        stats = self.service.stats()
+        self.assertEqual(stats["A"]["win_rate"], 1.0)
+        self.assertEqual(stats["C"]["pass_rate"], 0.0)
+        self.assertEqual(stats["A"]["avg_speedup"], 4.0)
+        self.assertEqual(stats["B"]["avg_speedup"], 0.25)
+        self.assertEqual(stats["A"]["rating_history"], [{"battle_id": "b1", "rating": 1216}])
+
+    def test_incremental_update_bumps_etag(self):
+        etag = self.service.etag()
+        self.service.record_battle(battle("b2", "B", {"A": 0.002, "B": 0.001}, {"A": 1200, "B": 1200}))
+        self.assertNotEqual(etag, self.service.etag())
+        stats = self.service.stats()
+        self.assertEqual(stats["A"]["battles"], 2)
+        self.assertEqual(stats["B"]["win_rate"], 0.5)
+        self.assertEqual(dict(self.service.leaderboard())["B"], 1200)
+
+    def test_reads_battles_from_other_processes(self):
+        # e.g. `main.py batch` or a queue worker: files change, notify_battle is never called here
+        etag = self.service.etag()
+        with open(os.path.join(self.tmp.name, "b2_data.json"), "w") as f:
+            json.dump(battle("b2", "B", {"A": 0.002, "B": 0.001}), f)
+        with open(elo.ELO_FILE, "w") as f: json.dump({"A": 1190, "B": 1230}, f)
+        self.assertNotEqual(etag, self.service.etag())
+        self.assertEqual(self.service.stats()["B"]["wins"], 1)
+        self.assertEqual(self.service.leaderboard()[0], ("B", 1230))
+        etag = self.service.etag()
+        self.assertEqual(etag, self.service.etag())  # Nothing new on disk
+
+    def test_record_within_one_mtime_tick_is_read(self):
+        # Coarse filesystems can leave the dir mtime unchanged across two writes
+        etag, st = self.service.etag(), os.stat(self.tmp.name)
+        with open(os.path.join(self.tmp.name, "b2_data.json"), "w") as f:
+            json.dump(battle("b2", "B", {"A": 0.002, "B": 0.001}), f)
+        os.utime(self.tmp.name, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertNotEqual(etag, self.service.etag())
+        self.assertEqual(self.service.stats()["B"]["battles"], 2)
+
+    def test_same_battle_is_counted_once(self):
+        self.service.record_battle(battle("b1", "A", {"A": 0.001}))
+        self.assertEqual(self.service.stats()["A"]["battles"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
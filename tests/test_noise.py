@@ -0,0 +1,65 @@
+import sys
+import os
+import threading
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.judge import noise
+from src.judge.workers import WorkerPool
+
+class TestNoise(unittest.TestCase):
+    def test_plan_cores(self):
+        self.assertEqual(noise.plan_cores(2, [0, 1, 2, 3]), ([2, 3], [0, 1]))
+        self.assertEqual(noise.plan_cores(2, [0, 1]), ([], [])) # Nothing left for the host
+
+    def test_assess_flags(self):
+        before = {"load": 0.1, "freq_mhz": 3000, "voluntary": 0, "involuntary": 0}
+        calm = noise.assess(before, dict(before, involuntary=1))
+        self.assertFalse(calm["noisy"])
+        busy = noise.assess(before, dict(before, involuntary=500, freq_mhz=1200))
+        self.assertTrue(busy["noisy"] and busy["transient"])
+        self.assertEqual(len(busy["reasons"]), 2)
+        loaded = noise.assess(before, dict(before, load=1000.0))
+        self.assertTrue(loaded["noisy"])
+        self.assertFalse(loaded["transient"]) # Retrying does not help with the load average
+
+    def test_measure_retries_disturbed_probes(self):
+        calls = []
+        def run():
+            calls.append(1)
+            return 0.1, True, "Success"
+        result, report = noise.measure(run, {"max_involuntary_switches": -1, "retries": 2})
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(report["attempts"], 3)
+        self.assertTrue(report["noisy"])
+        calls.clear()
+        noise.measure(lambda: (calls.append(1), (float('inf'), False, "Wrong Answer"))[1], {"max_involuntary_switches": -1})
+        self.assertEqual(len(calls), 1) # Failures are not re-timed
+
+    def test_pool_measure(self):
+        pool = WorkerPool(max_workers=0, measurement={"limits": {"retries": 0}})
+        exec_time, success, msg, report = pool.measure("def solution(n):\n    return n * 2\n", 5, 10).result()
+        self.assertTrue(success, msg)
+        self.assertIn("involuntary_switches", report)
+
+    @unittest.skipUnless(hasattr(os, "sched_setaffinity"), "no CPU affinity on this platform")
+    def test_keep_off_moves_every_thread(self):
+        calls, release = [], threading.Event()
+        helper = threading.Thread(target=release.wait)
+        helper.start()
+        real = os.sched_setaffinity
+        os.sched_setaffinity = lambda tid, cores: calls.append((tid, set(cores)))
+        try:
+            WorkerPool(max_workers=1, measurement={"cores": [0, 1, 2]}).shutdown()
+            self.assertEqual(calls, []) # The pool never changes this process's affinity
+            noise.keep_off([0, 1])
+        finally:
+            os.sched_setaffinity = real
+            release.set()
+            helper.join()
+        self.assertIn((helper.native_id, {0, 1}), calls)
+        self.assertIn((threading.get_native_id(), {0, 1}), calls)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import sys
+import os
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.judge.oracle import consensus, generate_inputs, infer_kind, load_cases, save_cases
+from src.judge.execution import LocalSandbox
+
+class TestOracle(unittest.TestCase):
+    def test_infer_kind(self):
+        self.assertEqual(infer_kind(["def solution(n):\n    return n", "def f(k):\n    return k"]), "int")
+        self.assertEqual(infer_kind(["def solution(nums: list[str]):\n    return nums"]), "word_list")
+        self.assertEqual(infer_kind(["class Solution:\n    def run(self, grid):\n        return grid"]), "int_matrix")
+        self.assertEqual(infer_kind(["not python("]), "int_list")
+
+    def test_inputs_are_seeded(self):
+        self.assertEqual(generate_inputs("int_list", 3, seed=7), generate_inputs("int_list", 3, seed=7))
+        self.assertEqual([len(x) for x in generate_inputs("text", 3)], [1, 3, 8])
+
+    def test_majority_and_reference(self):
+        sandbox = LocalSandbox(timeout=2)
+        inputs = [3, 5]
+        outputs = {
+            "A": sandbox.run_outputs("def solution(n):\n    return n * n", inputs),
+            "B": sandbox.run_outputs("def solution(n):\n    return n ** 2", inputs),
+            "C": sandbox.run_outputs("def solution(n):\n    return n + n", inputs),
+        }
+        decided = consensus(outputs)
+        self.assertEqual([d["output"] for d in decided], [9, 25])
+        self.assertEqual(decided[0]["dissent"], ["C"])
+        reference = sandbox.run_outputs("def solution(n):\n    return 2 * n", inputs)
+        decided = consensus(outputs, reference)
+        self.assertEqual([(d["output"], d["source"], d["votes"]) for d in decided], [(6, "reference", 1), (10, "reference", 1)])
+
+    def test_no_consensus(self):
+        outputs = {"A": [(True, 1)], "B": [(True, 2)], "C": [(False, "Runtime Error")]}
+        self.assertEqual(consensus(outputs), [None])
+
+    def test_test_set_grows_without_duplicates(self):
+        with tempfile.TemporaryDirectory() as root:
+            save_cases("Square it.", [{"input": 3, "output": 9}], root)
+            _, added = save_cases("square it", [{"input": 3, "output": 9}, {"input": 4, "output": 16}], root)
+            self.assertEqual(added, 1)
+            self.assertEqual([c["input"] for c in load_cases("Square it.", root)], [3, 4])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.prompts import PromptRegistry
+
+class TestPromptRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp.name, "coder.txt"), "w") as f: f.write("You are $name, the $role.")
+        self.registry = PromptRegistry(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_and_cache(self):
+        first = self.registry.render("coder.txt", name="Tim", role="Speedster")
+        self.assertEqual(first, "You are Tim, the Speedster.")
+        self.assertIs(first, self.registry.render("coder.txt", name="Tim", role="Speedster"))
+
+    def test_save_takes_effect_immediately(self):
+        self.registry.render("coder.txt", name="Tim", role="Speedster")
+        self.registry.save("coder.txt", "New rules for $name.")
+        self.assertEqual(self.registry.render("coder.txt", name="Tim", role="Speedster"), "New rules for Tim.")
+
+    def test_external_edit_is_picked_up(self):
+        self.assertEqual(self.registry.get("coder.txt"), "You are $name, the $role.")
+        path = os.path.join(self.tmp.name, "coder.txt")
+        with open(path, "w") as f: f.write("Edited by hand.")
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+        self.assertEqual(self.registry.get("coder.txt"), "Edited by hand.")
+
+    def test_rejects_paths_outside_prompt_dir(self):
+        with self.assertRaises(ValueError):
+            self.registry.get("../config/settings.yaml")
+        with self.assertRaises(ValueError):
+            self.registry.save("../evil.txt", "x")
+
+    def test_list(self):
+        self.assertEqual(self.registry.list(), ["coder.txt"])
+
+if __name__ == '__main__':
+    unittest.main()
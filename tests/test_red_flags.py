@@ -0,0 +1,67 @@
+import sys
+import os
+import ast
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.judge.red_flags import scan, plan_probe
+from src.judge.execution import LocalSandbox
+
+def check(code):
+    return scan(ast.parse(code))
+
+class TestRedFlags(unittest.TestCase):
+    def test_naive_fibonacci_is_exponential(self):
+        result = check("def solution(n):\n    return n if n < 2 else solution(n - 1) + solution(n - 2)")
+        self.assertEqual(result["cost_class"], "O(2^n)")
+        self.assertTrue(result["flags"])
+
+    def test_memoized_recursion_is_fine(self):
+        code = "from functools import lru_cache\n@lru_cache(None)\ndef solution(n):\n    return n if n < 2 else solution(n - 1) + solution(n - 2)"
+        self.assertEqual(check(code)["cost_class"], "O(n)")
+
+    def test_nested_loops_over_same_iterable(self):
+        result = check("def solution(xs):\n    for a in xs:\n        for b in xs:\n            pass")
+        self.assertEqual(result["cost_class"], "O(n^2)")
+        self.assertIn("same iterable", result["flags"][0])
+
+    def test_bounded_inner_loop_does_not_count(self):
+        self.assertEqual(check("def solution(xs):\n    for a in xs:\n        for b in range(3):\n            pass")["cost_class"], "O(n)")
+
+    def test_hidden_linear_work_in_loops(self):
+        self.assertEqual(check("def solution(xs):\n    out = []\n    for x in xs:\n        if x not in out:\n            out.append(x)\n    return out")["cost_class"], "O(n^2)")
+        self.assertEqual(check("def solution(xs):\n    for x in xs:\n        xs.index(x)")["cost_class"], "O(n^2)")
+        result = check("def solution(xs):\n    s = ''\n    for x in xs:\n        s += str(x)\n    return s")
+        self.assertIn("string concatenation", result["flags"][0])
+
+    def test_constant_code(self):
+        self.assertEqual(check("def solution(n):\n    return n * (n + 1) // 2"), {"flags": [], "cost_class": "O(1)"})
+
+    def test_probe_plan_shrinks_for_expensive_code(self):
+        self.assertEqual(plan_probe("O(n)", 100, 2.0), (100, 2.0))
+        self.assertEqual(plan_probe("O(2^n)", 100, 2.0), (1, 2.0))
+        # Without a configured timeout the budget comes from the cost class
+        self.assertEqual(plan_probe("O(n)", 100, None), (100, 10.0))
+        self.assertEqual(plan_probe("O(2^n)", 100, None), (1, 5.0))
+
+    def test_sandbox_times_out_module_body(self):
+        sandbox = LocalSandbox(timeout=0.3)
+        code = "while True: pass\ndef solution(n):\n    return n"
+        time, success, msg = sandbox.run_benchmark(code, 1, 1)
+        self.assertFalse(success)
+        self.assertIn("Timeout", msg)
+        [(ok, msg)] = sandbox.run_outputs(code, [1])
+        self.assertFalse(ok)
+        self.assertIn("Timeout", msg)
+
+    def test_sandbox_times_out_runaway_code(self):
+        sandbox = LocalSandbox(timeout=0.3)
+        code = "def solution(n):\n    return n if n < 2 else solution(n - 1) + solution(n - 2)"
+        time, success, msg = sandbox.run_benchmark(code, 40, 102334155)
+        self.assertFalse(success)
+        self.assertIn("Timeout", msg)
+        self.assertIn("O(2^n)", msg)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.judge.regressions import RegressionTracker, problem_key
+
+def battle(battle_id, times, problem="Sum a list.", test_input="[1, 2, 3]"):
+    results = [{"agent": a, "time": t if t else 999.0, "success": bool(t)} for a, t in times.items()]
+    return {"battle_id": battle_id, "timestamp": f"2026-01-01 00:00:0{battle_id[-1]}", "problem": problem, "test_input": test_input, "results": results}
+
+class TestRegressions(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for i, times in enumerate([{"A": 0.010, "B": 0.020}, {"A": 0.011, "B": 0.021}, {"A": 0.009, "B": 0.019}], 1):
+            with open(os.path.join(self.tmp.name, f"b{i}_data.json"), "w") as f:
+                json.dump(battle(f"b{i}", times), f)
+        self.tracker = RegressionTracker(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_problem_key_normalization(self):
+        self.assertEqual(problem_key("Sum  a LIST.", [1, 2, 3]), problem_key("sum a list", "[1, 2, 3]"))
+        self.assertNotEqual(problem_key("Sum a list.", [1]), problem_key("Sum a list.", [2]))
+
+    def test_series(self):
+        [summary] = self.tracker.problems()
+        self.assertEqual(summary["battles"], 3)
+        self.assertEqual(summary["best"], 0.009)
+        series = self.tracker.series(summary["key"])
+        self.assertEqual(series["agents"]["A"]["median"], 0.010)
+        self.assertEqual([round(b["median"], 6) for b in series["battles"]], [0.015, 0.016, 0.014])
+        self.assertEqual(self.tracker.regressions(), [])
+
+    def test_picks_up_records_from_other_processes(self):
+        etag = self.tracker.etag()
+        with open(os.path.join(self.tmp.name, "b4_data.json"), "w") as f:
+            json.dump(battle("b4", {"A": 0.030, "B": 0.020}), f)
+        self.assertNotEqual(etag, self.tracker.etag())
+        self.assertEqual([r["agent"] for r in self.tracker.regressions()], ["A"])
+
+    def test_detects_slowdown_and_failure(self):
+        etag = self.tracker.etag()
+        self.tracker.record_battle(battle("b4", {"A": 0.030, "B": None}))
+        self.assertNotEqual(etag, self.tracker.etag())
+        findings = {f["agent"]: f for f in self.tracker.regressions()}
+        self.assertEqual(findings["A"]["kind"], "slowdown")
+        self.assertEqual(findings["A"]["ratio"], 3.0)
+        self.assertEqual(findings["B"]["kind"], "failure")
+
+    def test_other_problems_are_separate(self):
+        self.tracker.record_battle(battle("b5", {"A": 0.5}, problem="Sort a list."))
+        self.assertEqual(len(self.tracker.problems()), 2)
+        self.assertEqual(self.tracker.regressions(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import sys
+import os
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.arena.code_store import CodeStore
+from src.arena.orchestrator import BattleArena, _improved
+from src.judge.workers import WorkerPool
+from src.llm.scheduler import LocalModelScheduler
+
+SLOW = "def solution(n):\n    total = 0\n    for i in range(n + 1):\n        total += i\n    return total\n"
+FAST = "def solution(n):\n    return n * (n + 1) // 2\n"
+WRONG = "def solution(n):\n    return n\n"
+
+def scripted_agent(name, replies):
+    calls = []
+    def refine(problem, prev_code, winner_code, critique, temperature=None, usage=None):
+        calls.append(critique)
+        return replies[min(len(calls), len(replies)) - 1]
+    return SimpleNamespace(name=name, model="gpt-4o", is_cloud=True, calls=calls, refine_solution_with_critique=refine)
+
+def score(agent, code, success, time):
+    return {"agent": agent, "code": code, "success": success, "time": time, "msg": "", "complexity": 1, "round": 1}
+
+class TestRounds(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        arena = BattleArena.__new__(BattleArena)
+        arena.log_callback = None
+        arena.pool = WorkerPool(max_workers=0)
+        arena.execution_timeout = None
+        arena.comparator = None
+        arena.samples = 1
+        arena.sample_temperatures = None
+        arena.rounds = 4
+        arena.min_improvement = 0.05
+        arena.scheduler = LocalModelScheduler(llm=None, log=lambda msg: None)
+        arena.code_store = CodeStore(os.path.join(self.tmp.name, "store"))
+        arena.log_dir = self.tmp.name
+        arena.elo = SimpleNamespace(update_ratings=lambda agents, winner: None, get_rating=lambda name: 1200)
+        arena.judged = []
+        def judge(problem, results):
+            arena.judged.append(sorted(r["agent"] for r in results))
+            return {"winner": "A", "critiques": {r["agent"]: "faster" for r in results}}
+        arena._call_ai_judge = judge
+        self.arena = arena
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def state(self):
+        return {"battle_id": "b1", "problem": "Sum 0..n.", "test_input": 1000, "expected_output": 500500, "log_buffer": [],
+                "verdict": {"winner": "A", "critiques": {"B": "wrong", "C": "slow"}},
+                "round1_scores": [score("A", FAST, True, 1e-6), score("B", WRONG, False, 999.0), score("C", SLOW, True, 1e-4)],
+                "code_refs": {"R1": {}}}
+
+    def test_stops_when_code_stops_changing(self):
+        b = scripted_agent("B", [FAST, "# again\n" + FAST])
+        c = scripted_agent("C", ["# same\n" + SLOW])
+        self.arena.agents = [scripted_agent("A", [WRONG]), b, c]
+        final = self.arena.run_phase_2(self.state(), {"C": "use the formula"})
+        with open(os.path.join(self.tmp.name, "b1_data.json")) as f: record = json.load(f)
+
+        self.assertEqual([r["round"] for r in record["rounds"]], [2, 3])
+        self.assertEqual(record["rounds"][0]["changed"], ["B"])
+        self.assertEqual(record["rounds"][0]["improved"], ["B"])
+        self.assertEqual(self.arena.judged, [["A", "B"]])  # Only the changed agent (and the pick) is judged again
+        self.assertEqual(len(b.calls), 2)
+        self.assertEqual(len(c.calls), 1)  # Unchanged in round 2: settled afterwards
+        self.assertIn("HUMAN INTERVENTION: use the formula", c.calls[0])
+        self.assertEqual(self.arena.agents[0].calls, [])  # The pick defends
+        self.assertTrue(next(s for s in final if s["agent"] == "B")["success"])
+        self.assertEqual(set(record["code_refs"]), {"R1", "R2", "R3"})
+
+    def test_two_rounds_by_default(self):
+        self.arena.rounds = 2
+        self.arena.agents = [scripted_agent("A", [WRONG]), scripted_agent("B", [FAST]), scripted_agent("C", [FAST])]
+        self.arena.run_phase_2(self.state())
+        with open(os.path.join(self.tmp.name, "b1_data.json")) as f: record = json.load(f)
+        self.assertEqual([r["round"] for r in record["rounds"]], [2])
+        self.assertEqual(self.arena.judged, [])
+
+    def test_improvement_threshold(self):
+        self.assertTrue(_improved({"success": False, "time": 999.0}, {"success": True, "time": 1.0}, 0.05))
+        self.assertTrue(_improved({"success": True, "time": 1.2}, {"success": True, "time": 1.0}, 0.05))
+        self.assertFalse(_improved({"success": True, "time": 1.03}, {"success": True, "time": 1.0}, 0.05))
+        self.assertFalse(_improved({"success": True, "time": 1.0}, {"success": False, "time": 0.5}, 0.05))
+
+if __name__ == '__main__':
+    unittest.main()
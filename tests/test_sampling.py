@@ -0,0 +1,52 @@
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.arena.orchestrator import BattleArena
+from src.judge.workers import WorkerPool
+from src.llm.scheduler import LocalModelScheduler
+
+SLOW = "def solution(n):\n    total = 0\n    for i in range(n + 1):\n        total += i\n    return total\n"
+FAST = "def solution(n):\n    return n * (n + 1) // 2\n"
+BROKEN = "def solution(n)\n    return n\n"
+
+class TestBestOfN(unittest.TestCase):
+    def setUp(self):
+        self.arena = BattleArena.__new__(BattleArena)
+        self.arena.log_callback = None
+        self.arena.pool = WorkerPool(max_workers=0)
+        self.arena.execution_timeout = None
+        self.arena.comparator = None
+        self.arena.samples = 4
+        self.arena.sample_temperatures = None
+        self.arena.scheduler = LocalModelScheduler(llm=None, log=lambda msg: None)
+        self.agent = SimpleNamespace(name="A", model="gpt-4o", is_cloud=True)
+
+    def test_best_passing_candidate_is_submitted(self):
+        replies = {0.2: SLOW, 0.47: "# same\n" + SLOW, 0.73: BROKEN, 1.0: FAST}
+        def call(temperature, usage):
+            usage["completion_tokens"] = 10
+            return replies[temperature]
+        samples = self.arena._sample(self.agent, call)
+        self.assertEqual([s["temperature"] for s in samples], [0.2, 0.47, 0.73, 1.0])
+        stats = self.arena._collect_benchmark(self.arena._submit_benchmark(self.agent, samples, 100000, 5000050000))
+        self.assertTrue(stats["success"])
+        self.assertEqual(stats["code"], FAST)
+        report = stats["sampling"]
+        self.assertEqual([r["status"] for r in report["samples"]], ["passed", "duplicate", "syntax_error", "selected"])
+        self.assertEqual((report["n"], report["unique"], report["passing"], report["tokens"]), (4, 2, 2, 40))
+
+    def test_single_sample_keeps_plain_stats(self):
+        self.arena.samples = 1
+        samples = self.arena._sample(self.agent, lambda temperature, usage: BROKEN)
+        self.assertIsNone(samples[0]["temperature"])
+        stats = self.arena._collect_benchmark(self.arena._submit_benchmark(self.agent, samples, 1, 1))
+        self.assertFalse(stats["success"])
+        self.assertIn("Syntax Error", stats["msg"])
+        self.assertNotIn("sampling", stats)
+
+if __name__ == '__main__':
+    unittest.main()
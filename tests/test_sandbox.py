@@ -50,5 +50,15 @@ def calculate(n):
         time, success, msg = self.sandbox.run_benchmark(code, 1, 2)
         self.assertTrue(success)
 
+    def test_restricted_mode(self):
+        sandbox = LocalSandbox(restricted=True)
+        allowed = "import math\nimport sys\nsys.setrecursionlimit(2000)\ndef solution(n):\n    return math.isqrt(n)\n"
+        self.assertTrue(sandbox.run_benchmark(allowed, 16, 4)[1])
+        time, success, msg = sandbox.run_benchmark("import os\ndef solution(n):\n    return os.getcwd()\n", 1)
+        self.assertFalse(success)
+        self.assertIn("not allowed", msg)
+        time, success, msg = sandbox.run_benchmark("def solution(n):\n    return open('/etc/hostname').read()\n", 1)
+        self.assertFalse(success)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
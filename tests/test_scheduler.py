@@ -0,0 +1,44 @@
+import sys
+import os
+import unittest
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm.scheduler import LocalModelScheduler
+
+class FakeLLM:
+    def __init__(self):
+        self.preloaded = []
+
+    def preload(self, model):
+        self.preloaded.append(model)
+        return {"load_s": 2.0}
+
+def agent(name, model, is_cloud=False):
+    return SimpleNamespace(name=name, model=model, is_cloud=is_cloud)
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.llm = FakeLLM()
+        self.scheduler = LocalModelScheduler(self.llm, log=lambda msg: None)
+        self.agents = [agent("A", "llama-3.1"), agent("B", "Mistral"), agent("C", "llama-3.1"), agent("J", "gpt-4o", True)]
+
+    def test_groups_by_resolved_model(self):
+        self.assertEqual([a.name for a in self.scheduler.order(self.agents)], ["A", "C", "B", "J"])
+        self.scheduler.current_model = "mistral" # Still resident from the previous round
+        self.assertEqual([a.name for a in self.scheduler.order(self.agents)], ["B", "A", "C", "J"])
+
+    def test_preloads_once_per_group_and_splits_timings(self):
+        for a in self.scheduler.order(self.agents):
+            self.scheduler.warm(a)
+            self.scheduler.record(a, {"generate_s": 1.0, "prompt_tokens": 10}, 1.5)
+        self.assertEqual(self.llm.preloaded, ["llama3.1", "mistral"])
+        report = self.scheduler.report()
+        self.assertEqual(report["llama3.1"]["load_s"], 2.0)
+        self.assertEqual(report["llama3.1"]["generate_s"], 2.0)
+        self.assertEqual(report["llama3.1"]["calls"], 2)
+        self.assertEqual(report["gpt-4o"]["loads"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm.structured import JsonStreamExtractor, StructuredOutputError, extract_json, validate
+from src.llm.llm_client import LocalLLM
+
+class ScriptedLLM(LocalLLM):
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def _chat(self, model, system_prompt, user_prompt, force_local=False, json_mode=False, on_chunk=None, usage=None):
+        self.prompts.append(user_prompt)
+        reply = self.replies.pop(0)
+        for i in range(0, len(reply), 5):
+            if on_chunk(reply[i:i + 5]): break
+        return reply
+
+class TestStructured(unittest.TestCase):
+    def test_extracts_object_from_prose_and_fences(self):
+        text = 'Sure! ```json\n{"input": [1, 2], "output": "a}b"}\n``` hope that helps {"x": 1}'
+        self.assertEqual(extract_json(text), {"input": [1, 2], "output": "a}b"})
+
+    def test_stream_stops_when_object_closes(self):
+        extractor = JsonStreamExtractor()
+        self.assertFalse(extractor.feed('noise {"a": {"b": '))
+        self.assertTrue(extractor.feed('2}} trailing'))
+        self.assertEqual(extractor.result(), {"a": {"b": 2}})
+
+    def test_tolerates_trailing_commas_and_python_literals(self):
+        self.assertEqual(extract_json('{"a": [1, 2,],}'), {"a": [1, 2]})
+        self.assertEqual(extract_json("{'a': True, 'b': None}"), {"a": True, "b": None})
+
+    def test_truncated_object_reports_fragment(self):
+        with self.assertRaises(StructuredOutputError) as ctx:
+            extract_json('{"winner": "A", "critiques": {')
+        self.assertIn('"winner"', ctx.exception.fragment)
+
+    def test_validate(self):
+        schema = {"winner": str, "critiques": dict, "input": None}
+        self.assertEqual(validate({"winner": "A", "critiques": {}, "input": 3}, schema), [])
+        self.assertEqual(len(validate({"winner": 1, "critiques": {}}, schema)), 2)
+
+    def test_repair_resends_only_the_fragment(self):
+        llm = ScriptedLLM(['{"winner": "A", "reasoning": "x"', '{"winner": "A", "reasoning": "x", "critiques": {}}'])
+        schema = {"winner": str, "reasoning": str, "critiques": dict}
+        result = llm.get_json("gpt-4o", "judge", "HUGE EVIDENCE " * 100, schema)
+        self.assertEqual(result["winner"], "A")
+        self.assertNotIn("HUGE EVIDENCE", llm.prompts[1])
+        self.assertIn('"winner": "A"', llm.prompts[1])
+
+    def test_semantic_check_triggers_repair(self):
+        llm = ScriptedLLM(['{"winner": "Ghost"}', '{"winner": "A"}'])
+        check = lambda v: [] if v["winner"] == "A" else ["unknown winner"]
+        self.assertEqual(llm.get_json("m", "s", "u", {"winner": str}, check=check), {"winner": "A"})
+
+    def test_gives_up_after_repairs(self):
+        llm = ScriptedLLM(["not json", "still not json"])
+        with self.assertRaises(StructuredOutputError):
+            llm.get_json("m", "s", "u", {"winner": str})
+
+if __name__ == '__main__':
+    unittest.main()